@@ -0,0 +1,42 @@
+# This example measures the cost of breaker operations on a synthetic grid with 10000 nodes and a few breakers.
+# A breaker operation updates node indices and admittance matrix incrementally (network.System.update_breaker_topology),
+# returning to a breaker configuration which is stored in system.topology_cache only restores the stored data.
+# For comparison, the time of a full rebuild of the topology (network.System.Ymatrix_calc) is printed.
+
+import io
+import time
+import contextlib
+import numpy as np
+from pyvolt import nv_powerflow
+from synthetic_grid import create_synthetic_grid
+
+
+nodes_num = 10000
+breakers_num = 3  # 8 breaker configurations, all of them fit in the topology cache
+operations_num = 200
+
+system = create_synthetic_grid(nodes_num, breakers_num=breakers_num)
+
+start = time.perf_counter()
+for i in range(10):
+    system.Ymatrix_calc()
+print("Ymatrix_calc: {:.2f} ms".format((time.perf_counter() - start) * 100))
+
+# each operation toggles a random breaker, the first visits of a configuration are incremental updates
+rng = np.random.default_rng(1)
+times = {True: [], False: []}
+for i in range(operations_num):
+    breaker = system.breakers[int(rng.integers(breakers_num))]
+    hits = system.topology_cache.hits
+    start = time.perf_counter()
+    if breaker.is_open:
+        breaker.close_breaker()
+    else:
+        breaker.open_breaker()
+    times[system.topology_cache.hits > hits].append(time.perf_counter() - start)
+    # the powerflow factorization is stored in system.arrays.solver_cache of each configuration
+    with contextlib.redirect_stdout(io.StringIO()):
+        nv_powerflow.solve_nr(system)
+print("breaker operation, incremental update: {:.2f} ms".format(np.mean(times[False]) * 1000))
+print("breaker operation, topology cache hit: {:.2f} ms".format(np.mean(times[True]) * 1000))
+print("topology cache: {} hits, {} misses".format(system.topology_cache.hits, system.topology_cache.misses))
@@ -0,0 +1,73 @@
+# This example measures the time needed by network.System.load_cim_data to build the model
+# from the bundled CIM files. To show how the import scales with the size of the model,
+# the CIM objects are additionally replicated k times (with new mRIDs), which results in
+# k disconnected copies of the same grid.
+
+import copy
+import io
+import os
+import time
+import contextlib
+import cimpy
+from pyvolt import network
+
+
+this_file_folder = os.path.dirname(os.path.realpath(__file__))
+sample_data = os.path.realpath(os.path.join(this_file_folder, "..", "sample_data"))
+datasets = {
+    "CIGRE-MV-NoTap": [os.path.join(sample_data, "CIGRE-MV-NoTap", "Rootnet_FULL_NE_06J16h_DI.xml"),
+                       os.path.join(sample_data, "CIGRE-MV-NoTap", "Rootnet_FULL_NE_06J16h_EQ.xml"),
+                       os.path.join(sample_data, "CIGRE-MV-NoTap", "Rootnet_FULL_NE_06J16h_SV.xml"),
+                       os.path.join(sample_data, "CIGRE-MV-NoTap", "Rootnet_FULL_NE_06J16h_TP.xml")],
+    "areti": [os.path.join(sample_data, "areti", "1.xml"),
+              os.path.join(sample_data, "areti", "2.xml"),
+              os.path.join(sample_data, "areti", "3.xml")],
+}
+base_apparent_power = 25  # MW
+repetitions = 5
+scaling_factors = [1, 4, 16, 64]
+
+
+def replicate(topology, k):
+    """
+    return a dict with k copies of all CIM objects in topology; the mRIDs of copy i get the suffix "_i"
+    """
+    replicated = {}
+    for i in range(k):
+        objects = copy.deepcopy(topology)
+        for obj in objects.values():
+            if hasattr(obj, "mRID"):
+                obj.mRID = "{}_{}".format(obj.mRID, i)
+        for key, obj in objects.items():
+            replicated["{}_{}".format(key, i)] = obj
+    return replicated
+
+
+def time_load_cim_data(topology):
+    """
+    return the minimum time (in s) of several runs of System.load_cim_data
+    """
+    times = []
+    for _ in range(repetitions):
+        system = network.System()
+        start = time.perf_counter()
+        # suppress the warnings printed for elements without start or end node
+        with contextlib.redirect_stdout(io.StringIO()):
+            system.load_cim_data(topology, base_apparent_power)
+        times.append(time.perf_counter() - start)
+    return min(times), system
+
+
+for name, xml_files in datasets.items():
+    res = cimpy.cim_import(xml_files, "cgmes_v2_4_15")
+    topology = res['topology']
+
+    print("\n{}".format(name))
+    print("{:>6} {:>12} {:>8} {:>10} {:>14} {:>18}".format("k", "CIM objects", "nodes", "branches", "time [ms]",
+                                                             "time/object [us]"))
+    for k in scaling_factors:
+        replicated = replicate(topology, k)
+        elapsed, system = time_load_cim_data(replicated)
+        print("{:>6} {:>12} {:>8} {:>10} {:>14.2f} {:>18.2f}".format(k, len(replicated), len(system.nodes),
+                                                                     len(system.branches), elapsed * 1e3,
+                                                                     elapsed / len(replicated) * 1e6))
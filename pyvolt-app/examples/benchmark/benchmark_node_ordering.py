@@ -0,0 +1,53 @@
+# This example measures the effect of the node numbering (network.System.node_ordering) on the sparse
+# factorizations of the powerflow. The nodes of a synthetic meshed grid (see synthetic_grid.py) are stored in
+# random order (as the TopologicalNodes of a CIM file) and are numbered either in this order ("natural") or with
+# the reverse Cuthill-McKee ordering of the branch graph ("rcm"). For each numbering the sparse LU factorization
+# of the admittance matrix without column ordering (the fill-in only depends on the numbering), the factorization
+# of the Jacobian with the default fill-reducing column ordering of splu (COLAMD, as used by
+# nv_powerflow.JacobianFactorization) and the powerflow are timed.
+
+import io
+import time
+import contextlib
+import numpy as np
+import scipy.sparse.linalg as spla
+from pyvolt import nv_powerflow
+from synthetic_grid import create_synthetic_grid
+
+
+nodes_num = 5000
+tie_share = 0.02  # number of additional tie branches / nodes_num
+repetitions = 5
+
+
+def min_time(function):
+    """
+    return the minimum execution time of function in ms and its last result
+    """
+    times = []
+    for i in range(repetitions):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000, result
+
+
+for node_ordering in ("natural", "rcm"):
+    start = time.perf_counter()
+    system = create_synthetic_grid(nodes_num, tie_share=tie_share, shuffle=True, node_ordering=node_ordering)
+    print("\nnode_ordering={} (system creation: {:.1f} ms)".format(node_ordering,
+                                                                  (time.perf_counter() - start) * 1000))
+
+    Ymatrix = system.Ymatrix_sparse.tocsc()
+    duration, lu = min_time(lambda: spla.splu(Ymatrix, permc_spec="NATURAL"))
+    print("admittance matrix LU (no column ordering): {:.1f} ms, nnz(L+U) = {}".format(
+        duration, lu.L.nnz + lu.U.nnz))
+
+    duration, factorization = min_time(lambda: nv_powerflow.JacobianFactorization(system.Ymatrix_sparse,
+                                                                                  system.arrays.node_type))
+    print("Jacobian LU (COLAMD): {:.1f} ms, nnz(L+U) = {}".format(
+        duration, factorization.lu.L.nnz + factorization.lu.U.nnz))
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        duration, (V, report) = min_time(lambda: nv_powerflow.solve_nr(system, solver_type="sparse"))
+    print("solve_nr: {:.1f} ms ({} iterations)".format(duration, report.num_iter))
@@ -0,0 +1,35 @@
+# This example measures the time needed by the Newton-Raphson powerflow (nv_powerflow.solve_nr) on a
+# synthetic meshed grid. The grid consists of a random radial feeder with additional tie branches,
+# one SLACK node, PV nodes and PQ loads (see synthetic_grid.py), so that all rows of the Jacobian are exercised.
+
+import io
+import time
+import contextlib
+import numpy as np
+from pyvolt import network
+from pyvolt import nv_powerflow
+from synthetic_grid import create_synthetic_grid
+
+
+nodes_num = 5000
+pv_share = 0.02  # share of PV nodes
+tie_share = 0.02  # number of additional tie branches / nodes_num
+repetitions = 5
+
+system = create_synthetic_grid(nodes_num, pv_share, tie_share)
+print("nodes: {}, branches: {}, PV nodes: {}".format(system.arrays.nodes_num, system.arrays.branches_num,
+                                                    np.sum(system.arrays.node_type == network.BusType.PV.value)))
+
+# the first call includes the factorization of the constant part of the Jacobian
+start = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    V, report = nv_powerflow.solve_nr(system, solver_type="sparse")
+print("first call (incl. factorization): {:.1f} ms".format((time.perf_counter() - start) * 1000))
+
+times = []
+for i in range(repetitions):
+    start = time.perf_counter()
+    V, report = nv_powerflow.solve_nr(system, solver_type="sparse")
+    times.append(time.perf_counter() - start)
+print("solve_nr: {:.1f} ms ({} iterations, {:.2f} ms/iteration, converged={})".format(
+    min(times) * 1000, report.num_iter, min(times) * 1000 / report.num_iter, report.converged))
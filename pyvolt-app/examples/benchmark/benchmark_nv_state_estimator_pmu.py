@@ -0,0 +1,86 @@
+# This example measures the latency of the state estimation of a PMU stream (only voltage and current
+# phasor measurements) on the bundled grids. nv_state_estimator.DsseCall builds and solves the WLS problem
+# for every frame, while nv_state_estimator.LinearStateEstimator factorizes the gain matrix once and
+# estimates every frame (or a block of frames) with one solve.
+
+import io
+import os
+import time
+import contextlib
+import numpy as np
+import cimpy
+from pyvolt import network
+from pyvolt import nv_powerflow
+from pyvolt import nv_state_estimator
+from pyvolt import measurement
+
+
+this_file_folder = os.path.dirname(os.path.realpath(__file__))
+sample_data = os.path.realpath(os.path.join(this_file_folder, "..", "sample_data"))
+datasets = {
+    "CIGRE-MV-NoTap": [os.path.join(sample_data, "CIGRE-MV-NoTap", "Rootnet_FULL_NE_06J16h_DI.xml"),
+                       os.path.join(sample_data, "CIGRE-MV-NoTap", "Rootnet_FULL_NE_06J16h_EQ.xml"),
+                       os.path.join(sample_data, "CIGRE-MV-NoTap", "Rootnet_FULL_NE_06J16h_SV.xml"),
+                       os.path.join(sample_data, "CIGRE-MV-NoTap", "Rootnet_FULL_NE_06J16h_TP.xml")],
+    "areti": [os.path.join(sample_data, "areti", "1.xml"),
+              os.path.join(sample_data, "areti", "2.xml"),
+              os.path.join(sample_data, "areti", "3.xml")],
+}
+base_apparent_power = 25  # MW
+frames_num = 50  # one second of a 50 frames/s stream
+Vpmu_mag_unc = 1  # uncertainty in percent
+Vpmu_phase_unc = 0.5
+
+
+def create_pmu_measurements(results_pf):
+    """
+    return a measurement.MeasurementSet with a voltage PMU at each node
+    """
+    measurements_set = measurement.MeasurementSet()
+    for node in results_pf.nodes:
+        measurements_set.create_measurement(node.topology_node, measurement.ElemType.Node,
+                                            measurement.MeasType.Vpmu_mag, np.absolute(node.voltage_pu),
+                                            Vpmu_mag_unc)
+        measurements_set.create_measurement(node.topology_node, measurement.ElemType.Node,
+                                            measurement.MeasType.Vpmu_phase, np.angle(node.voltage_pu),
+                                            Vpmu_phase_unc)
+    return measurements_set
+
+
+for name, xml_files in datasets.items():
+    with contextlib.redirect_stdout(io.StringIO()):
+        res = cimpy.cim_import(xml_files, "cgmes_v2_4_15")
+        system = network.System()
+        system.load_cim_data(res['topology'], base_apparent_power)
+        results_pf, _ = nv_powerflow.solve(system)
+    measurements_set = create_pmu_measurements(results_pf)
+    measurements_set.meas_creation(dist="gaussian", seed=1)
+
+    # frames: measured values of the measurements (one row per frame)
+    frames = measurements_set.get_noisy_values(frames_num, dist="gaussian", seed=1)
+
+    print("\n{} ({} nodes, {} measurements)".format(name, len(system.nodes), len(measurements_set.measurements)))
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for frame in frames:
+            for meas, value in zip(measurements_set.measurements, frame):
+                meas.meas_value = value
+            nv_state_estimator.DsseCall(system, measurements_set)
+    print("DsseCall: {:.3f} ms/frame".format((time.perf_counter() - start) * 1e3 / frames_num))
+
+    start = time.perf_counter()
+    estimator = nv_state_estimator.LinearStateEstimator(system, measurements_set)
+    estimator.update_weights()
+    print("LinearStateEstimator, creation and factorization: {:.3f} ms".format((time.perf_counter() - start) * 1e3))
+
+    start = time.perf_counter()
+    for frame in frames:
+        V = estimator.estimate_voltages(frame)
+    print("LinearStateEstimator, single frames: {:.3f} ms/frame".format(
+        (time.perf_counter() - start) * 1e3 / frames_num))
+
+    start = time.perf_counter()
+    V = estimator.estimate_voltages(frames)
+    print("LinearStateEstimator, block of {} frames: {:.3f} ms/frame".format(
+        frames_num, (time.perf_counter() - start) * 1e3 / frames_num))
@@ -0,0 +1,58 @@
+# Synthetic grids for the benchmarks: a random radial feeder with additional tie branches, one SLACK node,
+# PV nodes, PQ loads and optional breakers. The benchmarks import create_synthetic_grid from this file.
+
+import numpy as np
+from pyvolt import network
+
+
+base_voltage = 20  # kV
+base_apparent_power = 25  # MW
+
+
+def create_synthetic_grid(nodes_num, pv_share=0.0, tie_share=0.0, breakers_num=0, shuffle=False,
+                          node_ordering="natural", seed=0):
+    """
+    create a network.System with nodes_num nodes: node 0 is the SLACK node, a share pv_share of the other nodes
+    are PV nodes, each node i > 0 is connected to a random node among the 20 previous nodes,
+    int(tie_share * nodes_num) random tie branches are added and breakers_num open breakers connect random pairs
+    of nodes (except node 0). If shuffle is True the nodes are stored in random order in system.nodes (as the
+    TopologicalNodes of a CIM file). node_ordering is passed to network.System.
+    """
+    rng = np.random.default_rng(seed)
+    system = network.System(node_ordering=node_ordering)
+    nodes = []
+    for i in range(nodes_num):
+        uuid = "N{}".format(i)
+        if i == 0:
+            node = network.Node(uuid=uuid, name=uuid, base_voltage=base_voltage,
+                                base_apparent_power=base_apparent_power, v_mag=base_voltage, index=i)
+            node.type = network.BusType.SLACK
+        elif rng.random() < pv_share:
+            node = network.Node(uuid=uuid, name=uuid, base_voltage=base_voltage,
+                                base_apparent_power=base_apparent_power, v_mag=1.01 * base_voltage, p=0.05,
+                                index=i)
+            node.type = network.BusType.PV
+        else:
+            node = network.Node(uuid=uuid, name=uuid, base_voltage=base_voltage,
+                                base_apparent_power=base_apparent_power, p=-rng.uniform(0.001, 0.01),
+                                q=-rng.uniform(0.0, 0.003), index=i)
+        nodes.append(node)
+
+    ends = [(int(rng.integers(max(0, i - 20), i)), i) for i in range(1, nodes_num)]
+    for k in range(int(tie_share * nodes_num)):
+        start, end = rng.choice(nodes_num, 2, replace=False)
+        ends.append((int(start), int(end)))
+    for k, (start, end) in enumerate(ends):
+        system.branches.append(network.Branch(uuid="B{}".format(k), r=0.05, x=0.08, start_node=nodes[start],
+                                              end_node=nodes[end], base_voltage=base_voltage,
+                                              base_apparent_power=base_apparent_power))
+    for k in range(breakers_num):
+        from_node, to_node = rng.choice(np.arange(1, nodes_num), 2, replace=False)
+        system.breakers.append(network.Breaker(nodes[from_node], nodes[to_node], is_open=True, system=system))
+
+    if shuffle:
+        system.nodes = [nodes[i] for i in rng.permutation(nodes_num)]
+    else:
+        system.nodes = nodes
+    system.Ymatrix_calc()
+    return system
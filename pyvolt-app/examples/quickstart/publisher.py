@@ -52,6 +52,10 @@ def connect_mqtt():
 # Initialize MQTT client
 client = connect_mqtt()
 
+# results of the previous iteration, used as initial state of the solvers
+results_pf = None
+state_estimation_results = None
+
 while True:
     try:
         # Random uncertainties
@@ -59,7 +63,7 @@ while True:
         Pmu_phase_unc = random.uniform(-5, 5)
 
         # Power flow
-        results_pf, _ = nv_powerflow.solve(system)
+        results_pf, _ = nv_powerflow.solve(system, initial_state=results_pf)
 
         # Measurements
         measurements_set = measurement.MeasurementSet()
@@ -81,7 +85,8 @@ while True:
         measurements_set.meas_creation()
 
         # State estimation
-        state_estimation_results = nv_state_estimator.DsseCall(system, measurements_set)
+        state_estimation_results = nv_state_estimator.DsseCall(system, measurements_set,
+                                                               initial_state=state_estimation_results)
 
         # Prepare results for publishing
         result_data = [
@@ -23,8 +23,8 @@ base_apparent_power = 25  # MW
 system.load_cim_data(res['topology'], base_apparent_power)
 
 # Open breaker
+# the node indices and the admittance matrix are updated by the breaker
 system.breakers[-1].open_breaker()
-system.Ymatrix_calc()
 
 # Execute power flow analysis
 results_pf, num_iter = nv_powerflow.solve(system)
@@ -0,0 +1,72 @@
+import os
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+
+import cimpy
+from pyvolt import network
+
+
+# Check the topology processing (network.System.reindex_nodes_list) for chains and loops of closed breakers:
+# the nodes connected by closed breakers must get the same index and the admittance matrix must be the one of the
+# grid without breakers with the rows/columns of the connected nodes added up
+this_file_folder = os.path.dirname(os.path.realpath(__file__))
+xml_path = os.path.realpath(os.path.join(this_file_folder, "..", "sample_data", "CIGRE-MV-NoTap"))
+xml_files = [os.path.join(xml_path, "Rootnet_FULL_NE_06J16h_DI.xml"),
+             os.path.join(xml_path, "Rootnet_FULL_NE_06J16h_EQ.xml"),
+             os.path.join(xml_path, "Rootnet_FULL_NE_06J16h_SV.xml"),
+             os.path.join(xml_path, "Rootnet_FULL_NE_06J16h_TP.xml")]
+res = cimpy.cim_import(xml_files, "cgmes_v2_4_15")
+base_apparent_power = 25  # MW
+
+# closed breakers (pairs of positions in system.nodes from_node, to_node)
+cases = {
+    "chain": [(1, 2), (2, 3), (3, 4)],
+    "chain in reverse order": [(4, 3), (3, 2), (2, 1)],
+    "chain with a node in the middle": [(5, 4), (5, 6), (3, 4)],
+    "loop": [(1, 2), (2, 3), (3, 1)],
+    "loop and chain": [(7, 8), (8, 9), (9, 7), (9, 10), (2, 3)],
+    "parallel breakers": [(1, 2), (2, 1), (1, 2)],
+}
+
+
+def load_system(node_ordering, breakers):
+    """
+    create a network.System from the cim files with closed breakers between the nodes at the positions breakers
+    """
+    system = network.System(node_ordering=node_ordering)
+    system.load_cim_data(res['topology'], base_apparent_power)
+    for from_position, to_position in breakers:
+        system.breakers.append(network.Breaker(system.nodes[from_position], system.nodes[to_position]))
+        system.breakers[-1].close_breaker()
+    system.Ymatrix_calc()
+    return system
+
+
+reference = load_system("natural", [])
+reference_index = np.array([node.index for node in reference.nodes])
+nodes_num = len(reference.nodes)
+for node_ordering in ("natural", "rcm"):
+    for name, breakers in cases.items():
+        system = load_system(node_ordering, breakers)
+        node_index = np.array([node.index for node in system.nodes])
+
+        # groups of nodes connected by the breakers
+        positions = np.array(breakers).T
+        graph = sp.coo_matrix((np.ones(len(breakers)), (positions[0], positions[1])), shape=(nodes_num, nodes_num))
+        groups_num, node_group = connected_components(graph, directed=False)
+        assert system.get_nodes_num() == groups_num
+        assert sorted(set(node_index.tolist())) == list(range(groups_num))
+        for group in range(groups_num):
+            assert len(set(node_index[node_group == group].tolist())) == 1
+        for index in range(groups_num):
+            assert system.get_node_by_index(index).index == index
+
+        # admittance matrix: Y = P^T * Y_reference * P (P[i, j] = 1 if the node with index i in the reference
+        # system has the index j in system)
+        P = sp.csr_matrix((np.ones(nodes_num), (reference_index, node_index)), shape=(nodes_num, groups_num))
+        Ymatrix = (P.T.dot(reference.Ymatrix_sparse).dot(P)).toarray()
+        assert np.amax(np.absolute(system.Ymatrix - Ymatrix)) < 10 ** (-12)
+        print("node_ordering={}, {}: {} nodes, {} indices".format(node_ordering, name, nodes_num, groups_num))
+
+print("breaker group checks passed")
@@ -0,0 +1,74 @@
+import os
+import numpy as np
+
+import cimpy
+from pyvolt import network
+
+
+# Check the incremental update of node indices and admittance matrix after breaker operations
+# (network.System.update_breaker_topology): random sequences of breaker operations are applied to a system whose
+# breakers notify it and to a copy whose topology is rebuilt with Ymatrix_calc after each operation, node indices,
+# branch indices and admittance matrix of both systems must be the same
+this_file_folder = os.path.dirname(os.path.realpath(__file__))
+xml_path = os.path.realpath(os.path.join(this_file_folder, "..", "sample_data", "CIGRE-MV-NoTap-WithBreaker"))
+xml_files = [os.path.join(xml_path, "20191126T1535Z_YYY_EQ_.xml"),
+             os.path.join(xml_path, "20191126T1535Z_XX_YYY_SV_.xml"),
+             os.path.join(xml_path, "20191126T1535Z_XX_YYY_TP_.xml")]
+res = cimpy.cim_import(xml_files, "cgmes_v2_4_15")
+base_apparent_power = 25  # MW
+breakers_num = 6  # additional breakers between random nodes
+operations_num = 300
+
+
+def load_system(node_ordering, notify):
+    """
+    create a network.System from the cim files with breakers_num additional open breakers between random pairs
+    of nodes (the same pairs for each call)
+    :param notify: True if the breakers update the system, False if the topology is rebuilt by the caller
+    """
+    system = network.System(node_ordering=node_ordering)
+    system.load_cim_data(res['topology'], base_apparent_power)
+    rng = np.random.default_rng(0)
+    for k in range(breakers_num):
+        from_position, to_position = rng.choice(len(system.nodes), 2, replace=False)
+        system.breakers.append(network.Breaker(system.nodes[from_position], system.nodes[to_position], is_open=True))
+    for breaker in system.breakers:
+        breaker.system = system if notify else None
+    system.Ymatrix_calc()
+    return system
+
+
+def check_same_topology(system, reference):
+    """
+    assert that node indices, branch indices and admittance matrix of system and reference are the same
+    """
+    assert [node.index for node in system.nodes] == [node.index for node in reference.nodes]
+    assert system.get_nodes_num() == reference.get_nodes_num()
+    for index in range(reference.get_nodes_num()):
+        assert system.get_node_by_index(index).uuid == reference.get_node_by_index(index).uuid
+    assert [(branch.start_node.index, branch.end_node.index) for branch in system.branches] == \
+        [(branch.start_node.index, branch.end_node.index) for branch in reference.branches]
+    assert np.array_equal(system.arrays.branch_start, reference.arrays.branch_start)
+    assert np.array_equal(system.arrays.branch_end, reference.arrays.branch_end)
+    assert system.Ymatrix_sparse.shape == reference.Ymatrix_sparse.shape
+    assert np.amax(np.absolute(system.Ymatrix - reference.Ymatrix), initial=0) < 10 ** (-12)
+
+
+for node_ordering in ("natural", "rcm"):
+    system = load_system(node_ordering, notify=True)
+    reference = load_system(node_ordering, notify=False)
+    rng = np.random.default_rng(1)
+    for operation in range(operations_num):
+        k = int(rng.integers(len(system.breakers)))
+        close = bool(rng.random() < 0.5)
+        for breaker in (system.breakers[k], reference.breakers[k]):
+            if close:
+                breaker.close_breaker()
+            else:
+                breaker.open_breaker()
+        reference.Ymatrix_calc()
+        check_same_topology(system, reference)
+    print("node_ordering={}: {} breaker operations, topology cache: {} hits, {} misses".format(
+        node_ordering, operations_num, system.topology_cache.hits, system.topology_cache.misses))
+
+print("breaker switching checks passed")
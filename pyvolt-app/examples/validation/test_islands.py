@@ -0,0 +1,104 @@
+import os
+import numpy as np
+
+import cimpy
+from pyvolt import network
+from pyvolt import nv_powerflow
+from pyvolt import nv_state_estimator
+from pyvolt import measurement
+
+
+# Check that solving the electrical islands of a system separately (nv_powerflow.solve_islands and
+# nv_state_estimator.DsseIslands, in this process and in worker processes) gives the same voltages as solving the
+# whole system. The system contains two copies of the CIGRE MV grid (with different loads), each with its own
+# SLACK node.
+this_file_folder = os.path.dirname(os.path.realpath(__file__))
+xml_path = os.path.realpath(os.path.join(this_file_folder, "..", "sample_data", "CIGRE-MV-NoTap"))
+xml_files = [os.path.join(xml_path, "Rootnet_FULL_NE_06J16h_DI.xml"),
+             os.path.join(xml_path, "Rootnet_FULL_NE_06J16h_EQ.xml"),
+             os.path.join(xml_path, "Rootnet_FULL_NE_06J16h_SV.xml"),
+             os.path.join(xml_path, "Rootnet_FULL_NE_06J16h_TP.xml")]
+base_apparent_power = 25  # MW
+load_factor = 0.8  # factor of the power injections of the second copy
+
+
+def load_system(res):
+    system = network.System()
+    system.load_cim_data(res['topology'], base_apparent_power)
+    return system
+
+
+def create_two_islands_system(res):
+    """
+    return a network.System with two copies of the grid which are not connected with each other
+    """
+    system = load_system(res)
+    second = load_system(res)
+    for node in second.nodes:
+        node.uuid = node.uuid + "_2"
+        node.power = node.power * load_factor
+        node.power_pu = node.power_pu * load_factor
+    for branch in second.branches:
+        branch.uuid = branch.uuid + "_2"
+    system.nodes = system.nodes + second.nodes
+    system.branches = system.branches + second.branches
+    system.Ymatrix_calc()
+    return system
+
+
+def create_measurements(system, V):
+    """
+    create voltage PMU and power injection measurements at all nodes for the node voltages V (in pu)
+    """
+    S = V * np.conj(system.Ymatrix_sparse.dot(V))
+    measurements_set = measurement.MeasurementSet()
+    for node, voltage, power in zip(system.arrays.nodes, V, S):
+        measurements_set.create_measurement(node, measurement.ElemType.Node, measurement.MeasType.Vpmu_mag,
+                                            np.absolute(voltage), 1)
+        measurements_set.create_measurement(node, measurement.ElemType.Node, measurement.MeasType.Vpmu_phase,
+                                            np.angle(voltage), 0.5)
+        measurements_set.create_measurement(node, measurement.ElemType.Node, measurement.MeasType.Sinj_real,
+                                            power.real, 2)
+        measurements_set.create_measurement(node, measurement.ElemType.Node, measurement.MeasType.Sinj_imag,
+                                            power.imag, 2)
+    measurements_set.meas_creation(dist="gaussian", seed=1)
+    return measurements_set
+
+
+def main():
+    res = cimpy.cim_import(xml_files, "cgmes_v2_4_15")
+    system = create_two_islands_system(res)
+    islands_num, node_island = system.get_islands()
+    assert islands_num == 2
+    nodes_num = system.arrays.nodes_num
+    assert np.array_equal(node_island, np.repeat([0, 1], nodes_num // 2))
+
+    # powerflow of the whole system and of the first copy alone
+    V, _ = nv_powerflow.solve_voltages(system, "sparse")
+    V_single, _ = nv_powerflow.solve_voltages(load_system(res), "sparse")
+    assert np.amax(np.absolute(V[:nodes_num // 2] - V_single)) < 10 ** (-8)
+    for solver_type in ("auto", "sparse"):
+        for processes in (1, 2):
+            V_islands, report = nv_powerflow.solve_islands(system, solver_type, processes=processes)
+            assert report.converged
+            error = np.amax(np.absolute(V_islands - V))
+            print("powerflow, solver_type={}, processes={}: maximum difference {:.3e} pu".format(
+                solver_type, processes, error))
+            assert error < 10 ** (-8)
+
+    # state estimation of the whole system
+    measurements_set = create_measurements(system, V)
+    Vest = nv_state_estimator.DsseCall(system, measurements_set).get_voltages()
+    for processes in (1, 2):
+        Vest_islands, report = nv_state_estimator.DsseIslands(system, measurements_set, processes=processes)
+        assert report.converged
+        error = np.amax(np.absolute(Vest_islands - Vest))
+        print("state estimation, processes={}: maximum difference {:.3e} pu".format(processes, error))
+        assert error < 10 ** (-6)
+
+    print("island checks passed")
+
+
+# the worker processes import this file (the code must not run on import)
+if __name__ == "__main__":
+    main()
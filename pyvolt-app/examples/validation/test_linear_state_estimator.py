@@ -0,0 +1,63 @@
+import os
+import numpy as np
+
+import cimpy
+from pyvolt import network
+from pyvolt import nv_powerflow
+from pyvolt import nv_state_estimator
+from pyvolt import measurement
+
+
+# Check that nv_state_estimator.LinearStateEstimator gives the same estimate as DssePmu (used by DsseCall for
+# measurement sets with only PMU measurements), both if the estimator is created before the measured values are
+# calculated and if it is created afterwards
+this_file_folder = os.path.dirname(os.path.realpath(__file__))
+xml_path = os.path.realpath(os.path.join(this_file_folder, "..", "sample_data", "CIGRE-MV-NoTap"))
+xml_files = [os.path.join(xml_path, "Rootnet_FULL_NE_06J16h_DI.xml"),
+             os.path.join(xml_path, "Rootnet_FULL_NE_06J16h_EQ.xml"),
+             os.path.join(xml_path, "Rootnet_FULL_NE_06J16h_SV.xml"),
+             os.path.join(xml_path, "Rootnet_FULL_NE_06J16h_TP.xml")]
+res = cimpy.cim_import(xml_files, "cgmes_v2_4_15")
+system = network.System()
+base_apparent_power = 25  # MW
+system.load_cim_data(res['topology'], base_apparent_power)
+V, _ = nv_powerflow.solve_voltages(system)
+
+# voltage PMUs at all nodes and current PMUs at all branches
+measurements_set = measurement.MeasurementSet()
+for node, voltage in zip(system.arrays.nodes, V):
+    measurements_set.create_measurement(node, measurement.ElemType.Node, measurement.MeasType.Vpmu_mag,
+                                        np.absolute(voltage), 1)
+    measurements_set.create_measurement(node, measurement.ElemType.Node, measurement.MeasType.Vpmu_phase,
+                                        np.angle(voltage), 0.5)
+for branch in system.branches:
+    current = (V[branch.start_node.index] - V[branch.end_node.index]) / complex(branch.r_pu, branch.x_pu)
+    measurements_set.create_measurement(branch, measurement.ElemType.Branch, measurement.MeasType.Ipmu_mag,
+                                        np.absolute(current), 2)
+    measurements_set.create_measurement(branch, measurement.ElemType.Branch, measurement.MeasType.Ipmu_phase,
+                                        np.angle(current), 1)
+
+# the estimator is created before the measured values are calculated (all values are 0)
+estimator_before = nv_state_estimator.LinearStateEstimator(system, measurements_set)
+measurements_set.meas_creation(dist="gaussian", seed=1)
+estimator_after = nv_state_estimator.LinearStateEstimator(system, measurements_set)
+
+Vest_pmu = nv_state_estimator.DsseCall(system, measurements_set).get_voltages()
+for name, estimator in (("created before meas_creation", estimator_before),
+                        ("created after meas_creation", estimator_after)):
+    Vest = estimator.estimate().get_voltages()
+    error = np.amax(np.absolute(Vest - Vest_pmu))
+    print("{}: maximum difference to DssePmu {:.3e} pu".format(name, error))
+    assert error < 10 ** (-6)
+
+# without measured values the gain matrix is singular, an exception is raised instead of returning a wrong state
+estimator = nv_state_estimator.LinearStateEstimator(system, measurements_set)
+try:
+    estimator.estimate_voltages(np.zeros(len(measurements_set)))
+    raise AssertionError("estimate_voltages did not raise an exception")
+except AssertionError:
+    raise
+except Exception:
+    pass
+
+print("LinearStateEstimator checks passed")
@@ -0,0 +1,78 @@
+import numpy as np
+from pyvolt import network
+from pyvolt import measurement
+
+
+# Check the measured values created by MeasurementSet.meas_creation and get_noisy_values: dist="normal" gives the
+# ideal values, the "gaussian" and "uniform" errors are reproducible with a seed, have the requested shape and the
+# expected distribution (standard deviation zdev, resp. uniform in [-3 * zdev, 3 * zdev])
+base_voltage = 20  # kV
+base_apparent_power = 25  # MW
+realizations = 20000
+
+measurements_set = measurement.MeasurementSet()
+for i in range(4):
+    node = network.Node(uuid="N{}".format(i), base_voltage=base_voltage, base_apparent_power=base_apparent_power)
+    measurements_set.create_measurement(node, measurement.ElemType.Node, measurement.MeasType.Vpmu_mag,
+                                        1.0 + i / 100, 1)
+    measurements_set.create_measurement(node, measurement.ElemType.Node, measurement.MeasType.Vpmu_phase,
+                                        -i / 100, 0.5)
+    measurements_set.create_measurement(node, measurement.ElemType.Node, measurement.MeasType.Sinj_real,
+                                        -0.1 * i, 2)
+meas_num = len(measurements_set)
+ideal = np.array(measurements_set.meas_value_ideal)
+# deviation of the errors: relative to the value, absolute for phase measurements
+zdev = ideal * measurements_set.std_dev
+phase_index = measurements_set.getIndexOfMeasurements(measurement.MeasType.Vpmu_phase)
+zdev[phase_index] = measurements_set.std_dev[phase_index]
+measured = np.flatnonzero(zdev != 0)
+
+# "normal" (default) and type "field": the measured values are the ideal values
+measurements_set.meas_creation()
+assert np.array_equal(measurements_set.meas_value, ideal)
+measurements_set.meas_creation(dist="gaussian", seed=1, type="field")
+assert np.array_equal(measurements_set.meas_value, ideal)
+values = measurements_set.get_noisy_values(5, seed=1)
+assert values.shape == (5, meas_num) and np.array_equal(values, np.tile(ideal, (5, 1)))
+
+for dist in ("gaussian", "uniform"):
+    # shape and reproducibility
+    values = measurements_set.get_noisy_values(dist=dist, seed=1)
+    assert values.shape == (meas_num,)
+    assert np.array_equal(values, measurements_set.get_noisy_values(dist=dist, seed=1))
+    assert not np.array_equal(values[measured], measurements_set.get_noisy_values(dist=dist, seed=2)[measured])
+    measurements_set.meas_creation(dist=dist, seed=1)
+    assert np.array_equal(measurements_set.meas_value, values)
+    values = measurements_set.get_noisy_values(3, dist=dist, seed=np.random.SeedSequence(1))
+    assert values.shape == (3, meas_num)
+    assert np.array_equal(values, measurements_set.get_noisy_values(3, dist=dist, seed=np.random.default_rng(1)))
+
+    # independent generators (e.g. for parallel workers) are reproducible and give different values
+    values = [measurements_set.get_noisy_values(dist=dist, seed=rng)
+              for rng in measurement.spawn_random_generators(1, 2)]
+    values_again = [measurements_set.get_noisy_values(dist=dist, seed=rng)
+                    for rng in measurement.spawn_random_generators(1, 2)]
+    assert np.array_equal(values[0], values_again[0]) and np.array_equal(values[1], values_again[1])
+    assert not np.array_equal(values[0][measured], values[1][measured])
+
+    # distribution of the normalized errors
+    values = measurements_set.get_noisy_values(realizations, dist=dist, seed=1)
+    assert np.array_equal(values[:, zdev == 0], np.tile(ideal[zdev == 0], (realizations, 1)))
+    errors = (values[:, measured] - ideal[measured]) / zdev[measured]
+    expected_std = 1 if dist == "gaussian" else np.sqrt(3)
+    assert np.all(np.absolute(errors.mean(axis=0)) < 0.05)
+    assert np.all(np.absolute(errors.std(axis=0) / expected_std - 1) < 0.03)
+    if dist == "uniform":
+        assert np.all(np.absolute(errors) <= 3)
+    print("{}: mean of the normalized errors in [{:.3f}, {:.3f}], standard deviation in [{:.3f}, {:.3f}]".format(
+        dist, errors.mean(axis=0).min(), errors.mean(axis=0).max(), errors.std(axis=0).min(),
+        errors.std(axis=0).max()))
+
+# other distributions are rejected
+try:
+    measurements_set.get_noisy_values(dist="lognormal")
+    raise AssertionError("get_noisy_values did not raise a ValueError")
+except ValueError:
+    pass
+
+print("measurement noise checks passed")
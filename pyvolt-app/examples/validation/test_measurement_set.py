@@ -0,0 +1,57 @@
+import pickle
+from pyvolt import network
+from pyvolt import measurement
+
+
+# Check that measurements can be added to a MeasurementSet with the list operations
+# (append, extend, +=) and that the setter MeasurementSet.measurements copies the measurements
+base_voltage = 20  # kV
+base_apparent_power = 25  # MW
+node_1 = network.Node(uuid="N1", base_voltage=base_voltage, base_apparent_power=base_apparent_power)
+node_2 = network.Node(uuid="N2", base_voltage=base_voltage, base_apparent_power=base_apparent_power)
+
+measurements_set = measurement.MeasurementSet()
+measurements_set.create_measurement(node_1, measurement.ElemType.Node, measurement.MeasType.V_mag, 1.0, 1)
+other_set = measurement.MeasurementSet()
+other_set.create_measurement(node_2, measurement.ElemType.Node, measurement.MeasType.Vpmu_mag, 1.01, 2)
+other_set.meas_value = [1.02]
+
+# += with the measurements of another set
+measurements_set.measurements += other_set.measurements
+assert len(measurements_set) == 2
+assert [meas.element.uuid for meas in measurements_set.measurements] == ["N1", "N2"]
+assert measurements_set.measurements[1].meas_value == 1.02
+assert measurements_set.measurements[1].std_dev == 2 / 300
+
+# append a measurement created directly, a list obtained before stays up to date
+measurements_list = measurements_set.measurements
+measurements_list.append(measurement.Measurement(node_1, measurement.ElemType.Node, measurement.MeasType.Sinj_real,
+                                                 -0.1, 1))
+assert len(measurements_set) == 3 and len(measurements_list) == 3
+assert measurements_set.measurements[2].meas_type == measurement.MeasType.Sinj_real
+
+# += with a list of measurements
+measurements_set.measurements += [measurement.Measurement(node_2, measurement.ElemType.Node,
+                                                          measurement.MeasType.Sinj_imag, -0.05, 1)]
+assert len(measurements_set) == 4
+assert measurements_set.getNumberOfMeasurements(measurement.MeasType.Sinj_imag) == 1
+
+# the setter copies the measurements, also if they belong to the set itself
+measurements_set.measurements = measurements_set.measurements + measurements_set.measurements[:2]
+assert list(measurements_set.meas_value_ideal) == [1.0, 1.01, -0.1, -0.05, 1.0, 1.01]
+
+# other modifications of the list are not supported
+try:
+    measurements_set.measurements.insert(0, other_set.measurements[0])
+    raise AssertionError("insert did not raise an exception")
+except AssertionError:
+    raise
+except Exception:
+    pass
+
+# the set can be pickled (e.g. for the worker processes of nv_state_estimator.DsseIslands)
+copied_set = pickle.loads(pickle.dumps(measurements_set))
+assert len(copied_set.measurements) == 6
+assert copied_set.measurements[5].element is copied_set.elements[5]
+
+print("MeasurementSet checks passed")
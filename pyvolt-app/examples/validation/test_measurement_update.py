@@ -0,0 +1,87 @@
+import numpy as np
+from pyvolt import network
+from pyvolt import measurement
+
+
+# Check that the bulk update MeasurementSet.update_measurements changes the same measurements to the same values as
+# calls of update_measurement for each value, in per unit and in SI units
+base_voltage = 20  # kV
+base_apparent_power = 25  # MW
+nodes = [network.Node(uuid="N{}".format(i), base_voltage=base_voltage, base_apparent_power=base_apparent_power)
+         for i in range(3)]
+branches = [network.Branch(uuid="B{}".format(i), r=0.5, x=0.8, start_node=nodes[i], end_node=nodes[i + 1],
+                           base_voltage=base_voltage, base_apparent_power=base_apparent_power) for i in range(2)]
+
+
+def create_measurements():
+    """
+    create a measurement set with voltage, current and power measurements (the same set for each call)
+    """
+    measurements_set = measurement.MeasurementSet()
+    for node in nodes:
+        for meas_type in (measurement.MeasType.V_mag, measurement.MeasType.Vpmu_mag,
+                          measurement.MeasType.Vpmu_phase):
+            measurements_set.create_measurement(node, measurement.ElemType.Node, meas_type, 1.0, 1)
+    for branch in branches:
+        for meas_type in (measurement.MeasType.I_mag, measurement.MeasType.Ipmu_mag, measurement.MeasType.Ipmu_phase,
+                          measurement.MeasType.S1_real, measurement.MeasType.S1_imag):
+            measurements_set.create_measurement(branch, measurement.ElemType.Branch, meas_type, 0.1, 1)
+    # a second measurement of the same type at the same element
+    measurements_set.create_measurement(nodes[0], measurement.ElemType.Node, measurement.MeasType.V_mag, 1.0, 2)
+    return measurements_set
+
+
+# data of the devices: element uuid, type, value (the uuid "X" is not measured)
+rng = np.random.default_rng(0)
+data = []
+for node in nodes:
+    data.append((node.uuid, measurement.MeasType.Vpmu_mag, rng.uniform(0.95, 1.05)))
+    data.append((node.uuid, measurement.MeasType.Vpmu_phase, rng.uniform(-0.1, 0.1)))
+for branch in branches:
+    data.append((branch.uuid, measurement.MeasType.Ipmu_mag, rng.uniform(0.05, 0.2)))
+    data.append((branch.uuid, measurement.MeasType.Ipmu_phase, rng.uniform(-0.5, 0.5)))
+    data.append((branch.uuid, measurement.MeasType.S1_real, rng.uniform(-1, 1)))
+    data.append((branch.uuid, measurement.MeasType.S1_imag, rng.uniform(-1, 1)))
+data.append(("X", measurement.MeasType.Vpmu_mag, 1.0))
+element_uuids = [uuid for uuid, _, _ in data]
+meas_types = [meas_type for _, meas_type, _ in data]
+meas_data = np.array([value for _, _, value in data])
+
+for value_in_pu in (True, False):
+    values = meas_data if value_in_pu else meas_data * 1000
+    reference = create_measurements()
+    for element_uuid, meas_type, value in zip(element_uuids, meas_types, values):
+        reference.update_measurement(element_uuid, meas_type, value, value_in_pu)
+
+    # lists of uuids, types and values
+    measurements_set = create_measurements()
+    updated = measurements_set.update_measurements(element_uuids, meas_types, values, value_in_pu)
+    assert updated == len(measurements_set) == 20
+    assert np.array_equal(measurements_set.meas_value, reference.meas_value)
+
+    # dict {(uuid, type): value}
+    measurements_set = create_measurements()
+    measurements_set.update_measurements(dict(zip(zip(element_uuids, meas_types), values)),
+                                         value_in_pu=value_in_pu)
+    assert np.array_equal(measurements_set.meas_value, reference.meas_value)
+
+    # one type for all values
+    voltages = [index for index, meas_type in enumerate(meas_types) if meas_type == measurement.MeasType.Vpmu_mag]
+    reference_voltages = create_measurements()
+    for index in voltages:
+        reference_voltages.update_measurement(element_uuids[index], measurement.MeasType.Vpmu_mag, values[index],
+                                              value_in_pu)
+    measurements_set = create_measurements()
+    measurements_set.update_measurements([element_uuids[index] for index in voltages], measurement.MeasType.Vpmu_mag,
+                                         values[voltages], value_in_pu)
+    assert np.array_equal(measurements_set.meas_value, reference_voltages.meas_value)
+
+# SI units: voltages in V (phase-to-neutral), currents in A, powers in W or var per phase
+measurements_set = create_measurements()
+measurements_set.update_measurements(["N0", "B0", "B0"], [measurement.MeasType.Vpmu_mag, measurement.MeasType.Ipmu_mag,
+                                                          measurement.MeasType.S1_real],
+                                     [base_voltage * 1000 / np.sqrt(3), branches[0].base_current * 1000,
+                                      base_apparent_power * 1e6 / 3], value_in_pu=False)
+assert np.allclose(measurements_set.meas_value[[0, 1, 19, 9, 10, 12]], 1)
+
+print("measurement update checks passed")
@@ -0,0 +1,51 @@
+import os
+import numpy as np
+
+import cimpy
+from pyvolt import network
+from pyvolt import nv_powerflow
+
+
+# Check the backward/forward sweep powerflow (nv_powerflow.solve_bfs) against Newton-Raphson on the radial
+# CIGRE MV grid and the choice of the solver by solver_type="auto" for the radial grid and for the grid with an
+# additional tie branch (meshed grid)
+this_file_folder = os.path.dirname(os.path.realpath(__file__))
+xml_path = os.path.realpath(os.path.join(this_file_folder, "..", "sample_data", "CIGRE-MV-NoTap"))
+xml_files = [os.path.join(xml_path, "Rootnet_FULL_NE_06J16h_DI.xml"),
+             os.path.join(xml_path, "Rootnet_FULL_NE_06J16h_EQ.xml"),
+             os.path.join(xml_path, "Rootnet_FULL_NE_06J16h_SV.xml"),
+             os.path.join(xml_path, "Rootnet_FULL_NE_06J16h_TP.xml")]
+res = cimpy.cim_import(xml_files, "cgmes_v2_4_15")
+system = network.System()
+base_apparent_power = 25  # MW
+system.load_cim_data(res['topology'], base_apparent_power)
+
+# radial grid: BFS, NR and "auto" (BFS) give the same voltages
+assert nv_powerflow.get_radial_ordering(system) is not None
+V_bfs, report_bfs = nv_powerflow.solve_voltages(system, "bfs")
+assert report_bfs.converged
+for solver_type in ("sparse", "dense", "auto"):
+    V, report = nv_powerflow.solve_voltages(system, solver_type)
+    assert report.converged
+    error = np.amax(np.absolute(V - V_bfs))
+    print("radial grid, {}: maximum difference to bfs {:.3e} pu ({} iterations, bfs: {} iterations)".format(
+        solver_type, error, report.num_iter, report_bfs.num_iter))
+    assert error < 10 ** (-8)
+
+# BFS also accepts an initial state (e.g. the results of the previous calculation)
+V, report = nv_powerflow.solve_voltages(system, "bfs", initial_state=V_bfs)
+assert report.converged and np.amax(np.absolute(V - V_bfs)) < 10 ** (-8)
+
+# meshed grid: tie branch between the last two PQ nodes with the same base voltage, "auto" uses NR
+pq_nodes = [node for node in system.arrays.nodes if node.type == network.BusType.PQ]
+start_node = next(node for node in pq_nodes if node.baseVoltage == pq_nodes[-1].baseVoltage)
+system.branches.append(network.Branch(uuid="tie", r=0.5, x=0.8, start_node=start_node, end_node=pq_nodes[-1],
+                                      base_voltage=start_node.baseVoltage, base_apparent_power=base_apparent_power))
+system.Ymatrix_calc()
+assert nv_powerflow.get_radial_ordering(system) is None
+V_nr, _ = nv_powerflow.solve_voltages(system, "sparse")
+V, report = nv_powerflow.solve_voltages(system, "auto")
+assert report.converged and np.amax(np.absolute(V - V_nr)) < 10 ** (-8)
+assert np.amax(np.absolute(V_nr - V_bfs)) > 10 ** (-6)
+
+print("BFS powerflow checks passed")
@@ -0,0 +1,60 @@
+import os
+import numpy as np
+
+import cimpy
+from pyvolt import network
+from pyvolt import nv_powerflow
+from pyvolt import results
+
+
+# Check the time-series powerflow (nv_powerflow.solve_timeseries): the voltages of each snapshot must be the ones
+# of a powerflow of the snapshot alone, and get_power_injections must build the matrix of power injections from the
+# time series of the nodes
+this_file_folder = os.path.dirname(os.path.realpath(__file__))
+xml_path = os.path.realpath(os.path.join(this_file_folder, "..", "sample_data", "CIGRE-MV-NoTap"))
+xml_files = [os.path.join(xml_path, "Rootnet_FULL_NE_06J16h_DI.xml"),
+             os.path.join(xml_path, "Rootnet_FULL_NE_06J16h_EQ.xml"),
+             os.path.join(xml_path, "Rootnet_FULL_NE_06J16h_SV.xml"),
+             os.path.join(xml_path, "Rootnet_FULL_NE_06J16h_TP.xml")]
+res = cimpy.cim_import(xml_files, "cgmes_v2_4_15")
+system = network.System()
+base_apparent_power = 25  # MW
+system.load_cim_data(res['topology'], base_apparent_power)
+snapshots_num = 10
+
+# time series of the power of the PQ nodes: actual power multiplied by random factors in [0.5, 1.5]
+rng = np.random.default_rng(0)
+time = np.arange(snapshots_num) * 900  # s
+timeseries = {}
+for node in system.arrays.nodes:
+    if node.type == network.BusType.PQ:
+        timeseries[node.uuid] = results.TimeSeries(node.uuid, time, node.power * rng.uniform(0.5, 1.5, snapshots_num))
+power_pu = nv_powerflow.get_power_injections(system, timeseries)
+assert power_pu.shape == (snapshots_num, system.arrays.nodes_num)
+for node in system.arrays.nodes:
+    expected = timeseries[node.uuid].values / node.base_apparent_power if node.uuid in timeseries else node.power_pu
+    assert np.allclose(power_pu[:, node.index], expected, rtol=10 ** (-12), atol=0)
+
+node_power_pu = [node.power_pu for node in system.arrays.nodes]
+for solver_type in ("auto", "sparse", "dense"):
+    V, reports = nv_powerflow.solve_timeseries(system, power_pu, solver_type)
+    assert V.shape == power_pu.shape and len(reports) == snapshots_num
+    assert all(report.converged for report in reports)
+    # the power injections of the system are not changed
+    assert np.array_equal(system.arrays.node_power_pu, node_power_pu)
+
+    # powerflow of each snapshot alone
+    error = 0
+    for t in range(snapshots_num):
+        for node in system.arrays.nodes:
+            node.power_pu = power_pu[t, node.index]
+        V_snapshot, report = nv_powerflow.solve_voltages(system, solver_type)
+        assert report.converged
+        error = max(error, np.amax(np.absolute(V[t] - V_snapshot)))
+    for node, value in zip(system.arrays.nodes, node_power_pu):
+        node.power_pu = value
+    system.arrays.update_node_values()
+    print("solver_type={}: maximum difference to the snapshots solved alone {:.3e} pu".format(solver_type, error))
+    assert error < 10 ** (-8)
+
+print("time-series powerflow checks passed")
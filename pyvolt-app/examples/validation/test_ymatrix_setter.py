@@ -0,0 +1,70 @@
+import os
+import numpy as np
+
+import cimpy
+from pyvolt import network
+from pyvolt import nv_powerflow
+from pyvolt import nv_state_estimator
+from pyvolt import measurement
+
+
+# Check that the state estimator does not reuse data of the previous admittance matrix after the admittance
+# matrix was changed with the setter System.Ymatrix: the estimate must match the one of a new system with the
+# same admittance matrix
+this_file_folder = os.path.dirname(os.path.realpath(__file__))
+xml_path = os.path.realpath(os.path.join(this_file_folder, "..", "sample_data", "CIGRE-MV-NoTap"))
+xml_files = [os.path.join(xml_path, "Rootnet_FULL_NE_06J16h_DI.xml"),
+             os.path.join(xml_path, "Rootnet_FULL_NE_06J16h_EQ.xml"),
+             os.path.join(xml_path, "Rootnet_FULL_NE_06J16h_SV.xml"),
+             os.path.join(xml_path, "Rootnet_FULL_NE_06J16h_TP.xml")]
+res = cimpy.cim_import(xml_files, "cgmes_v2_4_15")
+base_apparent_power = 25  # MW
+
+
+def load_system(Ymatrix_factor):
+    """
+    create a network.System from the cim files and multiply its admittance matrix by Ymatrix_factor
+    """
+    system = network.System()
+    system.load_cim_data(res['topology'], base_apparent_power)
+    if Ymatrix_factor != 1:
+        system.Ymatrix = system.Ymatrix * Ymatrix_factor
+    return system
+
+
+def create_measurements(system, V):
+    """
+    create measurements of voltage magnitude and power injection at all nodes for the node voltages V (in pu)
+    """
+    S = V * np.conj(system.Ymatrix_sparse.dot(V))
+    measurements_set = measurement.MeasurementSet()
+    for node, voltage, power in zip(system.arrays.nodes, V, S):
+        measurements_set.create_measurement(node, measurement.ElemType.Node, measurement.MeasType.V_mag,
+                                            np.absolute(voltage), 1)
+        measurements_set.create_measurement(node, measurement.ElemType.Node, measurement.MeasType.Sinj_real,
+                                            power.real, 2)
+        measurements_set.create_measurement(node, measurement.ElemType.Node, measurement.MeasType.Sinj_imag,
+                                            power.imag, 2)
+    measurements_set.meas_creation()
+    return measurements_set
+
+
+# estimate the state with the original admittance matrix, the estimator data is stored in system.arrays.solver_cache
+system = load_system(1)
+V, _ = nv_powerflow.solve_voltages(system)
+nv_state_estimator.DsseCall(system, create_measurements(system, V))
+
+# change the admittance matrix with the setter and estimate the state again with the same measurement layout
+system.Ymatrix = system.Ymatrix * 1.5
+V, _ = nv_powerflow.solve_voltages(system)
+Vest = nv_state_estimator.DsseCall(system, create_measurements(system, V)).get_voltages()
+
+# new system with the changed admittance matrix
+new_system = load_system(1.5)
+V_new, _ = nv_powerflow.solve_voltages(new_system)
+Vest_new = nv_state_estimator.DsseCall(new_system, create_measurements(new_system, V_new)).get_voltages()
+
+error = np.amax(np.absolute(Vest - Vest_new))
+print("maximum difference of the estimated voltages: {:.3e} pu".format(error))
+assert error < 10 ** (-6)
+print("Ymatrix setter checks passed")
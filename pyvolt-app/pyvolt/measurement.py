@@ -23,83 +23,452 @@ class MeasType(Enum):
     S2_imag = 12  # Reactive Power flow at branch, measured at final node (S2.imag)
 
 
+# types of the measurements which are updated by data of a given type (see MeasurementSet.update_measurements):
+# SOGNO interface only knows Vpmu_mag and Ipmu_mag while measurement set distincts between Vpmu_mag and V_mag
+# (Ipmu_mag and I_mag)
+updated_meas_types = {
+    MeasType.Vpmu_mag: (MeasType.Vpmu_mag, MeasType.V_mag),
+    MeasType.Ipmu_mag: (MeasType.Ipmu_mag, MeasType.I_mag),
+    MeasType.S1_real: (MeasType.S1_real,),
+    MeasType.S1_imag: (MeasType.S1_imag,),
+    MeasType.Vpmu_phase: (MeasType.Vpmu_phase,),
+    MeasType.Ipmu_phase: (MeasType.Ipmu_phase,),
+}
+
+# order of the measurement types required by the SE algorithm (see MeasurementSet.getSortedIndex)
+sorted_meas_types = [MeasType.V_mag, MeasType.Sinj_real, MeasType.Sinj_imag, MeasType.S1_real, MeasType.S1_imag,
+                     MeasType.S2_real, MeasType.S2_imag, MeasType.I_mag, MeasType.Vpmu_mag, MeasType.Vpmu_phase,
+                     MeasType.Ipmu_mag, MeasType.Ipmu_phase]
+sorted_meas_codes = np.array([meas_type.value for meas_type in sorted_meas_types])
+# meas_type_rank[meas_type.value]: position of meas_type in sorted_meas_types
+meas_type_rank = np.zeros(max(meas_type.value for meas_type in MeasType) + 1, dtype=int)
+meas_type_rank[sorted_meas_codes] = np.arange(len(sorted_meas_types))
+
+
+def spawn_random_generators(seed, generators_num):
+    """
+    return a list with generators_num independent random generators (numpy.random.Generator), e.g. for
+    parallel workers of a Monte Carlo study (see MeasurementSet.meas_creation)
+
+    @param seed: None, int or numpy.random.SeedSequence
+    @param generators_num: number of generators
+    """
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    return [np.random.default_rng(child) for child in seed.spawn(generators_num)]
+
+
 class Measurement:
     def __init__(self, element, element_type, meas_type, meas_value_ideal, unc):
         """
         Creates a measurement, which is used by the estimation module. Possible types of measurements are: v, p, q, i, Vpmu and Ipmu
+        The data of the measurement is stored in a MeasurementSet, objects of class Measurement are views on
+        one entry of the arrays of a MeasurementSet (a measurement created directly is stored in its own set)
         @element: pointer to the topology_node / topology_branch (object of class network.Node / network.Branch)
         @element_type: clarifies which type of element is considered (object of enum ElemType, e.g. ElemType.Node)
         @meas_type: clarifies which quantity is measured (object of enum MeasType, e.g. MeasType.V_mag)
         @meas_value_ideal: ideal measurement value (usually result of a powerflow calculation)
         @unc: measurement uncertainty in percent
         """
+        measurement_set = MeasurementSet()
+        measurement_set.create_measurement(element, element_type, meas_type, meas_value_ideal, unc)
+        self.measurement_set = measurement_set
+        self.index = 0
 
-        if not isinstance(element_type, ElemType):
-            raise Exception("elem_type must be an object of class ElemType")
+    @staticmethod
+    def view(measurement_set, index):
+        """
+        return an object of class Measurement for the entry "index" of the arrays of measurement_set
+        """
+        measurement = Measurement.__new__(Measurement)
+        measurement.measurement_set = measurement_set
+        measurement.index = index
+        return measurement
 
-        if not isinstance(meas_type, MeasType):
-            raise Exception("meas_type must be an object of class MeasType")
+    @property
+    def element(self):
+        return self.measurement_set.elements[self.index]
+
+    @property
+    def element_type(self):
+        return ElemType(self.measurement_set.element_type[self.index])
+
+    @property
+    def meas_type(self):
+        return MeasType(self.measurement_set.meas_type[self.index])
+
+    @property
+    def meas_value_ideal(self):
+        return self.measurement_set.meas_value_ideal[self.index]
+
+    @meas_value_ideal.setter
+    def meas_value_ideal(self, value):
+        self.measurement_set.meas_value_ideal[self.index] = value
+
+    @property
+    def meas_value(self):
+        """
+        measured value (affected by uncertainty)
+        """
+        return self.measurement_set.meas_value[self.index]
+
+    @meas_value.setter
+    def meas_value(self, value):
+        self.measurement_set.meas_value[self.index] = value
+
+    @property
+    def std_dev(self):
+        return self.measurement_set.std_dev[self.index]
+
+    @std_dev.setter
+    def std_dev(self, value):
+        self.measurement_set.std_dev[self.index] = value
+
+
+class MeasurementList(list):
+    def __init__(self, measurement_set, measurements=()):
+        """
+        List of the measurements of a MeasurementSet (objects of class Measurement which are views on its arrays),
+        returned by MeasurementSet.measurements
+        append, extend and += add copies of the measurements to the set, the other modifications of the list
+        raise an Exception (use the setter MeasurementSet.measurements to replace the measurements)
+        """
+        list.__init__(self, measurements)
+        self.measurement_set = measurement_set
+
+    def append(self, measurement):
+        self.measurement_set.add_measurements([measurement])
+
+    def extend(self, measurements):
+        self.measurement_set.add_measurements(measurements)
+
+    def __iadd__(self, measurements):
+        self.measurement_set.add_measurements(measurements)
+        return self
+
+    def _read_only(self, *args, **kwargs):
+        raise Exception("the measurements of a MeasurementSet can only be added with append, extend or +=, "
+                        "use the setter MeasurementSet.measurements to replace them")
 
-        self.element = element
-        self.element_type = element_type
-        self.meas_type = meas_type
-        self.meas_value_ideal = meas_value_ideal
-        self.std_dev = unc / 300
-        self.meas_value = 0.0  # measured values (affected by uncertainty)
+    insert = remove = pop = clear = sort = reverse = __setitem__ = __delitem__ = __imul__ = _read_only
 
 
 class MeasurementSet:
     def __init__(self):
-        self.measurements = []  # array with all measurements
+        """
+        Set of measurements stored column-wise: the list elements contains the measured elements
+        (objects of class network.Node / network.Branch), the other data of the measurements is stored in
+        np.arrays with one entry per measurement (element_index, element_type, meas_type, meas_value_ideal,
+        meas_value, std_dev). MeasurementSet.measurements returns objects of class Measurement which are
+        views on these arrays
+        """
+        self.elements = []
+        # the arrays are allocated with a capacity >= len(self.elements), see create_measurement
+        self.arrays = {"element_index": np.zeros(0, dtype=int), "element_type": np.zeros(0, dtype=int),
+                       "meas_type": np.zeros(0, dtype=int), "meas_value_ideal": np.zeros(0),
+                       "meas_value": np.zeros(0), "std_dev": np.zeros(0)}
+        self.views = MeasurementList(self)
+        self.clear_caches()
+
+    @property
+    def element_index(self):
+        """
+        np.array with element.index of the measured elements (-1 for elements without index)
+        It is read again from the elements, the node indices change when the system is re-enumerated
+        (see network.System.reindex_nodes_list)
+        """
+        element_index = self.arrays["element_index"][:len(self.elements)]
+        element_index[:] = [getattr(element, "index", -1) for element in self.elements]
+        return element_index
+
+    @property
+    def element_type(self):
+        """
+        np.array with the codes of the ElemType of the measurements
+        """
+        return self.arrays["element_type"][:len(self.elements)]
+
+    @element_type.setter
+    def element_type(self, values):
+        self.arrays["element_type"][:len(self.elements)] = values
+
+    @property
+    def meas_type(self):
+        """
+        np.array with the codes of the MeasType of the measurements
+        """
+        return self.arrays["meas_type"][:len(self.elements)]
+
+    @meas_type.setter
+    def meas_type(self, values):
+        self.arrays["meas_type"][:len(self.elements)] = values
+        self.clear_caches()
+
+    @property
+    def meas_value_ideal(self):
+        """
+        np.array with the ideal measurement values
+        """
+        return self.arrays["meas_value_ideal"][:len(self.elements)]
+
+    @meas_value_ideal.setter
+    def meas_value_ideal(self, values):
+        self.arrays["meas_value_ideal"][:len(self.elements)] = values
+
+    @property
+    def meas_value(self):
+        """
+        np.array with the measured values (affected by uncertainty)
+        """
+        return self.arrays["meas_value"][:len(self.elements)]
+
+    @meas_value.setter
+    def meas_value(self, values):
+        self.arrays["meas_value"][:len(self.elements)] = values
+
+    @property
+    def std_dev(self):
+        """
+        np.array with the standard deviations of the measurements
+        """
+        return self.arrays["std_dev"][:len(self.elements)]
+
+    @std_dev.setter
+    def std_dev(self, values):
+        self.arrays["std_dev"][:len(self.elements)] = values
+
+    @property
+    def measurements(self):
+        """
+        list with all measurements (object of class MeasurementList with objects of class Measurement),
+        measurements can be added with append, extend or +=
+        """
+        if len(self.views) != len(self.elements):
+            self.views = MeasurementList(self, [Measurement.view(self, index)
+                                                for index in range(len(self.elements))])
+        return self.views
+
+    @measurements.setter
+    def measurements(self, measurements):
+        """
+        replace all measurements of the set by copies of the measurements in the list "measurements"
+        (objects of class Measurement, possibly of this or of other measurement sets)
+        """
+        if measurements is self.views:
+            # e.g. measurement_set.measurements += measurements, the measurements were added by MeasurementList
+            return
+        elements, rows = self._get_rows(measurements)
+        self.elements = []
+        self.arrays = rows
+        self.elements = elements
+        self.views = MeasurementList(self)
+        self.clear_caches()
+
+    def _get_rows(self, measurements):
+        """
+        return the elements and a copy of the data (dict name --> np.array, see self.arrays) of the measurements
+        (objects of class Measurement, possibly of this or of other measurement sets)
+        """
+        measurements = list(measurements)
+        elements = [measurement.element for measurement in measurements]
+        rows = {}
+        for name in self.arrays:
+            rows[name] = np.array([measurement.measurement_set.arrays[name][measurement.index]
+                                   for measurement in measurements], dtype=self.arrays[name].dtype)
+        return elements, rows
+
+    def add_measurements(self, measurements):
+        """
+        append copies of the measurements (objects of class Measurement, possibly of this or of other measurement
+        sets) to the set
+        """
+        elements, rows = self._get_rows(measurements)
+        self._append_rows(elements, rows)
+
+    def _append_rows(self, elements, rows):
+        """
+        append measurements to the set
+        :param elements: list with the measured elements
+        :param rows: dict name --> np.array with the data of the measurements (see self.arrays)
+        """
+        start = len(self.elements)
+        end = start + len(elements)
+        if end > len(self.arrays["meas_type"]):
+            # the capacity of the arrays is (at least) doubled
+            capacity = max(end, 2 * start, 8)
+            for name in self.arrays:
+                array = np.zeros(capacity, dtype=self.arrays[name].dtype)
+                array[:start] = self.arrays[name][:start]
+                self.arrays[name] = array
+        for name in self.arrays:
+            self.arrays[name][start:end] = rows[name]
+        self.elements.extend(elements)
+        if len(self.views) == start:
+            list.extend(self.views, [Measurement.view(self, index) for index in range(start, end)])
+        self.clear_caches()
+
+    def __len__(self):
+        return len(self.elements)
+
+    def __getstate__(self):
+        # the views are not pickled, they are created again when needed (see measurements)
+        state = self.__dict__.copy()
+        state["views"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.views = MeasurementList(self)
+
+    def clear_caches(self):
+        """
+        reset the data derived from the elements and types of the measurements, it is calculated again when needed
+        """
+        # dict (element uuid, MeasType) --> indices of the measurements and value of 1 pu in SI units of each
+        # measurement (see get_measurement_index and get_si_base)
+        self.measurement_index = None
+        self.si_base = None
+        # indices of the measurements sorted by type, number of measurements of each type and position of the
+        # first measurement of each type in sorted_index (see sort_by_type)
+        self.sorted_index = None
+        self.type_counts = None
+        self.type_offsets = None
+
+    def sort_by_type(self):
+        """
+        calculate the indices of the measurements sorted in the order of sorted_meas_types with one stable
+        argsort (the measurements of one type keep their order), the number of measurements of each type and
+        the position of the first measurement of each type in the sorted indices
+        """
+        if self.sorted_index is None:
+            codes = self.meas_type
+            self.sorted_index = np.argsort(meas_type_rank[codes], kind="stable")
+            self.sorted_index.flags.writeable = False
+            self.type_counts = np.bincount(codes, minlength=len(meas_type_rank))
+            sorted_counts = self.type_counts[sorted_meas_codes]
+            self.type_offsets = np.zeros(len(meas_type_rank), dtype=int)
+            self.type_offsets[sorted_meas_codes] = np.cumsum(sorted_counts) - sorted_counts
 
     def create_measurement(self, element, element_type, meas_type, meas_value_ideal, unc):
         """
         to add elements to the measurements array
         """
-        self.measurements.append(Measurement(element, element_type, meas_type, meas_value_ideal, unc))
+        if not isinstance(element_type, ElemType):
+            raise Exception("elem_type must be an object of class ElemType")
+
+        if not isinstance(meas_type, MeasType):
+            raise Exception("meas_type must be an object of class MeasType")
+
+        self._append_rows([element], {"element_index": [getattr(element, "index", -1)],
+                                      "element_type": [element_type.value],
+                                      "meas_type": [meas_type.value],
+                                      "meas_value_ideal": [meas_value_ideal],
+                                      "meas_value": [0.0],  # measured values (affected by uncertainty)
+                                      "std_dev": [unc / 300]})
+
+    def get_subset(self, index):
+        """
+        return a new MeasurementSet with copies of the measurements self.measurements[index[k]]
+        """
+        index = np.asarray(index, dtype=int)
+        measurement_set = MeasurementSet()
+        measurement_set.elements = [self.elements[i] for i in index]
+        for name in self.arrays:
+            measurement_set.arrays[name] = self.arrays[name][:len(self.elements)][index]
+        return measurement_set
+
+    def get_measurement_index(self):
+        """
+        return dict (element uuid, MeasType) --> np.array with the indices of the measurements of type MeasType
+        at the element with uuid "element uuid"
+        """
+        if self.measurement_index is None:
+            self.measurement_index = {}
+            for index, (element, meas_type) in enumerate(zip(self.elements, self.meas_type)):
+                key = (element.uuid, MeasType(meas_type))
+                self.measurement_index.setdefault(key, []).append(index)
+            for key, indices in self.measurement_index.items():
+                self.measurement_index[key] = np.array(indices, dtype=int)
+        return self.measurement_index
+
+    def get_si_base(self):
+        """
+        return np.array with the value of 1 pu in SI units for each measurement, assuming single-phase values
+        from the devices and three-phase base values from CIM:
+        voltages in V (baseVoltage in kV), currents in A (base_current in kA), powers in W or var
+        (base_apparent_power in MW) and 1 for phases
+        """
+        if self.si_base is None:
+            self.si_base = np.ones(len(self.elements))
+            for types, base in (([MeasType.V_mag, MeasType.Vpmu_mag],
+                                 lambda element: element.baseVoltage / np.sqrt(3) * 1000),
+                                ([MeasType.I_mag, MeasType.Ipmu_mag],
+                                 lambda element: element.base_current * 1000),
+                                ([MeasType.Sinj_real, MeasType.Sinj_imag, MeasType.S1_real, MeasType.S1_imag,
+                                  MeasType.S2_real, MeasType.S2_imag],
+                                 lambda element: element.base_apparent_power / 3 * 1e6)):
+                index = np.flatnonzero(np.isin(self.meas_type, [meas_type.value for meas_type in types]))
+                self.si_base[index] = [base(self.elements[i]) for i in index]
+        return self.si_base
+
+    def update_measurements(self, element_uuids, meas_types=None, meas_data=None, value_in_pu=True):
+        """
+        to update meas_value of several measurements at once, without printing.
+        The data of a type updates the same measurements as in update_measurement
+        (e.g. data of type Vpmu_mag updates the measurements of type Vpmu_mag and V_mag of the element)
+
+        @param element_uuids: list with the uuids of the measured elements
+                              or dict {(element_uuid, meas_type): meas_data}
+        @param meas_types: list with the MeasType of the data or a single MeasType for all data
+        @param meas_data: array with the new values
+        @param value_in_pu: False if meas_data are in SI units (see get_si_base)
+        return: number of updated measurements
+        """
+        if isinstance(element_uuids, dict):
+            meas_data = list(element_uuids.values())
+            meas_types = [key[1] for key in element_uuids.keys()]
+            element_uuids = [key[0] for key in element_uuids.keys()]
+        elif isinstance(meas_types, MeasType):
+            meas_types = [meas_types] * len(element_uuids)
+        meas_data = np.asarray(meas_data, dtype=float)
+
+        # get the indices of the measurements and of the corresponding data
+        measurement_index = self.get_measurement_index()
+        meas_indices = []
+        data_indices = []
+        for data_index, (element_uuid, meas_type) in enumerate(zip(element_uuids, meas_types)):
+            for updated_type in updated_meas_types.get(meas_type, ()):
+                indices = measurement_index.get((element_uuid, updated_type))
+                if indices is not None:
+                    meas_indices.append(indices)
+                    data_indices.append(np.full(len(indices), data_index))
+        if len(meas_indices) == 0:
+            return 0
+        meas_indices = np.concatenate(meas_indices)
+        values = meas_data[np.concatenate(data_indices)]
+
+        if not value_in_pu:
+            values = values / self.get_si_base()[meas_indices]
+        self.meas_value[meas_indices] = values
+
+        return len(meas_indices)
 
     def update_measurement(self, element_uuid, meas_type, meas_data, value_in_pu=True):
         """
         to update meas_value of a specific measurement object in the measurements array
+        (see update_measurements to update several measurements without printing)
         """
 
         # only update measurements that are already included in the measurements set
-        for meas in self.measurements:
-            if meas.element.uuid == element_uuid:
-                # special case for voltage magnitude: SOGNO interface only knows Vpmu_mag while measurement set distincts between Vpmu_mag and V_mag
-                if meas_type == MeasType.Vpmu_mag and (meas.meas_type == MeasType.Vpmu_mag or meas.meas_type == MeasType.V_mag):
-                    # volt pu conversion assuming that meas_data from device are in volts and single-phase value according to sogno interface
-                    # while baseVoltage from CIM in [kV] and three-phase value
-                    if not value_in_pu:
-                        meas_value_pu = meas_data / (meas.element.baseVoltage / np.sqrt(3) * 1000)
-                    else:
-                        meas_value_pu = meas_data
-                    print("Updating measurement value for {} of type {} from {} to {}".format(meas.element.uuid, str(meas.meas_type), meas.meas_value, meas_value_pu))                    
-                    meas.meas_value = meas_value_pu                
-                # special case for voltage magnitude: SOGNO interface only knows Ipmu_mag while measurement set distincts between Ipmu_mag and I_mag
-                elif meas_type == MeasType.Ipmu_mag and (meas.meas_type == MeasType.Ipmu_mag or meas.meas_type == MeasType.I_mag):
-                    # current pu conversion assuming that meas_data from device are in A and single-phase value according to sogno interface
-                    # while base_current in [kA]
-                    if not value_in_pu:
-                        meas_value_pu = meas_data / (meas.element.base_current * 1000)
-                    else:
-                        meas_value_pu = meas_data
-                    print("Updating measurement value for {} of type {} from {} to {}".format(meas.element.uuid, str(meas.meas_type), meas.meas_value, meas_value_pu))
-                    meas.meas_value = meas_value_pu
-                # case for other measurements 
-                elif (meas_type == meas.meas_type and (meas_type == MeasType.S1_real or meas_type == MeasType.S1_imag)): 
-                    # power pu conversion assuming that meas_data from device are in watts and single-phase value according to sogno interface
-                    # while baseApparent power in [MW] and three-phase value
-                    if not value_in_pu:    
-                        meas_value_pu = meas_data / (meas.element.base_apparent_power / 3 * 1e6)
-                    else:
-                        meas_value_pu = meas_data
-                    print("Updating measurement value for {} of type {} from {} to {}".format(meas.element.uuid, str(meas.meas_type), meas.meas_value, meas_value_pu))
-                    meas.meas_value = meas_value_pu
-                elif (meas_type == meas.meas_type and (meas_type == MeasType.Vpmu_phase or meas_type == MeasType.Ipmu_phase)):
-                    print("Updating measurement value for {} of type {} from {} to {}".format(meas.element.uuid, str(meas.meas_type), meas.meas_value, meas_data))
-                    meas.meas_value = meas_data
-
+        measurement_index = self.get_measurement_index()
+        for updated_type in updated_meas_types.get(meas_type, ()):
+            for index in measurement_index.get((element_uuid, updated_type), []):
+                if not value_in_pu:
+                    meas_value_pu = meas_data / self.get_si_base()[index]
+                else:
+                    meas_value_pu = meas_data
+                print("Updating measurement value for {} of type {} from {} to {}".format(element_uuid, str(updated_type), self.meas_value[index], meas_value_pu))
+                self.meas_value[index] = meas_value_pu
 
     def read_measurements_from_file(self, powerflow_results, file_name):
         """
@@ -194,34 +563,52 @@ class MeasurementSet:
     def meas_creation(self, dist="normal", seed=None, type="simulation"):
         """
         It calculates the measured values (affected by uncertainty) at the measurement points
-        which distribution should be used? if gaussian --> stddev must be divided by 3
-
-        @param seed: Seed for RandomState (to make the random numbers predictable)
-                     Must be convertible to 32 bit unsigned integers.
-        @param seed: - normal: use normal distribution (-->std_dev are divided by 3)
-                     - uniform: use normal distribution
+        The deviation zdev of a measurement is meas_value_ideal * std_dev (std_dev for phase measurements).
+
+        @param seed: seed of the random numbers (to make the random numbers predictable): None, int,
+                     numpy.random.SeedSequence or numpy.random.Generator (see numpy.random.default_rng),
+                     e.g. one of the generators returned by spawn_random_generators for parallel workers
+        @param dist: - normal: normal distribution with standard deviation 0, i.e. the measured values are the
+                       ideal values (behaviour of the previous versions, kept for compatibility)
+                     - gaussian: normal distribution with standard deviation zdev
+                     - uniform: uniform distribution in [-3 * zdev, 3 * zdev]
+                     a ValueError is raised for other values
+        @param type: - simulation: ideal values affected by random errors
+                     - field: ideal values
         """
         if type == "simulation":
-            np.random.seed(seed)
-            if dist == "normal":
-                err_pu = np.random.normal(0, 0, len(self.measurements))
-                for index, measurement in enumerate(self.measurements):
-                    if measurement.meas_type not in [MeasType.Ipmu_phase, MeasType.Vpmu_phase]:
-                        zdev = measurement.meas_value_ideal * measurement.std_dev
-                    elif measurement.meas_type in [MeasType.Ipmu_phase, MeasType.Vpmu_phase]:
-                        zdev = measurement.std_dev
-                    measurement.meas_value = measurement.meas_value_ideal + zdev * err_pu[index]
-            elif dist == "uniform":
-                err_pu = np.random.uniform(-1, 1, len(self.measurements))
-                for index, measurement in enumerate(self.measurements):
-                    if measurement.meas_type not in [MeasType.Ipmu_phase, MeasType.Vpmu_phase]:
-                        zdev = (measurement.meas_value_ideal * measurement.std_dev)
-                    elif measurement.meas_type in [MeasType.Ipmu_phase, MeasType.Vpmu_phase]:
-                        zdev = measurement.std_dev
-                    measurement.meas_value = measurement.meas_value_ideal + np.multiply(3 * zdev, err_pu[index])
+            self.meas_value = self.get_noisy_values(dist=dist, seed=seed)
         elif type == "field":
-            for measurement in self.measurements:
-                measurement.meas_value = measurement.meas_value_ideal
+            self.meas_value = self.meas_value_ideal
+
+    def get_noisy_values(self, realizations=None, dist="normal", seed=None):
+        """
+        return the ideal values affected by random errors (see meas_creation) without changing meas_value
+
+        @param realizations: number K of realizations, None for a single realization
+        @param dist: "normal", "gaussian" or "uniform" (see meas_creation), a ValueError is raised for other values
+        @param seed: seed of the random numbers (see meas_creation)
+        return: np.array with shape (m,) for a single realization or (K, m) (m: number of measurements)
+        """
+        rng = np.random.default_rng(seed)
+        shape = (len(self.elements),) if realizations is None else (realizations, len(self.elements))
+
+        # the uncertainty of phase measurements is absolute, of all other measurements relative to the value
+        zdev = self.meas_value_ideal * self.std_dev
+        phase_index = self.getIndexOfMeasurements(MeasType.Vpmu_phase)
+        phase_index = np.concatenate((phase_index, self.getIndexOfMeasurements(MeasType.Ipmu_phase)))
+        zdev[phase_index] = self.std_dev[phase_index]
+
+        if dist == "normal":
+            # the errors have the standard deviation 0
+            return np.broadcast_to(self.meas_value_ideal, shape).copy()
+        elif dist == "gaussian":
+            err_pu = rng.standard_normal(shape)
+            return self.meas_value_ideal + zdev * err_pu
+        elif dist == "uniform":
+            err_pu = rng.uniform(-1, 1, shape)
+            return self.meas_value_ideal + 3 * zdev * err_pu
+        raise ValueError("dist must be 'normal', 'gaussian' or 'uniform'")
 
     def meas_creation_test(self, err_pu):
         """
@@ -242,107 +629,83 @@ class MeasurementSet:
         """
         return an array with all measurements of type "type" in the array MeasurementSet.measurements.
         """
-        measurements = []
-        for measurement in self.measurements:
-            if measurement.meas_type is type:
-                measurements.append(measurement)
-
-        return measurements
+        measurements = self.measurements
+        return [measurements[index] for index in self.getIndexOfMeasurements(type)]
 
     def getNumberOfMeasurements(self, type):
         """
         return number of measurements of type "type" in the array MeasurementSet.measurements
         """
-        number = 0
-        for measurement in self.measurements:
-            if measurement.meas_type is type:
-                number = number + 1
-
-        return number
+        self.sort_by_type()
+        return int(self.type_counts[type.value])
 
     def getIndexOfMeasurements(self, type):
         """
         return index of all measurements of type "type" in the array MeasurementSet.measurements
         """
-        idx = np.zeros(self.getNumberOfMeasurements(type), dtype=int)
-        i = 0
-        for index, measurement in enumerate(self.measurements):
-            if measurement.meas_type is type:
-                idx[i] = index
-                i = i + 1
-
-        return idx
+        self.sort_by_type()
+        start = self.type_offsets[type.value]
+        return self.sorted_index[start:start + self.type_counts[type.value]]
 
     def getWeightsMatrix(self):
         """
         return an array the weights (obtained as standard_deviations^-2)
         """
-        weights = np.zeros(len(self.measurements))
-        for index, measurement in enumerate(self.measurements):
-            # the weight is small and can bring instability during matrix inversion, so we "cut" everything below 10^-6
-            if measurement.std_dev < 10 ** (-6):
-                measurement.std_dev = 10 ** (-6)
-            weights[index] = (measurement.std_dev) ** (-2)
+        # the weight is small and can bring instability during matrix inversion, so we "cut" everything below 10^-6
+        std_dev = self.std_dev
+        std_dev[std_dev < 10 ** (-6)] = 10 ** (-6)
 
-        return weights
+        return std_dev ** (-2)
 
     def getMeasValues(self):
         """
         returns an array with all measured values (affected by uncertainty)
         """
-        meas_real = np.zeros(len(self.measurements))
-        for index, measurement in enumerate(self.measurements):
-            meas_real[index] = measurement.meas_value
-
-        """ Replace in meas_real amplitude and phase of Vpmu by real and imaginary part """
-        # get all measurements of type MeasType.Vpmu_mag
-        Vpmu_mag_idx = self.getIndexOfMeasurements(type=MeasType.Vpmu_mag)
-        # get all measurements of type MeasType.Vpmu_phase
-        Vpmu_phase_idx = self.getIndexOfMeasurements(type=MeasType.Vpmu_phase)
-        for vpmu_mag_index, vpmu_phase_index in zip(Vpmu_mag_idx, Vpmu_phase_idx):
-            vamp = self.measurements[vpmu_mag_index].meas_value
-            vtheta = self.measurements[vpmu_phase_index].meas_value
-            meas_real[vpmu_mag_index] = vamp * np.cos(vtheta)
-            meas_real[vpmu_phase_index] = vamp * np.sin(vtheta)
-
-        """ Replace in z amplitude and phase of Ipmu by real and imaginary part """
-        # get all measurements of type MeasType.Ipmu_mag
-        Ipmu_mag_idx = self.getIndexOfMeasurements(type=MeasType.Ipmu_mag)
-        # get all measurements of type MeasType.Ipmu_phase
-        Ipmu_phase_idx = self.getIndexOfMeasurements(type=MeasType.Ipmu_phase)
-        for ipmu_mag_index, ipmu_phase_index in zip(Ipmu_mag_idx, Ipmu_phase_idx):
-            iamp = self.measurements[ipmu_mag_index].meas_value
-            itheta = self.measurements[ipmu_phase_index].meas_value
-            meas_real[ipmu_mag_index] = iamp * np.cos(itheta)
-            meas_real[ipmu_phase_index] = iamp * np.sin(itheta)
+        meas_real = self.meas_value.copy()
+
+        """ Replace in meas_real amplitude and phase of Vpmu and Ipmu by real and imaginary part """
+        for type_mag, type_phase in ((MeasType.Vpmu_mag, MeasType.Vpmu_phase),
+                                     (MeasType.Ipmu_mag, MeasType.Ipmu_phase)):
+            index_mag = self.getIndexOfMeasurements(type=type_mag)
+            index_phase = self.getIndexOfMeasurements(type=type_phase)
+            pairs_num = min(len(index_mag), len(index_phase))
+            index_mag = index_mag[:pairs_num]
+            index_phase = index_phase[:pairs_num]
+            amp = self.meas_value[index_mag]
+            theta = self.meas_value[index_phase]
+            meas_real[index_mag] = amp * np.cos(theta)
+            meas_real[index_phase] = amp * np.sin(theta)
 
         return meas_real
     
-    def getSortedMeasurementSet(self):
+    def getSortedIndex(self):
         """
-        Sorts measurements in the order required by the SE algorithm
+        return the indices of the measurements in the order required by the SE algorithm
+        (getSortedMeasurementSet().measurements[k] is a copy of self.measurements[index[k]])
         """
-        
-        sortedMeasurementSet = MeasurementSet()
-
-        # Sort measurements  in the order required by the SE algorithm
         # Required order: Vmag, Pinj, Qinj, P1, Q1, P2, Q2, Imag, Vpmu_mag, Vpmu_phase, Ipmu_mag, Ipmu_phase
-        for type_meas in [MeasType.V_mag, MeasType.Sinj_real, MeasType.Sinj_imag, MeasType.S1_real, MeasType.S1_imag, \
-                         MeasType.S2_real, MeasType.S2_imag, MeasType.I_mag, MeasType.Vpmu_mag, MeasType.Vpmu_phase, MeasType.Ipmu_mag, MeasType.Ipmu_phase]:
-            sortedMeasurementSet.measurements += self.getMeasurementsOfType(type_meas)
-        return sortedMeasurementSet
+        self.sort_by_type()
+        return self.sorted_index
 
+    def getSortedMeasurementSet(self):
+        """
+        Sorts measurements in the order required by the SE algorithm
+        return: new MeasurementSet with copies of the measurements
+        """
+        measurement_set = self.get_subset(self.getSortedIndex())
+        # the new set is already sorted, the counts and offsets of the types are the same
+        measurement_set.sorted_index = np.arange(len(measurement_set))
+        measurement_set.sorted_index.flags.writeable = False
+        measurement_set.type_counts = self.type_counts
+        measurement_set.type_offsets = self.type_offsets
+        return measurement_set
 
     def getStd_Dev(self):
         """
         for test purposes
         returns an array with all standard deviations
         """
-        std_dev = np.zeros(len(self.measurements))
-        for index, measurement in enumerate(self.measurements):
-            std_dev[index] = measurement.std_dev
-
-        return std_dev
+        return self.std_dev.copy()
 
     def getIdealMeasValues(self, type=None):
         """
@@ -350,39 +713,25 @@ class MeasurementSet:
         returns an array with all measured values
         """
         if type is None:
-            meas_val = np.zeros(len(self.measurements))
-            for index, measurement in enumerate(self.measurements):
-                meas_val[index] = measurement.meas_value_ideal
-        else:
-            meas_val = np.zeros(self.getNumberOfMeasurements(type=type))
-            idx = 0
-            for index, measurement in enumerate(self.measurements):
-                if measurement.meas_type is type:
-                    meas_val[idx] = measurement.meas_value_ideal
-                    idx += 1
-
-        return meas_val
+            return self.meas_value_ideal.copy()
+        return self.meas_value_ideal[self.getIndexOfMeasurements(type)]
 
     def getMeasValuesTest(self, type=None):
         """
         returns an array with all measured values (affected by uncertainty)
         """
         if type is None:
-            meas_real = np.zeros(len(self.measurements))
-            for index, measurement in enumerate(self.measurements):
-                meas_real[index] = measurement.meas_value
-        else:
-            meas_real = np.zeros(self.getNumberOfMeasurements(type=type))
-            idx = 0
-            for index, measurement in enumerate(self.measurements):
-                if measurement.meas_type is type:
-                    meas_real[idx] = measurement.meas_value
-                    idx += 1
-
-        return meas_real
+            return self.meas_value.copy()
+        return self.meas_value[self.getIndexOfMeasurements(type)]
 
     @staticmethod
     def mergeMeasurementSets(meas_set_1, meas_set_2):
+        """
+        return a new MeasurementSet with copies of the measurements of meas_set_1 and meas_set_2
+        """
         meas_set = MeasurementSet()
-        meas_set.measurements = meas_set_1.measurements + meas_set_2.measurements
+        meas_set.elements = meas_set_1.elements + meas_set_2.elements
+        for name in meas_set.arrays:
+            meas_set.arrays[name] = np.concatenate((meas_set_1.arrays[name][:len(meas_set_1.elements)],
+                                                    meas_set_2.arrays[name][:len(meas_set_2.elements)]))
         return meas_set
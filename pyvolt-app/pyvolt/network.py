@@ -1,5 +1,11 @@
+import copy
 import logging
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components, reverse_cuthill_mckee
 from enum import Enum
 
 
@@ -64,15 +70,18 @@ class Branch():
 
 
 class Breaker():
-    def __init__(self, from_node, to_node, is_open=True):
+    def __init__(self, from_node, to_node, is_open=True, system=None):
         """
         :param from_node:
         :param to_node:
         :param is_open: True if the breaker is considered open and False if the broker is closed 
+        :param system: System which contains the breaker, it is updated when the breaker is opened or closed
+                       (see System.update_breaker_topology), None if the caller runs System.Ymatrix_calc
         """
         self.from_node = from_node
         self.to_node = to_node
         self.is_open = is_open
+        self.system = system
 
     def __str__(self):
         string = 'class=Breaker\n'
@@ -84,36 +93,288 @@ class Breaker():
     def open_breaker(self):
         self.is_open = True
         self.to_node.ideal_connected_with = ''
+        if self.system is not None:
+            self.system.update_breaker_topology(self)
 
     def close_breaker(self):
         self.is_open = False
         self.to_node.ideal_connected_with = self.from_node.uuid
+        if self.system is not None:
+            self.system.update_breaker_topology(self)
+
+
+class SystemArrays():
+    def __init__(self, system):
+        """
+        Array representation of a System, used as data source for the calculations
+        Node quantities are stored in the order of node.index (only for the nodes that are not
+        ideally connected to another node), branch quantities in the order of system.branches.
+        It is (re-)built by System.Ymatrix_calc and updated by System.update_breaker_topology, values which
+        can change between two calculations (node types, voltages and power injections) are updated with
+        update_node_values.
+        Solvers can store data which only depends on the topology (e.g. matrix factorizations) in
+        solver_cache, it is discarded when the topology changes.
+        :param system: object of class System with up to date node indices
+        """
+        self.solver_cache = {}
+        self.nodes = [system.get_node_by_index(index) for index in range(system.get_nodes_num())]
+        self.nodes_num = len(self.nodes)
+        self.node_base_voltage = np.array([node.baseVoltage for node in self.nodes], dtype=float)
+        self.node_base_apparent_power = np.array([node.base_apparent_power for node in self.nodes], dtype=float)
+        self.node_base_current = np.array([node.base_current for node in self.nodes], dtype=float)
+        self.update_node_values()
+
+        # position in system.nodes of each node in self.nodes, node.index of each node in system.nodes, position
+        # of the node each node of system.nodes is ideally connected with (-1 if none), position in
+        # system.nodes of the start and end node of each branch and breaker configuration (used to update
+        # the arrays when a breaker is operated, see System.update_breaker_topology)
+        positions = {id(node): position for position, node in enumerate(system.nodes)}
+        uuid_positions = {}
+        for position, node in enumerate(system.nodes):
+            uuid_positions.setdefault(node.uuid, position)
+        self.node_position = np.array([positions[id(node)] for node in self.nodes], dtype=int)
+        self.node_list_index = np.array([node.index for node in system.nodes], dtype=int)
+        self.node_connected_position = np.array([uuid_positions.get(node.ideal_connected_with, -1)
+                                                 if node.ideal_connected_with != '' else -1
+                                                 for node in system.nodes], dtype=int)
+        self.branch_start_position = np.array([positions[id(branch.start_node)] for branch in system.branches],
+                                              dtype=int)
+        self.branch_end_position = np.array([positions[id(branch.end_node)] for branch in system.branches],
+                                            dtype=int)
+        self.breaker_configuration = system.get_breaker_configuration()
+        self.breakers_num = len(system.breakers)
+
+        self.branches_num = len(system.branches)
+        self.branch_start = np.array([branch.start_node.index for branch in system.branches], dtype=int)
+        self.branch_end = np.array([branch.end_node.index for branch in system.branches], dtype=int)
+        self.branch_r_pu = np.array([branch.r_pu for branch in system.branches], dtype=float)
+        self.branch_x_pu = np.array([branch.x_pu for branch in system.branches], dtype=float)
+        self.branch_y_pu = np.array([branch.y_pu for branch in system.branches], dtype=complex)
+        self.branch_base_voltage = np.array([branch.baseVoltage for branch in system.branches], dtype=float)
+        self.branch_base_apparent_power = np.array([branch.base_apparent_power for branch in system.branches],
+                                                   dtype=float)
+        self.branch_base_current = np.array([branch.base_current for branch in system.branches], dtype=float)
+
+    def update_node_values(self):
+        """
+        read node types (as BusType values), voltages and power injections (in per unit) from the nodes
+        """
+        self.node_type = np.array([node.type.value for node in self.nodes], dtype=int)
+        self.node_voltage_pu = np.array([node.voltage_pu for node in self.nodes], dtype=complex)
+        self.node_power_pu = np.array([node.power_pu for node in self.nodes], dtype=complex)
+
+
+class TopologyCache():
+    def __init__(self, size=8):
+        """
+        LRU cache of the topology dependent data of a System: admittance matrices and system.arrays (node indices,
+        branch indices and solver_cache with the factorizations of the solvers), keyed by the breaker
+        configuration (see System.get_breaker_configuration)
+        :param size: maximum number of stored configurations, 0 disables the cache
+        """
+        self.size = size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, node_connected_position):
+        """
+        return the entry stored for the breaker configuration key or None
+        :param node_connected_position: expected SystemArrays.node_connected_position of the entry (the same breaker
+                                        configuration can result from different ideal connections if several
+                                        breakers end at the same node)
+        """
+        entry = self.entries.get(key)
+        if entry is None or not np.array_equal(entry["arrays"].node_connected_position, node_connected_position):
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key, entry):
+        """
+        store entry for the breaker configuration key, the least recently used entries are removed
+        if there are more than self.size entries
+        """
+        if self.size <= 0:
+            return
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+
+class Island():
+    def __init__(self, system, node_indices, branch_indices):
+        """
+        Electrical island of a System (see System.split_islands)
+        :param system: independent System with copies of the nodes and branches of the island
+        :param node_indices: np.array with the index (node.index) in the split system of each node of the island,
+                             in the order of the indices in the island (system.arrays.nodes)
+        :param branch_indices: np.array with the position in the list branches of the split system of each
+                               branch of system.branches
+        """
+        self.system = system
+        self.node_indices = node_indices
+        self.branch_indices = branch_indices
+        # islands without SLACK node (and without PV node which could be used as SLACK) are not energized
+        self.energized = any(node.type == BusType.SLACK for node in system.nodes)
+
+
+def run_islands(function, arguments, processes=None):
+    """
+    call function(*args) for each tuple args of the list arguments (e.g. one call per island) and return the list
+    of the results
+    The calls are run concurrently in a process pool if there are several calls and processes != 1, so function
+    and its arguments must be picklable (e.g. function is defined at module level).
+    :param processes: number of worker processes, None for os.cpu_count(), 1 to run the calls one after the
+                      other in this process
+    """
+    if processes is None:
+        processes = os.cpu_count() or 1
+    processes = min(processes, len(arguments))
+    if processes <= 1:
+        return [function(*args) for args in arguments]
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = [executor.submit(function, *args) for args in arguments]
+        return [future.result() for future in futures]
 
 
 class System():
-    def __init__(self):
+    def __init__(self, topology_cache_size=8, node_ordering="natural"):
+        """
+        :param topology_cache_size: number of breaker configurations whose admittance matrix, node indices and
+                                    solver data are kept in system.topology_cache (see TopologyCache)
+        :param node_ordering: numbering of the nodes (see reindex_nodes_list), Ymatrix_calc must be called if it
+                              is changed
+                              - "natural": order of system.nodes (e.g. order of the CIM file)
+                              - "rcm": reverse Cuthill-McKee ordering of the branch graph, which reduces the
+                                fill-in of the factorizations of the admittance matrix and of the Jacobians
+        """
+        if node_ordering not in ("natural", "rcm"):
+            raise Exception("node_ordering must be 'natural' or 'rcm'")
+        self.node_ordering = node_ordering
         self.nodes = []
         self.branches = []
         self.breakers = []
-        self.Ymatrix = np.zeros([], dtype=complex)
-        self.Bmatrix = np.zeros([], dtype=complex)
+        self.arrays = None
+        self.topology_cache = TopologyCache(topology_cache_size)
+        self.Ymatrix_sparse = sp.csr_matrix((0, 0), dtype=complex)
+        self.Bmatrix_sparse = sp.csr_matrix((0, 0), dtype=complex)
+        self._Ymatrix = None
+        self._Bmatrix = None
+        # lookup tables uuid-->node, index-->node and uuid-->branch
+        self._nodes_by_uuid = {}
+        self._nodes_by_index = {}
+        self._branches_by_uuid = {}
+        self._lookup_sizes = (0, 0)
+        # position tables id(node)-->position in system.nodes, id(breaker)-->position in system.breakers and
+        # id(node)-->positions of the breakers connected to the node (see System._get_position)
+        self._node_positions = {}
+        self._breaker_positions = {}
+        self._breakers_by_node = {}
 
-    def get_node_by_uuid(self, node_uuid):
+    @property
+    def Ymatrix(self):
+        """
+        Dense admittance matrix
+        It is only created (from Ymatrix_sparse) when it is requested for the first time
+        """
+        if self._Ymatrix is None:
+            self._Ymatrix = self.Ymatrix_sparse.toarray()
+        return self._Ymatrix
+
+    @Ymatrix.setter
+    def Ymatrix(self, Ymatrix):
+        self.Ymatrix_sparse = sp.csr_matrix(Ymatrix, dtype=complex)
+        self._Ymatrix = None
+        self._discard_matrix_data()
+
+    @property
+    def Bmatrix(self):
+        """
+        Dense shunt susceptance matrix
+        It is only created (from Bmatrix_sparse) when it is requested for the first time
+        """
+        if self._Bmatrix is None:
+            self._Bmatrix = self.Bmatrix_sparse.toarray()
+        return self._Bmatrix
+
+    @Bmatrix.setter
+    def Bmatrix(self, Bmatrix):
+        self.Bmatrix_sparse = sp.csr_matrix(Bmatrix, dtype=complex)
+        self._Bmatrix = None
+        self._discard_matrix_data()
+
+    def _discard_matrix_data(self):
+        """
+        discard the data calculated from the previous admittance matrices after a matrix was set directly:
+        solver caches of system.arrays (e.g. factorizations and the state estimator plan) and the matrices
+        stored in the topology cache
+        """
+        if self.arrays is not None:
+            self.arrays.solver_cache = {}
+        self.topology_cache.clear()
+
+    def update_lookup_tables(self):
+        """
+        (Re-)build the dictionaries used by get_node_by_uuid, get_node_by_index and get_branch_by_uuid
+        Only nodes which are not ideally connected to another node are stored in the index table,
+        reindex_nodes_list replaces it with the representative node of each group of connected nodes
+        """
+        self._nodes_by_uuid = {}
+        self._nodes_by_index = {}
         for node in self.nodes:
-            if node.uuid == node_uuid:
-                return node
-        
-        return False
+            self._nodes_by_uuid.setdefault(node.uuid, node)
+            if node.ideal_connected_with == '':
+                self._nodes_by_index.setdefault(node.index, node)
+        self._branches_by_uuid = {}
+        for branch in self.branches:
+            self._branches_by_uuid.setdefault(branch.uuid, branch)
+        self._lookup_sizes = (len(self.nodes), len(self.branches))
+
+    def _check_lookup_tables(self):
+        """
+        rebuild the lookup tables if nodes or branches were added/removed since the last update
+        """
+        if self._lookup_sizes != (len(self.nodes), len(self.branches)):
+            self.update_lookup_tables()
+
+    def _add_branch(self, branch):
+        """
+        append a branch to system.branches and keep the lookup tables up to date
+        """
+        self._check_lookup_tables()
+        self.branches.append(branch)
+        self._branches_by_uuid.setdefault(branch.uuid, branch)
+        self._lookup_sizes = (len(self.nodes), len(self.branches))
+
+    def get_node_by_uuid(self, node_uuid):
+        """
+        Return the node with node.uuid == node_uuid
+        """
+        self._check_lookup_tables()
+        return self._nodes_by_uuid.get(node_uuid, False)
 
     def get_node_by_index(self, index):
         """
         Return the node with node.index == index
+        If several nodes have the same index (ideally connected nodes), the representative node of the group
+        is returned (see reindex_nodes_list)
         """
-        for node in self.nodes:
-            if (node.index == index) and (node.ideal_connected_with == ''):
-                return node
-        
-        return None
+        self._check_lookup_tables()
+        return self._nodes_by_index.get(index)
+
+    def get_branch_by_uuid(self, branch_uuid):
+        """
+        Return the branch with branch.uuid == branch_uuid
+        """
+        self._check_lookup_tables()
+        return self._branches_by_uuid.get(branch_uuid)
            
     def get_nodes_num(self):
         """
@@ -121,125 +382,212 @@ class System():
         Warning: if any node is ideally connected to another node, 
         the counter is increased only one time
         """
-        nodes_num = 0
-        for node in self.nodes:
-            if node.ideal_connected_with == '':
-                nodes_num += 1
-
-        return nodes_num
+        self._check_lookup_tables()
+        return len(self._nodes_by_index)
 
     def reindex_nodes_list(self):
         """
-        Re-enumerate the nodes in system.nodes
-        If any node is ideally connected to another node, 
-        both receive the same index
+        Re-enumerate the nodes in system.nodes (topology processing)
+        The nodes connected by closed breakers or ideally connected with each other (node.ideal_connected_with)
+        are grouped with a union-find structure, so that chains and loops of closed breakers are collapsed
+        to one electrical node in near-linear time. All nodes of a group receive the same index.
+        The representative of a group is its first node (in the order of system.nodes) which is not ideally
+        connected to another node, or its first node if there is none (loop of ideal connections).
+        The groups are enumerated in the order of their representatives in system.nodes, or in reverse
+        Cuthill-McKee order of the branch graph if system.node_ordering == "rcm" (the group with the first
+        representative keeps the index 0, e.g. the angle reference of DsseTrad). The representatives are stored
+        in the index table (see get_node_by_index).
         """
-        index = 0
-        remaining_nodes_list = []
-        for node in self.nodes:
-            if node.ideal_connected_with == '':
-                node.index = index
-                index += 1
-            else:
-                remaining_nodes_list.append(node)
+        self.update_lookup_tables()
+        nodes = self.nodes
+        nodes_num = len(nodes)
+        positions = {id(node): position for position, node in enumerate(nodes)}
+
+        # edges between the nodes (positions in system.nodes) which are merged
+        edges = []
+        independent = np.ones(nodes_num, dtype=bool)
+        for position, node in enumerate(nodes):
+            if node.ideal_connected_with != '':
+                connected_node = self.get_node_by_uuid(node.ideal_connected_with)
+                if not connected_node:
+                    raise Exception('Node with uuid={} is ideally connected with an unknown node uuid={}'.format(
+                        node.uuid, node.ideal_connected_with))
+                independent[position] = False
+                edges.append((position, positions[id(connected_node)]))
+        for breaker in self.breakers:
+            if not breaker.is_open and breaker.from_node is not None and breaker.to_node is not None:
+                edges.append((positions[id(breaker.from_node)], positions[id(breaker.to_node)]))
+
+        # union-find with path halving and union by size
+        parent = list(range(nodes_num))
+        size = [1] * nodes_num
+
+        def find(position):
+            while parent[position] != position:
+                parent[position] = parent[parent[position]]
+                position = parent[position]
+            return position
+
+        for first, second in edges:
+            first, second = find(first), find(second)
+            if first == second:
+                continue
+            if size[first] < size[second]:
+                first, second = second, first
+            parent[second] = first
+            size[first] += size[second]
+
+        roots = np.arange(nodes_num)
+        for position in set(position for edge in edges for position in edge):
+            roots[position] = find(position)
+
+        # representative of each group: smallest position of an independent node, otherwise smallest position
+        order_key = np.arange(nodes_num) + np.where(independent, 0, nodes_num)
+        group_key = np.full(nodes_num, 2 * nodes_num)
+        np.minimum.at(group_key, roots, order_key)
+        representative = group_key[roots] % nodes_num
+        is_representative = representative == np.arange(nodes_num)
+        representative_positions = np.flatnonzero(is_representative)
+        node_index = (np.cumsum(is_representative) - 1)[representative]
+        if self.node_ordering == "rcm" and len(representative_positions) > 1:
+            ordering = self._get_rcm_ordering(node_index, positions)
+            representative_positions = representative_positions[ordering]
+            new_index = np.empty(len(ordering), dtype=int)
+            new_index[ordering] = np.arange(len(ordering))
+            node_index = new_index[node_index]
+
+        for node, index in zip(nodes, node_index.tolist()):
+            node.index = index
+        self._nodes_by_index = {index: nodes[position] for index, position
+                                in enumerate(representative_positions.tolist())}
+
+    def _get_rcm_ordering(self, node_index, positions):
+        """
+        return the reverse Cuthill-McKee ordering (np.array with the old index of each new index) of the graph of the
+        groups of nodes and the branches, the group with index 0 is kept at the first position
+        :param node_index: np.array with the index (in the order of the representatives) of each node of system.nodes
+        :param positions: dict id(node) --> position in system.nodes
+        """
+        groups_num = int(node_index.max()) + 1
+        start = node_index[[positions[id(branch.start_node)] for branch in self.branches]]
+        end = node_index[[positions[id(branch.end_node)] for branch in self.branches]]
+        graph = sp.csr_matrix((np.ones(2 * len(start)), (np.concatenate((start, end)), np.concatenate((end, start)))),
+                              shape=(groups_num, groups_num))
+        ordering = reverse_cuthill_mckee(graph, symmetric_mode=True).astype(int)
+        return np.concatenate(([0], ordering[ordering != 0]))
 
-        for node in remaining_nodes_list:
-            node.index = self.get_node_by_uuid(node.ideal_connected_with).index
-             
     def load_cim_data(self, res, base_apparent_power):
         """
         fill the vectors node, branch and breakers
+        The CIM objects are visited only once and grouped by class. Terminals and SV objects
+        are grouped by the mRID of their TopologicalNode / ConductingEquipment, so that the
+        model is built in linear time with respect to the number of CIM objects.
         """
         self.nodes = []
         self.branches = []
         self.breakers = []
+        # the breakers are operated before the admittance matrix is calculated
+        self.arrays = None
+
+        # group all CIM objects by class
+        objects_by_class = {}
+        for elem in res.values():
+            objects_by_class.setdefault(elem.__class__.__name__, []).append(elem)
+
+        list_TPNode = objects_by_class.get("TopologicalNode", [])
+        list_SvVoltage = objects_by_class.get("SvVoltage", [])
+        list_SvPowerFlow = objects_by_class.get("SvPowerFlow", [])
+        list_EnergySources = objects_by_class.get("EnergySource", [])
+        list_EnergyConsumer = objects_by_class.get("EnergyConsumer", [])
+        list_ACLineSegment = objects_by_class.get("ACLineSegment", [])
+        list_PowerTransformer = objects_by_class.get("PowerTransformer", [])
+        list_Terminals = objects_by_class.get("Terminal", [])
+        list_PowerTransformerEnds = objects_by_class.get("PowerTransformerEnd", [])
+        list_Breakers = objects_by_class.get("Breaker", [])
+
+        # group terminals by ConductingEquipment and by class of the ConductingEquipment
+        terminals_by_equipment = {}
+        terminals_by_equipment_class = {}
+        for terminal in list_Terminals:
+            terminals_by_equipment.setdefault(terminal.ConductingEquipment.mRID, []).append(terminal)
+            terminals_by_equipment_class.setdefault(terminal.ConductingEquipment.__class__.__name__, []).append(terminal)
 
-        index = 0
-        list_TPNode = [elem for elem in res.values() if elem.__class__.__name__ == "TopologicalNode"]
-        list_SvVoltage = [elem for elem in res.values() if elem.__class__.__name__ == "SvVoltage"]
-        list_SvPowerFlow = [elem for elem in res.values() if elem.__class__.__name__ == "SvPowerFlow"]
-        list_EnergySources = [elem for elem in res.values() if elem.__class__.__name__ == "EnergySource"]
-        list_EnergyConsumer = [elem for elem in res.values() if elem.__class__.__name__ == "EnergyConsumer"]
-        list_ACLineSegment = [elem for elem in res.values() if elem.__class__.__name__ == "ACLineSegment"]
-        list_PowerTransformer = [elem for elem in res.values() if elem.__class__.__name__ == "PowerTransformer"]
-        list_Terminals = [elem for elem in res.values() if elem.__class__.__name__ == "Terminal"]
-        list_Terminals_ES = [elem for elem in list_Terminals if
-                             elem.ConductingEquipment.__class__.__name__ == "EnergySource"]
-        list_Terminals_EC = [elem for elem in list_Terminals if
-                             elem.ConductingEquipment.__class__.__name__ == "EnergyConsumer"]
-        list_PowerTransformerEnds = [elem for elem in res.values() if elem.__class__.__name__ == "PowerTransformerEnd"]
-        list_Breakers = [elem for elem in res.values() if elem.__class__.__name__ == "Breaker"]
+        # group SV objects and the terminals of energy sources / consumers by TopologicalNode
+        sv_voltage_by_node = {}
+        for obj_SvVoltage in list_SvVoltage:
+            sv_voltage_by_node.setdefault(obj_SvVoltage.TopologicalNode.mRID, obj_SvVoltage)
+        sv_power_flows_by_node = {}
+        for obj_SvPowerFlow in list_SvPowerFlow:
+            sv_power_flows_by_node.setdefault(obj_SvPowerFlow.Terminal.TopologicalNode.mRID, []).append(obj_SvPowerFlow)
+        energy_sources_by_node = self._group_equipment_by_node(
+            terminals_by_equipment_class.get("EnergySource", []), list_EnergySources)
+        energy_consumers_by_node = self._group_equipment_by_node(
+            terminals_by_equipment_class.get("EnergyConsumer", []), list_EnergyConsumer)
 
         #create nodes
-        for TPNode in list_TPNode:
+        for index, TPNode in enumerate(list_TPNode):
             uuid_TPNode = TPNode.mRID
             name = TPNode.name
             vmag = 0.0
             vphase = 0.0
             pInj = 0.0
             qInj = 0.0
-                
-            for obj_SvVoltage in list_SvVoltage:
-                if obj_SvVoltage.TopologicalNode.mRID == uuid_TPNode:
-                    vmag = obj_SvVoltage.v
-                    vphase = obj_SvVoltage.angle
-                    break
-            for obj_SvPowerFlow in list_SvPowerFlow:
-                if obj_SvPowerFlow.Terminal.TopologicalNode.mRID == uuid_TPNode:
-                    pInj -= obj_SvPowerFlow.p
-                    qInj -= obj_SvPowerFlow.q
-            for obj_Terminal in list_Terminals_ES:
-                if obj_Terminal.TopologicalNode.mRID == uuid_TPNode:
-                    for obj_EnergySource in list_EnergySources:
-                        if obj_EnergySource.mRID == obj_Terminal.ConductingEquipment.mRID:
-                            pInj += obj_EnergySource.activePower
-                            qInj += obj_EnergySource.reactivePower
-            for obj_Terminal in list_Terminals_EC:
-                if obj_Terminal.TopologicalNode.mRID == uuid_TPNode:
-                    for obj_EnergyConsumer in list_EnergyConsumer:
-                        if obj_EnergyConsumer.mRID == obj_Terminal.ConductingEquipment.mRID:
-                            pInj -= obj_EnergyConsumer.p
-                            qInj -= obj_EnergyConsumer.q
-            
+
+            obj_SvVoltage = sv_voltage_by_node.get(uuid_TPNode)
+            if obj_SvVoltage is not None:
+                vmag = obj_SvVoltage.v
+                vphase = obj_SvVoltage.angle
+            for obj_SvPowerFlow in sv_power_flows_by_node.get(uuid_TPNode, []):
+                pInj -= obj_SvPowerFlow.p
+                qInj -= obj_SvPowerFlow.q
+            for obj_EnergySource in energy_sources_by_node.get(uuid_TPNode, []):
+                pInj += obj_EnergySource.activePower
+                qInj += obj_EnergySource.reactivePower
+            for obj_EnergyConsumer in energy_consumers_by_node.get(uuid_TPNode, []):
+                pInj -= obj_EnergyConsumer.p
+                qInj -= obj_EnergyConsumer.q
+
             base_voltage = TPNode.BaseVoltage.nominalVoltage
             self.nodes.append(Node(name=name, uuid=uuid_TPNode, base_voltage=base_voltage, v_mag=vmag,
                                    base_apparent_power=base_apparent_power, v_phase=vphase,
                                    p=pInj, q=qInj, index=index))
-            index = index + 1
-        
-        self._setNodeType(list_Terminals)   
+        self.update_lookup_tables()
+
+        self._setNodeType(terminals_by_equipment_class)
 
         #create branches type ACLineSegment
         for ACLineSegment in list_ACLineSegment:
             uuid_ACLineSegment = ACLineSegment.mRID
-            nodes = self._get_nodes(list_Terminals, uuid_ACLineSegment)
+            nodes = self._get_nodes(terminals_by_equipment, uuid_ACLineSegment)
             start_node = nodes[0]
             end_node = nodes[1]
 
             base_voltage = ACLineSegment.BaseVoltage.nominalVoltage
-            self.branches.append(Branch(uuid=uuid_ACLineSegment, r=ACLineSegment.r, x=ACLineSegment.x, 
-                                        start_node=start_node, end_node=end_node, 
-                                        base_voltage=base_voltage, base_apparent_power=base_apparent_power))
+            self._add_branch(Branch(uuid=uuid_ACLineSegment, r=ACLineSegment.r, x=ACLineSegment.x, 
+                                    start_node=start_node, end_node=end_node, 
+                                    base_voltage=base_voltage, base_apparent_power=base_apparent_power))
 
         #create branches type powerTransformer
+        transformer_ends_by_transformer = self._group_power_transformer_ends(list_PowerTransformerEnds)
         for power_transformer in list_PowerTransformer:
             uuid_power_transformer = power_transformer.mRID
-            nodes = self._get_nodes(list_Terminals, uuid_power_transformer)
+            nodes = self._get_nodes(terminals_by_equipment, uuid_power_transformer)
             start_node = nodes[0]
             end_node = nodes[1]
             
             # base voltage = high voltage side (=primaryConnection)
-            primary_connection = self._get_primary_connection(list_PowerTransformerEnds, uuid_power_transformer)
+            primary_connection = self._get_primary_connection(
+                transformer_ends_by_transformer.get(uuid_power_transformer, []))
             base_voltage = primary_connection.BaseVoltage.nominalVoltage
-            self.branches.append(Branch(uuid=uuid_power_transformer, r=primary_connection.r, x=primary_connection.x,
-                                        start_node=start_node, end_node=end_node, base_voltage=base_voltage,
-                                        base_apparent_power=base_apparent_power))
+            self._add_branch(Branch(uuid=uuid_power_transformer, r=primary_connection.r, x=primary_connection.x,
+                                    start_node=start_node, end_node=end_node, base_voltage=base_voltage,
+                                    base_apparent_power=base_apparent_power))
 
         #create breakers
         for obj_Breaker in list_Breakers:
             is_open = obj_Breaker.normalOpen
-            nodes = self._get_nodes(list_Terminals, obj_Breaker.mRID)
-            self.breakers.append(Breaker(from_node=nodes[0], to_node=nodes[1], is_open=is_open))
+            nodes = self._get_nodes(terminals_by_equipment, obj_Breaker.mRID)
+            self.breakers.append(Breaker(from_node=nodes[0], to_node=nodes[1], is_open=is_open, system=self))
 
             #if the breaker is open == closed --> close broker
             if is_open is False:
@@ -250,21 +598,39 @@ class System():
         #calculate admitance matrix
         self.Ymatrix_calc()
 
-    def _get_nodes(self, list_Terminals, elem_uuid):
+    @staticmethod
+    def _group_equipment_by_node(terminals, list_equipment):
+        """
+        group the equipment (e.g. EnergySource or EnergyConsumer) connected to the terminals by TopologicalNode
+        :param terminals: list of Terminals whose ConductingEquipment is of the same class as list_equipment
+        :param list_equipment: list of all elements of this class
+        :return dict: TopologicalNode.mRID --> list of equipment connected to the node
+        """
+        equipment_by_uuid = {}
+        for equipment in list_equipment:
+            equipment_by_uuid.setdefault(equipment.mRID, equipment)
+
+        equipment_by_node = {}
+        for terminal in terminals:
+            equipment = equipment_by_uuid.get(terminal.ConductingEquipment.mRID)
+            if equipment is not None:
+                equipment_by_node.setdefault(terminal.TopologicalNode.mRID, []).append(equipment)
+
+        return equipment_by_node
+
+    def _get_nodes(self, terminals_by_equipment, elem_uuid):
         """
         get the the start and end node of the element with uuid=elem_uuid
         This function can used only with element which are connected 
         to 2 topologicalNodes, for example: ACLineSegment, PowerTransformer and Breaker 
-        :param list_Terminals: list of all elements of type Terminal
+        :param terminals_by_equipment: dict ConductingEquipment.mRID --> list of Terminals of this element
         :param elem_uuid: uuid of the element for which the start and end node ID are searched
         :return list: [startNodeID, endNodeID]
         """
         start_node_uuid = None
         end_node_uuid = None
         
-        for terminal in list_Terminals:
-            if terminal.ConductingEquipment.mRID != elem_uuid:
-                continue
+        for terminal in terminals_by_equipment.get(elem_uuid, []):
             sequence_number = terminal.sequenceNumber
             if sequence_number == 1:
                 start_node_uuid = terminal.TopologicalNode.mRID
@@ -284,17 +650,14 @@ class System():
 
         return [start_node, end_node]
 
-    def _get_primary_connection(self, list_PowerTransformerEnds, elem_uuid):
+    @staticmethod
+    def _group_power_transformer_ends(list_PowerTransformerEnds):
         """
-        get primaryConnection of the powertransformer with uuid = elem_uuid
+        group the elements of class PowerTransformerEnd by the power transformer they point to
         :param list_PowerTransformerEnds: list of all elements of type PowerTransformerEnd
-        :param elem_uuid: uuid of the power transformer for which the primary connection is searched
-        :return: primary_connection
+        :return dict: PowerTransformer.mRID --> list of PowerTransformerEnds
         """
-        primary_connection = None
-        power_transformer_ends = []
-
-        #search for two elements of class powertransformerend that point to the powertransformer with ID == elem_uuid
+        power_transformer_ends = {}
         for power_transformer_end in list_PowerTransformerEnds:
             power_transformer = None
             if isinstance(power_transformer_end.PowerTransformer, list):
@@ -304,9 +667,18 @@ class System():
                 power_transformer = power_transformer_end.PowerTransformer[0]
             else:
                 power_transformer = power_transformer_end.PowerTransformer
-        
-            if power_transformer.mRID == elem_uuid:
-                power_transformer_ends.append(power_transformer_end)
+
+            power_transformer_ends.setdefault(power_transformer.mRID, []).append(power_transformer_end)
+
+        return power_transformer_ends
+
+    def _get_primary_connection(self, power_transformer_ends):
+        """
+        get primaryConnection of a powertransformer
+        :param power_transformer_ends: the two elements of class PowerTransformerEnd that point to the powertransformer
+        :return: primary_connection
+        """
+        primary_connection = None
 
         if power_transformer_ends[0].BaseVoltage.nominalVoltage >= \
                 power_transformer_ends[1].BaseVoltage.nominalVoltage:
@@ -317,42 +689,334 @@ class System():
 
         return primary_connection
 
-    def _setNodeType(self, list_Terminals):
+    def _setNodeType(self, terminals_by_equipment_class):
         """
         set the parameter "type" of all elements of the list self.nodes
-        :param list_Terminals: list of all elements of type Terminal
+        :param terminals_by_equipment_class: dict class name of ConductingEquipment --> list of Terminals
         :return None
         """
-        #get a list of Terminals for which the ConductingEquipment is a element of class ExternalNetworkInjection
-        list_Terminals_ENI = [elem for elem in list_Terminals if
-                              elem.ConductingEquipment.__class__.__name__ == "ExternalNetworkInjection"]
-        for terminal in list_Terminals_ENI:
-            node_uuid = terminal.TopologicalNode.mRID
-            for node in self.nodes:
-                if node.uuid == node_uuid:
-                    node.type = BusType["SLACK"]
-
-        #get a list of Terminals for which the ConductingEquipment is a element of class SynchronousMachine
-        list_Terminals_SM = [elem for elem in list_Terminals
-                             if elem.ConductingEquipment.__class__.__name__ == "SynchronousMachine"]
-        for terminal in list_Terminals_SM:
-            node_uuid = terminal.TopologicalNode.mRID
-            for node in self.nodes:
-                if node.uuid == node_uuid:
-                    node.type = BusType["PV"]
+        #Terminals for which the ConductingEquipment is a element of class ExternalNetworkInjection
+        for terminal in terminals_by_equipment_class.get("ExternalNetworkInjection", []):
+            node = self.get_node_by_uuid(terminal.TopologicalNode.mRID)
+            if node:
+                node.type = BusType["SLACK"]
+
+        #Terminals for which the ConductingEquipment is a element of class SynchronousMachine
+        for terminal in terminals_by_equipment_class.get("SynchronousMachine", []):
+            node = self.get_node_by_uuid(terminal.TopologicalNode.mRID)
+            if node:
+                node.type = BusType["PV"]
 
     def Ymatrix_calc(self):
+        """
+        Re-enumerate the nodes, rebuild system.arrays and calculate the admittance matrix in sparse (CSR) format
+        The matrix is assembled in one vectorized pass from the start node index,
+        end node index and admittance of all branches. Entries of parallel branches
+        are summed up during the conversion from COO to CSR.
+        The topology cache is cleared (e.g. the branch parameters may have changed) and the new topology is stored
+        in it.
+        """
+        self.topology_cache.clear()
+        self._calculate_topology()
+        self._store_topology()
+
+    def _calculate_topology(self):
+        """
+        Re-enumerate the nodes, rebuild system.arrays and calculate the admittance matrix (see Ymatrix_calc)
+        """
         self.reindex_nodes_list()
-        nodes_num = self.get_nodes_num()
-        self.Ymatrix = np.zeros((nodes_num, nodes_num), dtype=complex)
-        self.Bmatrix = np.zeros((nodes_num, nodes_num), dtype=complex)
-        for branch in self.branches:
-            fr = branch.start_node.index
-            to = branch.end_node.index
-            self.Ymatrix[fr][to] -= branch.y_pu
-            self.Ymatrix[to][fr] -= branch.y_pu
-            self.Ymatrix[fr][fr] += branch.y_pu
-            self.Ymatrix[to][to] += branch.y_pu
+        self.arrays = SystemArrays(self)
+        nodes_num = self.arrays.nodes_num
+        rows, cols, data = self._get_Ymatrix_entries(self.arrays.branch_start, self.arrays.branch_end,
+                                                     self.arrays.branch_y_pu)
+        self.Ymatrix_sparse = sp.coo_matrix((data, (rows, cols)), shape=(nodes_num, nodes_num)).tocsr()
+        self.Bmatrix_sparse = sp.csr_matrix((nodes_num, nodes_num), dtype=complex)
+        self._Ymatrix = None
+        self._Bmatrix = None
+
+    def get_breaker_configuration(self):
+        """
+        return the breaker configuration as bitmask (bit k is set if system.breakers[k] is open)
+        """
+        configuration = 0
+        for k, breaker in enumerate(self.breakers):
+            if breaker.is_open:
+                configuration |= 1 << k
+        return configuration
+
+    def _store_topology(self):
+        """
+        store the current topology in the topology cache under the current breaker configuration
+        """
+        self.topology_cache.put(self.arrays.breaker_configuration,
+                                {"arrays": self.arrays, "Ymatrix_sparse": self.Ymatrix_sparse,
+                                 "Bmatrix_sparse": self.Bmatrix_sparse, "nodes_by_index": self._nodes_by_index})
+
+    def _set_node_indices(self, node_list_index):
+        """
+        set node.index of the nodes of system.nodes whose index differs from system.arrays.node_list_index
+        :param node_list_index: np.array with the new node.index of each node of system.nodes
+        """
+        positions = np.flatnonzero(node_list_index != self.arrays.node_list_index)
+        nodes = self.nodes
+        for position, index in zip(positions.tolist(), node_list_index[positions].tolist()):
+            nodes[position].index = index
+
+    def _restore_topology(self, entry):
+        """
+        restore node indices, system.arrays and admittance matrices of an entry of the topology cache
+        """
+        self._set_node_indices(entry["arrays"].node_list_index)
+        self.arrays = entry["arrays"]
+        self.Ymatrix_sparse = entry["Ymatrix_sparse"]
+        self.Bmatrix_sparse = entry["Bmatrix_sparse"]
+        self._nodes_by_index = entry["nodes_by_index"]
+        self._Ymatrix = None
+        self._Bmatrix = None
+
+    @staticmethod
+    def _get_Ymatrix_entries(fr, to, y):
+        """
+        return rows, columns and values of the COO entries of the admittance matrix for the branches
+        with start node indices fr, end node indices to and admittances y
+        """
+        rows = np.concatenate((fr, to, fr, to))
+        cols = np.concatenate((to, fr, fr, to))
+        data = np.concatenate((-y, -y, y, y))
+        return rows, cols, data
+
+    @staticmethod
+    def _has_connection_chain(node_connected_position):
+        """
+        return True if a node is ideally connected with a node which is itself ideally connected with another node
+        :param node_connected_position: see SystemArrays.node_connected_position
+        """
+        connected_positions = node_connected_position[node_connected_position != -1]
+        return bool(np.any(node_connected_position[connected_positions] != -1))
+
+    @staticmethod
+    def _get_position(items, positions, item):
+        """
+        return the position of item in the list items using the dictionary positions id(item)-->position, which is
+        rebuilt if it does not match items (e.g. items were added/removed or the system was copied)
+        :return: position of item, -1 if it is not contained in items
+        """
+        position = positions.get(id(item), -1)
+        if position == -1 or position >= len(items) or items[position] is not item:
+            positions.clear()
+            for k, other in enumerate(items):
+                positions.setdefault(id(other), k)
+            position = positions.get(id(item), -1)
+        return position
+
+    def _get_breaker_position(self, breaker):
+        """
+        return the position of breaker in system.breakers and keep the table of the breakers connected to each node
+        up to date (rebuilt together with the breaker positions)
+        """
+        positions = self._breaker_positions
+        position = positions.get(id(breaker), -1)
+        if position == -1 or position >= len(self.breakers) or self.breakers[position] is not breaker:
+            position = self._get_position(self.breakers, positions, breaker)
+            self._breakers_by_node = {}
+            for k, other in enumerate(self.breakers):
+                self._breakers_by_node.setdefault(id(other.from_node), []).append(k)
+                self._breakers_by_node.setdefault(id(other.to_node), []).append(k)
+        return position
+
+    def update_breaker_topology(self, breaker):
+        """
+        Update the node indices, system.arrays and the admittance matrix after breaker was opened or closed
+        The nodes after the removed (closed breaker) or inserted (opened breaker) index are shifted and only the
+        rows/columns of the nodes connected by the breaker and of their neighbours are calculated again from
+        the branches connected to them, so that the result is the same as the one of Ymatrix_calc.
+        The arrays which do not depend on the topology (e.g. branch parameters) are kept, the solver caches
+        (system.arrays.solver_cache) are discarded.
+        If the new breaker configuration is stored in system.topology_cache, its data is restored instead.
+        In all other cases (e.g. node_ordering "rcm", chains of ideally connected nodes, a node connected by
+        several closed breakers or nodes connected with each other without a breaker) the topology is processed
+        again as in Ymatrix_calc (see reindex_nodes_list). If nodes, branches or breakers were added/removed since
+        the last call of Ymatrix_calc, Ymatrix_calc is called.
+        Only the positions of the nodes and breakers concerned are looked up (see System._get_position), the other
+        breakers must not have been operated without notifying the system since the last update.
+        :param breaker: object of class Breaker with up to date ideal_connected_with of breaker.to_node
+        """
+        arrays = self.arrays
+        if arrays is None:
+            return
+        breaker_position = self._get_breaker_position(breaker)
+        to_position = self._get_position(self.nodes, self._node_positions, breaker.to_node)
+        if len(arrays.node_list_index) != len(self.nodes) or arrays.branches_num != len(self.branches) or \
+                arrays.breakers_num != len(self.breakers) or breaker_position == -1 or to_position == -1:
+            # nodes, branches or breakers were added/removed
+            self.Ymatrix_calc()
+            return
+        connected_node = self.get_node_by_uuid(breaker.to_node.ideal_connected_with)
+        connected_position = self._get_position(self.nodes, self._node_positions, connected_node) \
+            if connected_node else -1
+        previous_position = arrays.node_connected_position[to_position]
+        node_connected_position = arrays.node_connected_position.copy()
+        node_connected_position[to_position] = connected_position
+        breaker_bit = 1 << breaker_position
+        configuration = arrays.breaker_configuration & ~breaker_bit
+        if breaker.is_open:
+            configuration |= breaker_bit
+        if configuration == arrays.breaker_configuration and connected_position == previous_position:
+            return
+        entry = self.topology_cache.get(configuration, node_connected_position)
+        if entry is not None:
+            self._restore_topology(entry)
+            return
+
+        # the arrays are only updated if the nodes are enumerated in the order of system.nodes and to_node is a
+        # single node which is merged into / split from the group of from_node by this breaker, i.e. the state of
+        # the breaker changed, its connection is the one which changed, to_node is not connected by another
+        # closed breaker and there is no chain of ideally connected nodes before or after the operation
+        shared_node = False
+        for k in self._breakers_by_node.get(id(breaker.to_node), []):
+            other = self.breakers[k]
+            if k != breaker_position and not other.is_open and \
+                    (other.from_node is breaker.to_node or other.to_node is breaker.to_node):
+                shared_node = True
+        from_position = self._get_position(self.nodes, self._node_positions, breaker.from_node)
+        single_connection = (connected_position == from_position and previous_position == -1) or \
+            (previous_position == from_position and connected_position == -1)
+        if self.node_ordering != "natural" or shared_node or not single_connection or \
+                configuration == arrays.breaker_configuration or \
+                self._has_connection_chain(arrays.node_connected_position) or \
+                self._has_connection_chain(node_connected_position):
+            self._calculate_topology()
+            self._store_topology()
+            return
+
+        nodes_num = arrays.nodes_num
+        to_index = arrays.node_list_index[to_position]
+        arrays = copy.copy(arrays)
+        if connected_position != -1:
+            # closed breaker: to_node is merged into the node it is connected with, its index is removed
+            merged_index = arrays.node_list_index[connected_position]
+            old_to_new = np.arange(nodes_num) - (np.arange(nodes_num) > to_index)
+            old_to_new[to_index] = old_to_new[merged_index]
+            arrays.nodes = arrays.nodes[:to_index] + arrays.nodes[to_index + 1:]
+            arrays.nodes_num = nodes_num - 1
+            for name in ("node_position", "node_base_voltage", "node_base_apparent_power", "node_base_current",
+                         "node_type", "node_voltage_pu", "node_power_pu"):
+                setattr(arrays, name, np.delete(getattr(arrays, name), to_index))
+            node_list_index = old_to_new[arrays.node_list_index]
+        else:
+            # opened breaker: to_node gets its own index again,
+            # the nodes which are not ideally connected are enumerated in the order of system.nodes
+            merged_index = arrays.node_list_index[previous_position]
+            new_index = int(np.searchsorted(arrays.node_position, to_position))
+            old_to_new = np.arange(nodes_num) + (np.arange(nodes_num) >= new_index)
+            arrays.nodes = arrays.nodes[:new_index] + [breaker.to_node] + arrays.nodes[new_index:]
+            arrays.nodes_num = nodes_num + 1
+            arrays.node_position = np.insert(arrays.node_position, new_index, to_position)
+            node = breaker.to_node
+            for name, value in (("node_base_voltage", node.baseVoltage),
+                                ("node_base_apparent_power", node.base_apparent_power),
+                                ("node_base_current", node.base_current), ("node_type", node.type.value),
+                                ("node_voltage_pu", node.voltage_pu), ("node_power_pu", node.power_pu)):
+                setattr(arrays, name, np.insert(getattr(arrays, name), new_index, value))
+            node_list_index = old_to_new[arrays.node_list_index]
+            node_list_index[to_position] = new_index
+
+        self._set_node_indices(node_list_index)
+        arrays.node_list_index = node_list_index
+        arrays.node_connected_position = node_connected_position
+        arrays.breaker_configuration = configuration
+        arrays.branch_start = node_list_index[arrays.branch_start_position]
+        arrays.branch_end = node_list_index[arrays.branch_end_position]
+        arrays.solver_cache = {}
+        self.arrays = arrays
+        self._nodes_by_index = {index: node for index, node in enumerate(arrays.nodes)}
+
+        # rows of the admittance matrix which are calculated again: the node(s) connected by the breaker and
+        # the neighbours of to_node
+        to_branches = (arrays.branch_start_position == to_position) | (arrays.branch_end_position == to_position)
+        updated_rows = np.unique(np.concatenate(([old_to_new[merged_index], node_list_index[to_position]],
+                                                 arrays.branch_start[to_branches],
+                                                 arrays.branch_end[to_branches])))
+        updated_branches = np.isin(arrays.branch_start, updated_rows) | np.isin(arrays.branch_end, updated_rows)
+        rows, cols, data = self._get_Ymatrix_entries(arrays.branch_start[updated_branches],
+                                                     arrays.branch_end[updated_branches],
+                                                     arrays.branch_y_pu[updated_branches])
+        updated_entries = np.isin(rows, updated_rows)
+        # the other rows are copied with the new indices
+        Ymatrix = self.Ymatrix_sparse.tocoo()
+        old_rows = old_to_new[Ymatrix.row]
+        old_entries = ~np.isin(old_rows, updated_rows)
+        rows = np.concatenate((old_rows[old_entries], rows[updated_entries]))
+        cols = np.concatenate((old_to_new[Ymatrix.col[old_entries]], cols[updated_entries]))
+        data = np.concatenate((Ymatrix.data[old_entries], data[updated_entries]))
+        nodes_num = arrays.nodes_num
+        self.Ymatrix_sparse = sp.coo_matrix((data, (rows, cols)), shape=(nodes_num, nodes_num)).tocsr()
+        self.Bmatrix_sparse = sp.csr_matrix((nodes_num, nodes_num), dtype=complex)
+        self._Ymatrix = None
+        self._Bmatrix = None
+        self._store_topology()
+
+    def get_islands(self):
+        """
+        detect the electrical islands of the system: connected components of the graph of the nodes (with
+        node.index, see reindex_nodes_list) and branches
+        The result is stored in system.arrays.solver_cache until the topology changes.
+        :return: 1. number of islands
+                 2. np.array with the island of each node in the order of node.index, the islands are numbered
+                    in the order of their node with the smallest index
+        """
+        islands = self.arrays.solver_cache.get("islands")
+        if islands is None:
+            arrays = self.arrays
+            graph = sp.coo_matrix((np.ones(arrays.branches_num), (arrays.branch_start, arrays.branch_end)),
+                                  shape=(arrays.nodes_num, arrays.nodes_num))
+            islands = connected_components(graph, directed=False)
+            self.arrays.solver_cache["islands"] = islands
+        return islands
+
+    def split_islands(self):
+        """
+        split the system into independent systems, one for each electrical island (see get_islands)
+        The systems contain copies of the nodes (one node per group of ideally connected nodes) and
+        of the branches, so that they can be solved separately, e.g. in another process (see run_islands).
+        If an island has no SLACK node, its first PV node is used as SLACK node.
+        :return: list of objects of class Island, in the order of the islands
+        """
+        islands_num, node_island = self.get_islands()
+        arrays = self.arrays
+        branch_island = node_island[arrays.branch_start]
+        node_order = np.argsort(node_island, kind="stable")
+        node_offsets = np.concatenate(([0], np.cumsum(np.bincount(node_island, minlength=islands_num))))
+        branch_order = np.argsort(branch_island, kind="stable")
+        branch_offsets = np.concatenate(([0], np.cumsum(np.bincount(branch_island, minlength=islands_num))))
+
+        islands = []
+        for island in range(islands_num):
+            node_indices = node_order[node_offsets[island]:node_offsets[island + 1]]
+            branch_indices = branch_order[branch_offsets[island]:branch_offsets[island + 1]]
+            system = System(node_ordering=self.node_ordering)
+            nodes_by_index = {}
+            for index in node_indices.tolist():
+                node = copy.copy(arrays.nodes[index])
+                node.ideal_connected_with = ''
+                nodes_by_index[index] = node
+                system.nodes.append(node)
+            for position in branch_indices.tolist():
+                branch = copy.copy(self.branches[position])
+                branch.start_node = nodes_by_index[arrays.branch_start[position]]
+                branch.end_node = nodes_by_index[arrays.branch_end[position]]
+                system.branches.append(branch)
+
+            if not any(node.type == BusType.SLACK for node in system.nodes):
+                pv_nodes = [node for node in system.nodes if node.type == BusType.PV]
+                if pv_nodes:
+                    print('WARNING: the island of the node with uuid={} has no SLACK node, the PV node with uuid={} '
+                          'is used as SLACK node'.format(system.nodes[0].uuid, pv_nodes[0].uuid))
+                    pv_nodes[0].type = BusType.SLACK
+            system.Ymatrix_calc()
+            islands.append(Island(system, node_indices[system.arrays.node_position], branch_indices))
+
+        return islands
 
     #testing functions
     def print_nodes_names(self):
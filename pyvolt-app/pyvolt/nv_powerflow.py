@@ -1,9 +1,169 @@
 import numpy as np
-from .network import BusType
-from .results import Results
+import scipy.sparse as sp
+import scipy.sparse.linalg as spla
+from scipy.sparse.csgraph import breadth_first_order
+from .network import BusType, run_islands
+from .results import Results, ConvergenceReport, get_initial_voltages, merge_convergence_reports
 
 
-def solve(system):
+def solve(system, solver_type="auto", initial_state=None, tolerance=10 ** (-10), max_iter=100, islands=False,
+          processes=None):
+    """
+    It performs powerflow and calculates all the quantities of the grid from the resulting node voltages.
+
+    @param system: model of the system (nodes, lines, topology)
+    @param solver_type: - "auto": "bfs" if the grid is radial (see get_radial_ordering), "sparse" otherwise
+                        - "bfs": backward/forward sweep for radial grids (see solve_bfs)
+                        - "sparse": Newton-Raphson, the Newton step is calculated with a sparse LU factorization
+                          of H (see solve_nr)
+                        - "dense": Newton-Raphson, H is assembled as dense np.array and inverted in every iteration
+    @param initial_state: initial voltages, None for flat start, object of class results.Results (e.g. the results
+                          of the previous calculation) or np.array with the complex node voltages in per unit
+    @param tolerance: convergence threshold for the maximum absolute update of the voltages in one iteration
+    @param max_iter: maximum number of iterations
+    @param islands: True to solve the electrical islands of the system separately (see solve_islands) if there
+                    are several islands
+    @param processes: number of worker processes for the islands (see network.run_islands)
+    return: 1. object of class results.Results (results.convergence contains the results.ConvergenceReport)
+            2. number of iterations
+    """
+    if solver_type not in ("auto", "bfs", "sparse", "dense"):
+        raise Exception("solver_type must be 'auto', 'bfs', 'sparse' or 'dense'")
+
+    if islands and system.get_islands()[0] > 1:
+        V, report = solve_islands(system, solver_type, initial_state, tolerance, max_iter, processes)
+    else:
+        V, report = solve_voltages(system, solver_type, initial_state, tolerance, max_iter)
+
+    # calculate all the other quantities of the grid
+    powerflow_results = Results(system)
+    powerflow_results.load_voltages(V)
+    powerflow_results.calculate_all()
+    powerflow_results.convergence = report
+    print (powerflow_results)
+    return powerflow_results, report.num_iter
+
+
+def solve_voltages(system, solver_type="auto", initial_state=None, tolerance=10 ** (-10), max_iter=100):
+    """
+    It performs powerflow without calculating the other quantities of the grid (see solve for the parameters)
+
+    return: 1. np.array with the complex node voltages in per unit (in the order of node.index)
+            2. object of class results.ConvergenceReport
+    """
+    system.arrays.update_node_values()
+    if solver_type == "auto":
+        solver_type = "bfs" if get_radial_ordering(system) is not None else "sparse"
+    if solver_type == "bfs":
+        return solve_bfs(system, initial_state, tolerance, max_iter, update_node_values=False)
+    return solve_nr(system, solver_type, initial_state, tolerance, max_iter, update_node_values=False)
+
+
+def solve_islands(system, solver_type="auto", initial_state=None, tolerance=10 ** (-10), max_iter=100,
+                  processes=None):
+    """
+    It performs powerflow for each electrical island of the system (see network.System.split_islands), the islands
+    are solved concurrently in a process pool (see network.run_islands). The nodes of islands without SLACK node
+    (not energized islands) get the voltage 0.
+
+    @param processes: number of worker processes, None for os.cpu_count(), 1 to solve the islands one after the
+                      other in this process
+    see solve for the other parameters
+    return: 1. np.array with the complex node voltages in per unit of the whole system (in the order of node.index)
+            2. object of class results.ConvergenceReport of all islands (see results.merge_convergence_reports)
+    """
+    nodes_num = system.arrays.nodes_num
+    V_initial = None if initial_state is None else get_initial_voltages(initial_state, nodes_num)
+    islands = [island for island in system.split_islands() if island.energized]
+    arguments = [(island.system, solver_type, None if V_initial is None else V_initial[island.node_indices],
+                  tolerance, max_iter) for island in islands]
+    solutions = run_islands(solve_voltages, arguments, processes)
+
+    V = np.zeros(nodes_num, dtype=complex)
+    for island, (V_island, _) in zip(islands, solutions):
+        V[island.node_indices] = V_island
+    report = merge_convergence_reports([report for _, report in solutions], tolerance, max_iter)
+    return V, report
+
+
+def solve_timeseries(system, power_pu, solver_type="auto", initial_state=None, tolerance=10 ** (-10), max_iter=100):
+    """
+    It performs powerflow for a sequence of snapshots with different node power injections.
+    Topology dependent data (factorization of the Jacobian, radial ordering) is calculated once for all
+    snapshots and every snapshot is initialized with the voltages of the previous one. Only the node
+    voltages are calculated, no results.Results objects are created.
+
+    @param system: model of the system (nodes, lines, topology), the node types and the voltages of SLACK and
+                   PV nodes are taken from the nodes
+    @param power_pu: np.array with shape (number of snapshots, nodes_num) with the complex node power injections in
+                     per unit, columns in the order of node.index (see get_power_injections)
+    @param solver_type: "auto", "bfs", "sparse" or "dense" (see solve)
+    @param initial_state: initial voltages of the first snapshot (see solve)
+    @param tolerance: convergence threshold (see solve)
+    @param max_iter: maximum number of iterations per snapshot
+    return: 1. np.array V with shape (number of snapshots, nodes_num) - node voltages in per unit
+            2. list of objects of class results.ConvergenceReport (one per snapshot)
+    """
+    if solver_type not in ("auto", "bfs", "sparse", "dense"):
+        raise Exception("solver_type must be 'auto', 'bfs', 'sparse' or 'dense'")
+
+    arrays = system.arrays
+    arrays.update_node_values()
+    power_pu = np.asarray(power_pu, dtype=complex)
+    if power_pu.ndim != 2 or power_pu.shape[1] != arrays.nodes_num:
+        raise Exception('power_pu must have the shape (number of snapshots, {})'.format(arrays.nodes_num))
+    if solver_type == "auto":
+        solver_type = "bfs" if get_radial_ordering(system) is not None else "sparse"
+
+    V = np.zeros(power_pu.shape, dtype=complex)
+    reports = []
+    V_snapshot = initial_state
+    node_power_pu = arrays.node_power_pu
+    try:
+        for t in range(power_pu.shape[0]):
+            arrays.node_power_pu = power_pu[t]
+            if solver_type == "bfs":
+                V_snapshot, report = solve_bfs(system, V_snapshot, tolerance, max_iter, update_node_values=False)
+            else:
+                V_snapshot, report = solve_nr(system, solver_type, V_snapshot, tolerance, max_iter,
+                                              update_node_values=False)
+            V[t] = V_snapshot
+            reports.append(report)
+    finally:
+        arrays.node_power_pu = node_power_pu
+
+    return V, reports
+
+
+def get_power_injections(system, timeseries, pu=False):
+    """
+    build the matrix of node power injections used by solve_timeseries from time series of node powers
+
+    @param system: model of the system (nodes, lines, topology)
+    @param timeseries: dict node uuid --> object of class results.TimeSeries with the complex power injection
+                       of the node (e.g. the output of results.Results.read_timeseries_csv), nodes without
+                       time series keep their actual power injection
+    @param pu: True if the values of the time series are expressed in per unit
+    return: np.array with shape (number of snapshots, nodes_num), columns in the order of node.index
+    """
+    arrays = system.arrays
+    arrays.update_node_values()
+    lengths = set(len(series.values) for series in timeseries.values())
+    if len(lengths) != 1:
+        raise Exception('all time series must have the same length')
+    power_pu = np.tile(arrays.node_power_pu, (lengths.pop(), 1))
+    for index, node in enumerate(arrays.nodes):
+        series = timeseries.get(node.uuid)
+        if series is None:
+            continue
+        values = np.asarray(series.values, dtype=complex)
+        power_pu[:, index] = values if pu else values / arrays.node_base_apparent_power[index]
+
+    return power_pu
+
+
+def solve_nr(system, solver_type="sparse", initial_state=None, tolerance=10 ** (-10), max_iter=100,
+             update_node_values=True):
     """It performs powerflow by using rectangular node voltage state variables and considering the current mismatch
     function.
     
@@ -22,84 +182,324 @@ def solve(system):
     h: currents calculated from state
     H: Jacobian matrix
     V: same as state but with complex numbers (i.e. [V0_re+j*V0_im, V1_re+j*V1_im, ...])
+
+    z, h and the rows of H for PV nodes are calculated for all nodes of the same BusType at once.
+
+    @param system: model of the system (nodes, lines, topology)
+    @param solver_type: - "sparse": H is assembled as scipy.sparse matrix and the Newton step is calculated
+                          with a sparse LU factorization of H
+                        - "dense": H is assembled as dense np.array and inverted in every iteration
+    @param initial_state: initial voltages, None for flat start, object of class results.Results (e.g. the results
+                          of the previous calculation) or np.array with the complex node voltages in per unit
+    @param tolerance: the iterations stop when max(abs(delta_state)) <= tolerance
+    @param max_iter: maximum number of iterations
+    @param update_node_values: if True node types, voltages and powers are read from the nodes
+                               (see network.SystemArrays.update_node_values)
+    return: 1. np.array V - node voltages in per unit
+            2. object of class results.ConvergenceReport
     """
+    if solver_type not in ("sparse", "dense"):
+        raise Exception("solver_type must be 'sparse' or 'dense'")
+
+    arrays = system.arrays
+    if update_node_values:
+        arrays.update_node_values()
+    nodes_num = arrays.nodes_num
+    node_type = arrays.node_type
+    voltage_pu = arrays.node_voltage_pu
+    power_pu = arrays.node_power_pu
+    Ymatrix = system.Ymatrix_sparse
+    if solver_type == "sparse":
+        # the rows of H for SLACK and PQ nodes do not change during the iterations,
+        # they are factorized once and reused as long as topology and node types stay the same
+        factorization = arrays.solver_cache.get("powerflow")
+        if factorization is None or not factorization.matches(Ymatrix, node_type):
+            factorization = JacobianFactorization(Ymatrix, node_type)
+            arrays.solver_cache["powerflow"] = factorization
+        H = factorization.H
+    elif solver_type == "dense":
+        H = calculate_constant_jacobian(Ymatrix, node_type).toarray()
 
-    nodes_num = system.get_nodes_num()
+    slack_idx = np.flatnonzero(node_type == BusType.SLACK.value)
+    pq_idx = np.flatnonzero(node_type == BusType.PQ.value)
+    pv_idx = np.flatnonzero(node_type == BusType.PV.value)
+    pv_num = len(pv_idx)
+
+    # z for SLACK and PV nodes is constant
     z = np.zeros(2 * nodes_num)
-    h = np.zeros(2 * nodes_num)
-    H = np.zeros((2 * nodes_num, 2 * nodes_num))
-
-    for node in system.nodes:
-        if node.ideal_connected_with == '':
-            i = node.index
-            m = 2 * i
-            i2 = i + nodes_num
-            node_type = node.type
-            if node_type == BusType.SLACK:
-                z[m] = np.real(node.voltage_pu)
-                z[m + 1] = np.imag(node.voltage_pu)
-                H[m][i] = 1
-                H[m + 1][i2] = 1
-            elif node_type is BusType.PQ:
-                H[m][:nodes_num] = np.real(system.Ymatrix[i])
-                H[m][nodes_num:] = - np.imag(system.Ymatrix[i])
-                H[m+1][:nodes_num] = np.imag(system.Ymatrix[i])
-                H[m+1][nodes_num:] = np.real(system.Ymatrix[i])
-            elif node_type is BusType.PV:
-                z[m] = np.real(node.power_pu)
-                z[m + 1] = np.abs(node.voltage_pu)
-
-    epsilon = 10 ** (-10)
+    z[2 * slack_idx] = np.real(voltage_pu[slack_idx])
+    z[2 * slack_idx + 1] = np.imag(voltage_pu[slack_idx])
+    z[2 * pv_idx] = np.real(power_pu[pv_idx])
+    z[2 * pv_idx + 1] = np.abs(voltage_pu[pv_idx])
+
+    # rows of the admittance matrix for PV nodes, they are needed to calculate the rows of H for PV nodes
+    Ypv = Ymatrix[pv_idx].tocoo()
+    Gpv = np.real(Ypv.data)
+    Bpv = np.imag(Ypv.data)
+    if solver_type == "sparse":
+        # rows and columns of the entries of the PV rows of H in the order calculated below
+        # (two rows per PV node in factorization.solve)
+        k = np.arange(pv_num)
+        pv_rows = np.concatenate((2 * Ypv.row, 2 * Ypv.row, 2 * k, 2 * k, 2 * k + 1, 2 * k + 1))
+        pv_cols = np.concatenate((Ypv.col, Ypv.col + nodes_num, pv_idx, pv_idx + nodes_num, pv_idx,
+                                  pv_idx + nodes_num))
+    elif solver_type == "dense":
+        pv_rows = 2 * pv_idx[Ypv.row]
+
     diff = 5
-    V = np.ones(nodes_num) + 1j * np.zeros(nodes_num)
+    V = get_initial_voltages(initial_state, nodes_num)
     num_iter = 0
 
-    state = np.concatenate((np.ones(nodes_num), np.zeros(nodes_num)), axis=0)
-
-    while diff > epsilon:
-        for node in system.nodes:
-            if node.ideal_connected_with == '':
-                i = node.index
-                m = 2 * i
-                i2 = i + nodes_num
-                node_type = node.type
-                if node_type is BusType.SLACK:
-                    h[m] = np.inner(H[m], state)
-                    h[m + 1] = np.inner(H[m + 1], state)
-                elif node_type is BusType.PQ:
-                    z[m] = (np.real(node.power_pu) * np.real(V[i]) +
-                            np.imag(node.power_pu) * np.imag(V[i])) / (np.abs(V[i]) ** 2)
-                    z[m + 1] = (np.real(node.power_pu) * np.imag(V[i]) -
-                                np.imag(node.power_pu) * np.real(V[i])) / (np.abs(V[i]) ** 2)
-                    h[m] = np.inner(H[m], state)
-                    h[m + 1] = np.inner(H[m + 1], state)
-                elif node_type is BusType.PV:
-                    h[m] = np.real(V[i]) * (np.inner(np.real(system.Ymatrix[i]), np.real(V)) -
-                                            np.inner(np.imag(system.Ymatrix[i]), np.imag(V))) + \
-                           np.imag(V[i]) * (np.inner(np.real(system.Ymatrix[i]), np.imag(V)) +
-                                            np.inner(np.imag(system.Ymatrix[i]), np.real(V)))
-                    h[m + 1] = np.abs(V[i])
-                    H[m][:nodes_num] = np.real(V) * np.real(system.Ymatrix[i]) + np.imag(V) * np.imag(system.Ymatrix[i])
-                    H[m][i] = H[m][i] + np.inner(np.real(system.Ymatrix[i]), np.real(V)) - \
-                        np.inner(np.imag(system.Ymatrix[i]), np.imag(V))
-                    H[m][nodes_num:] = np.imag(V) * np.real(system.Ymatrix[i]) - np.real(V) * np.imag(system.Ymatrix[i])
-                    H[m][i2] = H[m][i2] + np.inner(np.real(system.Ymatrix[i]), np.imag(V)) + \
-                        np.inner(np.imag(system.Ymatrix[i]), np.real(V))
-                    H[m + 1][i] = np.cos(np.angle(V[i]))
-                    H[m + 1][i2] = np.sin(np.angle(V[i]))
+    state = np.concatenate((np.real(V), np.imag(V)), axis=0)
+
+    while diff > tolerance and num_iter < max_iter:
+        # node currents calculated from the voltages of the previous iteration
+        YV = Ymatrix.dot(V)
+        # h(x) for SLACK and PQ nodes (the rows of H for these nodes are constant)
+        h = H.dot(state)
+
+        # PQ nodes: expected currents conj(S/V)
+        Ipq = np.conj(power_pu[pq_idx] / V[pq_idx])
+        z[2 * pq_idx] = np.real(Ipq)
+        z[2 * pq_idx + 1] = np.imag(Ipq)
+
+        # PV nodes: active power and voltage magnitude
+        Vpv = V[pv_idx]
+        YVpv = YV[pv_idx]
+        h[2 * pv_idx] = np.real(Vpv) * np.real(YVpv) + np.imag(Vpv) * np.imag(YVpv)
+        h[2 * pv_idx + 1] = np.abs(Vpv)
+        Vcol = V[Ypv.col]
+        Hpv_re = np.real(Vcol) * Gpv + np.imag(Vcol) * Bpv
+        Hpv_im = np.imag(Vcol) * Gpv - np.real(Vcol) * Bpv
+        cos_pv = np.cos(np.angle(Vpv))
+        sin_pv = np.sin(np.angle(Vpv))
 
         r = np.subtract(z, h)
-        Hinv = np.linalg.inv(H)
-        delta_state = np.inner(Hinv, r)
+        if solver_type == "dense":
+            H[2 * pv_idx] = 0
+            H[pv_rows, Ypv.col] = Hpv_re
+            H[pv_rows, Ypv.col + nodes_num] = Hpv_im
+            H[2 * pv_idx, pv_idx] += np.real(YVpv)
+            H[2 * pv_idx, pv_idx + nodes_num] += np.imag(YVpv)
+            H[2 * pv_idx + 1, pv_idx] = cos_pv
+            H[2 * pv_idx + 1, pv_idx + nodes_num] = sin_pv
+            Hinv = np.linalg.inv(H)
+            delta_state = np.inner(Hinv, r)
+        elif solver_type == "sparse":
+            pv_data = np.concatenate((Hpv_re, Hpv_im, np.real(YVpv), np.imag(YVpv), cos_pv, sin_pv))
+            Hpv = sp.csr_matrix((pv_data, (pv_rows, pv_cols)), shape=(2 * pv_num, 2 * nodes_num))
+            delta_state = factorization.solve(r, Hpv)
         state = state + delta_state
         diff = np.amax(np.absolute(delta_state))
 
         V = state[:nodes_num] + 1j * state[nodes_num:]
         num_iter = num_iter + 1
 
-    # calculate all the other quantities of the grid
-    powerflow_results = Results(system)
-    powerflow_results.load_voltages(V)
-    powerflow_results.calculate_all()
-    print (powerflow_results)
-    return powerflow_results, num_iter
+    converged = diff <= tolerance
+    if not converged:
+        print('WARNING: powerflow did not converge after {} iterations (mismatch={})'.format(num_iter, diff))
+
+    return V, ConvergenceReport(num_iter, diff, converged, tolerance, max_iter)
+
+
+def solve_bfs(system, initial_state=None, tolerance=10 ** (-10), max_iter=100, update_node_values=True):
+    """
+    It performs powerflow for radial grids with the backward/forward sweep method.
+    The grid is traversed as tree with the SLACK node as root (see RadialOrdering), grids consisting of
+    several radial feeders with one SLACK node each are traversed as forest. In every iteration
+
+    I_inj = conj(S/V)                                   (node current injections, SLACK excluded)
+    J[k] = -I_inj[k] + sum(J[c] for children c of k)    (backward sweep, current from parent into node k)
+    V[k] = V[parent[k]] - J[k] / y[k]                   (forward sweep, y[k]: admittance of the branch parent-k)
+
+    Nodes with the same depth in the tree are processed together, the cost of an iteration is O(nodes_num).
+
+    @param system: model of the system (nodes, lines, topology), it must be radial (see get_radial_ordering)
+    @param initial_state: initial voltages, None for flat start, object of class results.Results (e.g. the results
+                          of the previous calculation) or np.array with the complex node voltages in per unit
+    @param tolerance: the iterations stop when max(abs(delta_V)) <= tolerance
+    @param max_iter: maximum number of iterations
+    @param update_node_values: if True node types, voltages and powers are read from the nodes
+                               (see network.SystemArrays.update_node_values)
+    return: 1. np.array V - node voltages in per unit
+            2. object of class results.ConvergenceReport
+    """
+    arrays = system.arrays
+    if update_node_values:
+        arrays.update_node_values()
+    ordering = get_radial_ordering(system)
+    if ordering is None:
+        raise Exception("solve_bfs requires a radial grid without PV nodes and with one SLACK node per feeder")
+
+    roots = ordering.roots
+    power_pu = arrays.node_power_pu
+    V = get_initial_voltages(initial_state, arrays.nodes_num)
+    V[roots] = arrays.node_voltage_pu[roots]
+    diff = 5
+    num_iter = 0
+
+    while diff > tolerance and num_iter < max_iter:
+        # current injections calculated from the voltages of the previous iteration
+        J = - np.conj(power_pu / V)
+        # backward sweep: sum up the branch currents from the leaves to the root
+        for level in reversed(ordering.levels):
+            np.add.at(J, ordering.parent[level], J[level])
+        # forward sweep: update the voltages from the root to the leaves
+        V_new = V.copy()
+        for level in ordering.levels:
+            V_new[level] = V_new[ordering.parent[level]] - J[level] * ordering.z[level]
+
+        diff = np.amax(np.absolute(V_new - V))
+        V = V_new
+        num_iter = num_iter + 1
+
+    converged = diff <= tolerance
+    if not converged:
+        print('WARNING: powerflow did not converge after {} iterations (mismatch={})'.format(num_iter, diff))
+
+    return V, ConvergenceReport(num_iter, diff, converged, tolerance, max_iter)
+
+
+def get_radial_ordering(system):
+    """
+    return the RadialOrdering of the system (rooted at the SLACK nodes) if backward/forward sweep can be applied,
+    i.e. there are no PV nodes and the grid is a tree with one SLACK node (or a forest of radial feeders with
+    one SLACK node each), otherwise None
+    The node types are read from system.arrays (see SystemArrays.update_node_values)
+    The ordering only depends on the topology and is stored in system.arrays.solver_cache
+    """
+    arrays = system.arrays
+    slack_idx = np.flatnonzero(arrays.node_type == BusType.SLACK.value)
+    if len(slack_idx) == 0 or np.any(arrays.node_type == BusType.PV.value):
+        return None
+    key = ("radial", slack_idx.tobytes())
+    if key not in arrays.solver_cache:
+        ordering = RadialOrdering(arrays, slack_idx)
+        arrays.solver_cache[key] = ordering if ordering.is_radial else None
+    return arrays.solver_cache[key]
+
+
+class RadialOrdering():
+    def __init__(self, arrays, roots):
+        """
+        Tree ordering of a radial grid derived from the branches of the system
+        The roots are connected to an auxiliary node (index nodes_num), so that the feeders of all roots
+        form one tree. is_radial is False if the grid is meshed or if there are nodes which are not
+        connected to any root.
+        @param arrays: object of class network.SystemArrays
+        @param roots: np.array with the indices of the root nodes (SLACK nodes)
+        """
+        nodes_num = arrays.nodes_num
+        fr = arrays.branch_start
+        to = arrays.branch_end
+        self.roots = roots
+        self.is_radial = False
+        if arrays.branches_num != nodes_num - len(roots):
+            return
+
+        aux = np.full(len(roots), nodes_num)
+        rows = np.concatenate((fr, to, aux, roots))
+        cols = np.concatenate((to, fr, roots, aux))
+        adjacency = sp.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(nodes_num + 1, nodes_num + 1))
+        order, parent = breadth_first_order(adjacency, nodes_num, directed=False, return_predecessors=True)
+        if len(order) != nodes_num + 1:
+            return
+        self.is_radial = True
+        self.parent = parent[:nodes_num]
+
+        # impedance of the branch which connects each node with its parent
+        child = np.where(parent[to] == fr, to, fr)
+        self.z = np.zeros(nodes_num, dtype=complex)
+        self.z[child] = 1 / arrays.branch_y_pu
+
+        # nodes grouped by their depth in the tree (roots excluded), in breadth first order
+        depth = np.zeros(nodes_num + 1, dtype=int)
+        for node in order[1 + len(roots):]:
+            depth[node] = depth[parent[node]] + 1
+        nodes = order[1 + len(roots):]
+        self.levels = np.split(nodes, np.flatnonzero(np.diff(depth[nodes])) + 1) if len(nodes) > 0 else []
+
+
+def calculate_constant_jacobian(Ymatrix, node_type):
+    """
+    Assemble the rows of the Jacobian H for SLACK and PQ nodes as sparse matrix (the rows for PV nodes are zero)
+
+    @param Ymatrix: admittance matrix (scipy.sparse.csr_matrix)
+    @param node_type: np.array with the BusType values of the nodes (in the order of node.index)
+    return: scipy.sparse.csr_matrix H with shape (2 * nodes_num, 2 * nodes_num)
+    """
+    nodes_num = len(node_type)
+
+    # SLACK nodes: H[2i][i] = 1 and H[2i+1][i+nodes_num] = 1
+    slack_idx = np.flatnonzero(node_type == BusType.SLACK.value)
+    rows = [2 * slack_idx, 2 * slack_idx + 1]
+    cols = [slack_idx, slack_idx + nodes_num]
+    data = [np.ones(len(slack_idx)), np.ones(len(slack_idx))]
+
+    # PQ nodes: rows of the admittance matrix split in real and imaginary parts
+    pq_idx = np.flatnonzero(node_type == BusType.PQ.value)
+    Ypq = Ymatrix[pq_idx].tocoo()
+    m = 2 * pq_idx[Ypq.row]
+    rows += [m, m, m + 1, m + 1]
+    cols += [Ypq.col, Ypq.col + nodes_num, Ypq.col, Ypq.col + nodes_num]
+    data += [np.real(Ypq.data), -np.imag(Ypq.data), np.imag(Ypq.data), np.real(Ypq.data)]
+
+    return sp.csr_matrix((np.concatenate(data), (np.concatenate(rows), np.concatenate(cols))),
+                         shape=(2 * nodes_num, 2 * nodes_num))
+
+
+class JacobianFactorization():
+    def __init__(self, Ymatrix, node_type):
+        """
+        Sparse LU factorization of the constant part of the Jacobian H used by solve
+        The rows of PV nodes depend on the voltages and change in every iteration. For the factorization
+        they are replaced by unit rows (as for SLACK nodes), the actual rows are taken into account as
+        low-rank update of rank 2*(number of PV nodes) using the Woodbury identity:
+        H^-1 = A^-1 - A^-1*U*(I + D*A^-1*U)^-1*D*A^-1
+        with A: factorized matrix, U: selection of the PV rows, D: difference between actual and unit PV rows
+        If there are no PV nodes the factorization of H is used directly.
+        @param Ymatrix: admittance matrix (scipy.sparse.csr_matrix)
+        @param node_type: np.array with the BusType values of the nodes (in the order of node.index)
+        """
+        nodes_num = len(node_type)
+        self.Ymatrix = Ymatrix
+        self.node_type = np.array(node_type, copy=True)
+        self.H = calculate_constant_jacobian(Ymatrix, node_type)
+
+        # rows of H for PV nodes, two consecutive rows for each PV node
+        pv_idx = np.flatnonzero(node_type == BusType.PV.value)
+        self.pv_num = len(pv_idx)
+        self.pv_rows = np.ravel(np.column_stack((2 * pv_idx, 2 * pv_idx + 1)))
+        pv_cols = np.ravel(np.column_stack((pv_idx, pv_idx + nodes_num)))
+        self.E = sp.csr_matrix((np.ones(2 * self.pv_num), (np.arange(2 * self.pv_num), pv_cols)),
+                               shape=(2 * self.pv_num, 2 * nodes_num))
+        E_full = sp.csr_matrix((np.ones(2 * self.pv_num), (self.pv_rows, pv_cols)),
+                               shape=(2 * nodes_num, 2 * nodes_num))
+        self.lu = spla.splu((self.H + E_full).tocsc())
+
+        # A^-1*U, calculated once for all iterations
+        if self.pv_num > 0:
+            U = np.zeros((2 * nodes_num, 2 * self.pv_num))
+            U[self.pv_rows, np.arange(2 * self.pv_num)] = 1
+            self.AinvU = self.lu.solve(U)
+
+    def matches(self, Ymatrix, node_type):
+        """
+        check if the factorization was calculated for this admittance matrix and these node types
+        """
+        return Ymatrix is self.Ymatrix and np.array_equal(node_type, self.node_type)
+
+    def solve(self, r, Hpv=None):
+        """
+        solve H*x = r
+        @param r: right-hand side (np.array)
+        @param Hpv: rows of H for the PV nodes (scipy.sparse matrix with shape (2*pv_num, 2*nodes_num)),
+                    in the order of the PV nodes in node.index
+        return: solution x (np.array)
+        """
+        x = self.lu.solve(r)
+        if self.pv_num == 0:
+            return x
+        D = Hpv - self.E
+        C = np.eye(2 * self.pv_num) + D.dot(self.AinvU)
+        return x - self.AinvU.dot(np.linalg.solve(C, D.dot(x)))
@@ -1,68 +1,461 @@
+import warnings
 import numpy as np
-from pyvolt.results import Results
+import scipy.linalg
+import scipy.sparse as sp
+import scipy.sparse.linalg as spla
+from pyvolt.network import run_islands
+from pyvolt.results import Results, ConvergenceReport, get_initial_voltages, merge_convergence_reports
 from pyvolt.measurement import *
 
 
-def DsseCall(system, measurements, solver_type="conventional"):
+def DsseCall(system, measurements, solver_type="conventional", initial_state=None, tolerance=10 ** (-6),
+             max_iter=100, gain_solver="factorized", islands=False, processes=None):
     """
     Performs state estimation
     It identifies the type of measurements present in the measurement set and
     calls the appropriate estimator for dealing with them.
+    To estimate many snapshots of the same measurement set use StateEstimator directly.
 
     @param system: model of the system (nodes, lines, topology)
     @param measurements: Vector of measurements in Input (voltages, currents, powers)
-    return: object of class results.Results
-    """
-
-    # select type of Estimator.
-    # if at least a PMU is present we launch the combined estimator, 
-    # otherwise a simple traditional etimator
-    Vmag_meas = 0
-    Vpmu_meas = 0
-    for elem in measurements.measurements:
-        if elem.meas_type == MeasType.V_mag:
-            Vmag_meas += 1
-        elif elem.meas_type == MeasType.Vpmu_mag:
-            Vpmu_meas += 1
-
-    trad_code = 1 if Vmag_meas > 0 else 0
-    PMU_code = 2 if Vpmu_meas > 0 else 0
-    est_code = trad_code + PMU_code
-
-    # number of nodes of the grid
-    nodes_num = system.get_nodes_num()
-
-    Gmatrix = system.Ymatrix.real
-    Bmatrix = system.Ymatrix.imag
-    Yabs_matrix = np.absolute(system.Ymatrix)
-    Yphase_matrix = np.angle(system.Ymatrix)
-
-    # Bring measurements in correct order for SE algorithm
-    measurements = measurements.getSortedMeasurementSet()
-
-    # run Estimator.
-    if solver_type == "conventional":
-        if est_code == 1:
-            Vest = DsseTrad(nodes_num, measurements, Gmatrix, Bmatrix, Yabs_matrix, Yphase_matrix)
-        elif est_code == 2:
-            Vest = DssePmu(nodes_num, measurements, Gmatrix, Bmatrix)
-        else:
-            Vest = DsseMixed(nodes_num, measurements, Gmatrix, Bmatrix, Yabs_matrix, Yphase_matrix)
-    elif solver_type == "advanced":
+    @param solver_type: "conventional" or "advanced" (DsseAllocation)
+    @param initial_state: initial voltages, None for flat start, object of class results.Results (e.g. the results
+                          of the previous estimation) or np.array with the complex node voltages in per unit
+    @param tolerance: the iterations stop when max(abs(Delta_State)) <= tolerance
+    @param max_iter: maximum number of iterations
+    @param gain_solver: solver for the gain matrix system G * Delta_State = g (see GainMatrixSolver)
+    @param islands: True to estimate the electrical islands of the system separately (see DsseIslands) if there
+                    are several islands
+    @param processes: number of worker processes for the islands (see network.run_islands)
+    return: object of class results.Results (results.convergence contains the results.ConvergenceReport)
+    """
+    if islands and system.get_islands()[0] > 1:
+        Vest, report = DsseIslands(system, measurements, solver_type, initial_state, tolerance, max_iter,
+                                   gain_solver, processes)
+        results = Results(system)
+        results.load_voltages(Vest)
+        results.calculate_all()
+        results.convergence = report
+        return results
+
+    estimator = StateEstimator(system, measurements, solver_type, gain_solver)
+    return estimator.estimate(initial_state=initial_state, tolerance=tolerance, max_iter=max_iter)
+
+
+def DsseIslands(system, measurements, solver_type="conventional", initial_state=None, tolerance=10 ** (-6),
+                max_iter=100, gain_solver="factorized", processes=None):
+    """
+    Performs state estimation for each electrical island of the system (see network.System.split_islands)
+    The measurements are assigned to the island of the measured node (start node for branch measurements) and
+    the islands are estimated concurrently in a process pool (see network.run_islands). The nodes of islands
+    without measurements get the voltage 0.
+
+    @param processes: number of worker processes, None for os.cpu_count(), 1 to estimate the islands one after the
+                      other in this process
+    see DsseCall for the other parameters
+    return: 1. np.array with the estimated complex node voltages in per unit of the whole system
+            2. object of class results.ConvergenceReport of all islands (see results.merge_convergence_reports)
+    """
+    nodes_num = system.arrays.nodes_num
+    V_initial = None if initial_state is None else get_initial_voltages(initial_state, nodes_num)
+    _, node_island = system.get_islands()
+    islands = system.split_islands()
+    # index in the island of each node and position in island.system.branches of each branch of the system
+    island_node_index = np.zeros(nodes_num, dtype=int)
+    island_branch_position = np.zeros(len(system.branches), dtype=int)
+    for island in islands:
+        island_node_index[island.node_indices] = np.arange(len(island.node_indices))
+        island_branch_position[island.branch_indices] = np.arange(len(island.branch_indices))
+    branch_positions = {id(branch): position for position, branch in enumerate(system.branches)}
+    is_node = measurements.element_type == ElemType.Node.value
+    meas_island = np.array([node_island[element.index] if node else node_island[element.start_node.index]
+                            for element, node in zip(measurements.elements, is_node)], dtype=int)
+
+    estimated_islands = []
+    arguments = []
+    for number, island in enumerate(islands):
+        meas_indices = np.flatnonzero(meas_island == number)
+        if len(meas_indices) == 0:
+            print('WARNING: the island of the node with uuid={} has no measurements, its voltages are set to 0'.format(
+                island.system.nodes[0].uuid))
+            continue
+        # the measured elements are replaced by their copies in the island
+        island_measurements = measurements.get_subset(meas_indices)
+        island_measurements.elements = [
+            island.system.arrays.nodes[island_node_index[measurements.elements[index].index]] if is_node[index] else
+            island.system.branches[island_branch_position[branch_positions[id(measurements.elements[index])]]]
+            for index in meas_indices.tolist()]
+        estimated_islands.append(island)
+        arguments.append((island.system, island_measurements, solver_type,
+                          None if V_initial is None else V_initial[island.node_indices], tolerance, max_iter,
+                          gain_solver))
+    solutions = run_islands(estimate_voltages, arguments, processes)
+
+    Vest = np.zeros(nodes_num, dtype=complex)
+    for island, (V_island, _) in zip(estimated_islands, solutions):
+        Vest[island.node_indices] = V_island
+    report = merge_convergence_reports([report for _, report in solutions], tolerance, max_iter)
+    return Vest, report
+
+
+def estimate_voltages(system, measurements, solver_type="conventional", initial_state=None, tolerance=10 ** (-6),
+                      max_iter=100, gain_solver="factorized"):
+    """
+    Performs state estimation without calculating the other quantities of the grid (see DsseCall for the parameters)
+
+    return: 1. np.array with the estimated complex node voltages in per unit (in the order of node.index)
+            2. object of class results.ConvergenceReport
+    """
+    estimator = StateEstimator(system, measurements, solver_type, gain_solver)
+    return estimator.estimate_state(initial_state=initial_state, tolerance=tolerance, max_iter=max_iter)
+
+
+class StateEstimator():
+    def __init__(self, system, measurements, solver_type="conventional", gain_solver="factorized"):
+        """
+        State estimator compiled for a system and the layout of a measurement set (elements, types and
+        uncertainties of the measurements). Everything which does not depend on the measured values (sorting of
+        the measurements, index arrays, constant blocks of the Jacobian, ordering of the gain matrix) is
+        calculated once, so that each snapshot only supplies a vector with the measured values (see estimate).
+        The estimator must be compiled again if the topology of the system or the measurement layout changes.
+
+        @param system: model of the system (nodes, lines, topology)
+        @param measurements: object of class MeasurementSet
+        @param solver_type: "conventional" or "advanced" (DsseAllocation)
+        @param gain_solver: solver for the gain matrix system G * Delta_State = g (see GainMatrixSolver)
+        """
+        if solver_type not in ("conventional", "advanced"):
+            raise Exception("solver_type must be 'conventional' or 'advanced'")
+        if gain_solver not in ("factorized", "pinv"):
+            raise Exception("gain_solver must be 'factorized' or 'pinv'")
+        self.system = system
+        self.solver_type = solver_type
+        self.gain_solver = gain_solver
+
+        # select type of Estimator.
+        # if at least a PMU is present we launch the combined estimator,
+        # otherwise a simple traditional etimator
+        Vmag_meas = measurements.getNumberOfMeasurements(MeasType.V_mag)
+        Vpmu_meas = measurements.getNumberOfMeasurements(MeasType.Vpmu_mag)
+        trad_code = 1 if Vmag_meas > 0 else 0
+        PMU_code = 2 if Vpmu_meas > 0 else 0
+        self.est_code = trad_code + PMU_code
         # TODO: derive from system inj_code analyzing whether load and gens connected to all nodes
-        inj_code = 1
-        if inj_code == 1 or inj_code == 2:
-            Vest = DsseAllocation(nodes_num, measurements, Gmatrix, Bmatrix, Yabs_matrix, Yphase_matrix, est_code, inj_code)
+        self.inj_code = 1 if solver_type == "advanced" else 0
+
+        # number of nodes of the grid
+        self.nodes_num = system.arrays.nodes_num
+
+        # the admittance matrix is used in sparse format (scipy.sparse.csr_matrix)
+        Ymatrix = system.Ymatrix_sparse
+        self.Gmatrix = Ymatrix.real
+        self.Bmatrix = Ymatrix.imag
+        self.Yabs_matrix = abs(Ymatrix)
+        self.Yphase_matrix = sp.csr_matrix((np.angle(Ymatrix.data), Ymatrix.indices, Ymatrix.indptr),
+                                           shape=Ymatrix.shape)
+
+        # Bring measurements in correct order for SE algorithm
+        # self.measurements.measurements[k] is a copy of measurements.measurements[self.meas_order[k]]
+        self.measurement_set = measurements
+        self.meas_order = measurements.getSortedIndex()
+        self.measurements = measurements.getSortedMeasurementSet()
+
+        # DsseTrad and DsseAllocation without PMUs do not include the imaginary part of the voltage of node 0
+        type = 2 if self.est_code == 1 else 1
+        # the plan only depends on the topology and on the measurement set, the plan of the last measurement set
+        # is stored in system.arrays.solver_cache (which is kept for each breaker configuration, see
+        # network.TopologyCache)
+        key = (self.inj_code, type, tuple(map(id, self.measurements.elements)),
+               self.measurements.meas_type.tobytes(), self.measurements.std_dev.tobytes())
+        cached_key, self.plan = system.arrays.solver_cache.get("state_estimator", (None, None))
+        if cached_key != key:
+            self.plan = EstimatorPlan(self.nodes_num, self.measurements, self.Gmatrix, self.Bmatrix,
+                                      self.Yabs_matrix, self.Yphase_matrix, self.inj_code, type)
+            system.arrays.solver_cache["state_estimator"] = (key, self.plan)
+
+    def estimate(self, meas_values=None, initial_state=None, tolerance=10 ** (-6), max_iter=100):
+        """
+        Performs state estimation for a snapshot of measured values (see estimate_state for the parameters) and
+        calculates all the other quantities of the grid
+
+        return: object of class results.Results (results.convergence contains the results.ConvergenceReport)
+        """
+        Vest, report = self.estimate_state(meas_values, initial_state, tolerance, max_iter)
+
+        # calculate all the other quantities of the grid
+        results = Results(self.system)
+        results.load_voltages(Vest)
+        results.calculate_all()
+        results.convergence = report
+
+        return results
+
+    def estimate_state(self, meas_values=None, initial_state=None, tolerance=10 ** (-6), max_iter=100):
+        """
+        Performs state estimation for a snapshot of measured values
+
+        @param meas_values: np.array with the measured values (affected by uncertainty) in the order of
+                            the measurement set used to compile the estimator, None to use the current
+                            meas_value of the measurements
+        @param initial_state: initial voltages, None for flat start, object of class results.Results (e.g. the
+                              results of the previous estimation) or np.array with the complex node voltages in pu
+        @param tolerance: the iterations stop when max(abs(Delta_State)) <= tolerance
+        @param max_iter: maximum number of iterations
+        return: 1. np.array with the estimated complex node voltages in per unit (in the order of node.index)
+                2. object of class results.ConvergenceReport
+        """
+        if meas_values is None:
+            meas_values = self.measurement_set.meas_value
+        meas_values = np.asarray(meas_values, dtype=float)
+        if meas_values.shape != self.meas_order.shape:
+            raise Exception("meas_values must contain {} values".format(len(self.meas_order)))
+        meas_values = meas_values[self.meas_order]
+
+        # run Estimator.
+        if self.solver_type == "conventional":
+            if self.est_code == 1:
+                Vest, report = DsseTrad(self.nodes_num, self.measurements, self.Gmatrix, self.Bmatrix,
+                                        self.Yabs_matrix, self.Yphase_matrix, initial_state, tolerance, max_iter,
+                                        self.gain_solver, self.plan, meas_values)
+            elif self.est_code == 2:
+                Vest, report = DssePmu(self.nodes_num, self.measurements, self.Gmatrix, self.Bmatrix, initial_state,
+                                       tolerance, max_iter, self.gain_solver, self.plan, meas_values)
+            else:
+                Vest, report = DsseMixed(self.nodes_num, self.measurements, self.Gmatrix, self.Bmatrix,
+                                         self.Yabs_matrix, self.Yphase_matrix, initial_state, tolerance, max_iter,
+                                         self.gain_solver, self.plan, meas_values)
+        elif self.solver_type == "advanced":
+            Vest, report = DsseAllocation(self.nodes_num, self.measurements, self.Gmatrix, self.Bmatrix,
+                                          self.Yabs_matrix, self.Yphase_matrix, self.est_code, self.inj_code,
+                                          initial_state, tolerance, max_iter, self.gain_solver, self.plan,
+                                          meas_values)
+
+        return Vest, report
+
+
+class EstimatorPlan():
+    def __init__(self, nodes_num, measurements, Gmatrix, Bmatrix, Yabs_matrix, Yphase_matrix, inj_code, type):
+        """
+        Part of a state estimation problem which does not depend on the measured values: index arrays of
+        the measurements and of the measured nodes, weights and constant blocks of the Jacobian
+
+        @param nodes_num: number of nodes of the grid
+        @param measurements: object of class MeasurementSet, sorted in the order required by the SE algorithm
+        @param Gmatrix: real part of the admittance matrix
+        @param Bmatrix: imaginary part of the admittance matrix
+        @param Yabs_matrix: module of the admittance matrix (None if current magnitude measurements are not used)
+        @param Yphase_matrix: angles of the admittance matrix (None if current magnitude measurements are not used)
+        @param inj_code: additional number of variables to be considered when running the DsseAllocation method
+        @param type: 1 for DssePmu and DsseMixed, 2 for DsseTrad
+        """
+        self.nodes_num = nodes_num
+        self.inj_code = inj_code
+        self.type = type
+        self.meas_num = len(measurements)
+
+        # get array which contains the index of measurements type V_mag and I_mag
+        self.vidx = measurements.getIndexOfMeasurements(type=MeasType.V_mag)
+        self.iidx = measurements.getIndexOfMeasurements(type=MeasType.I_mag)
+        # get array which contains the index of measurements type MeasType.Sinj_real, MeasType.Sinj_imag
+        self.pidx = measurements.getIndexOfMeasurements(type=MeasType.Sinj_real)
+        self.qidx = measurements.getIndexOfMeasurements(type=MeasType.Sinj_imag)
+        # get array which contains the index of measurements type MeasType.S_real, MeasType.S_imag
+        self.p1br = measurements.getIndexOfMeasurements(type=MeasType.S1_real)
+        self.p2br = measurements.getIndexOfMeasurements(type=MeasType.S2_real)
+        self.q1br = measurements.getIndexOfMeasurements(type=MeasType.S1_imag)
+        self.q2br = measurements.getIndexOfMeasurements(type=MeasType.S2_imag)
+        # get array which contains the index of the PMU measurements
+        self.Vpmu_mag_idx = measurements.getIndexOfMeasurements(type=MeasType.Vpmu_mag)
+        self.Vpmu_phase_idx = measurements.getIndexOfMeasurements(type=MeasType.Vpmu_phase)
+        self.Ipmu_mag_idx = measurements.getIndexOfMeasurements(type=MeasType.Ipmu_mag)
+        self.Ipmu_phase_idx = measurements.getIndexOfMeasurements(type=MeasType.Ipmu_phase)
+
+        # indices of the measured nodes
+        self.vidx_nodes = get_node_indices(measurements, self.vidx)
+        self.pidx_nodes = get_node_indices(measurements, self.pidx)
+        self.p1br_nodes = get_node_indices(measurements, self.p1br, "start_node")
+        self.p2br_nodes = get_node_indices(measurements, self.p2br, "end_node")
+        self.iidx_start_nodes = get_node_indices(measurements, self.iidx, "start_node")
+        self.iidx_end_nodes = get_node_indices(measurements, self.iidx, "end_node")
+        # admittances of the branches with current magnitude measurements
+        if Yabs_matrix is not None:
+            self.iidx_yabs = get_matrix_entries(Yabs_matrix, self.iidx_start_nodes, self.iidx_end_nodes)
+            self.iidx_yphase = get_matrix_entries(Yphase_matrix, self.iidx_start_nodes, self.iidx_end_nodes)
+
+        # calculate weights matrix (obtained as stdandard_deviations^-2)
+        self.weights = measurements.getWeightsMatrix()
+
+        # Jacobian for Power Injection Measurements
+        self.H2, self.H3 = calculateJacobiMatrixSinj(measurements, nodes_num, Gmatrix, Bmatrix, inj_code, type)
+        # Jacobian for branch Power Measurements
+        self.H4, self.H5 = calculateJacobiBranchPower(measurements, nodes_num, Gmatrix, Bmatrix, inj_code, type)
+        # Jacobian for Voltage Pmu Measurements
+        self.H7, self.H8 = calculateJacobiVoltagePmu(measurements, nodes_num, Gmatrix, Bmatrix, inj_code, type)
+        # Jacobian for Current Pmu Measurements
+        self.H9, self.H10 = calculateJacobiCurrentPmu(measurements, nodes_num, Gmatrix, Bmatrix, inj_code, type)
+
+        # fill-reducing orderings of the gain matrices (key: shape of the gain matrix), see GainMatrixSolver
+        self.gain_orderings = {}
+
+    def get_weight_matrix(self, meas_values):
+        """
+        return the weight matrix (object of class WeightMatrix) for the measured values meas_values
+        (the weights of the PMU measurements depend on the measured magnitudes and phases)
+        """
+        W = WeightMatrix(self.weights)
+        W = update_W_matrix(meas_values, self.weights, W, self.Vpmu_mag_idx, self.Vpmu_phase_idx)
+        W = update_W_matrix(meas_values, self.weights, W, self.Ipmu_mag_idx, self.Ipmu_phase_idx)
+        return W
+
+    def get_rectangular_values(self, meas_values):
+        """
+        return a copy of meas_values in which magnitude and phase of the PMU measurements are replaced
+        by real and imaginary part (see MeasurementSet.getMeasValues)
+        meas_values can also be a matrix with one row of measured values per snapshot
+        """
+        z = np.array(meas_values, dtype=float)
+        for index_mag, index_phase in ((self.Vpmu_mag_idx, self.Vpmu_phase_idx),
+                                       (self.Ipmu_mag_idx, self.Ipmu_phase_idx)):
+            pairs_num = min(len(index_mag), len(index_phase))
+            index_mag = index_mag[:pairs_num]
+            index_phase = index_phase[:pairs_num]
+            amp = meas_values[..., index_mag]
+            theta = meas_values[..., index_phase]
+            z[..., index_mag] = amp * np.cos(theta)
+            z[..., index_phase] = amp * np.sin(theta)
+        return z
+
+    def get_gain_matrix_solver(self, G, gain_solver):
+        """
+        return an object of class GainMatrixSolver for the gain matrix G, the fill-reducing ordering
+        of the first factorization is reused for all gain matrices with the same shape
+        """
+        solver = GainMatrixSolver(G, gain_solver, self.gain_orderings.get(G.shape))
+        if solver.ordering is not None:
+            self.gain_orderings[G.shape] = solver.ordering
+        return solver
+
+
+class LinearStateEstimator():
+    def __init__(self, system, measurements, gain_solver="factorized"):
+        """
+        Linear WLS state estimator for measurement sets with only PMU measurements (Vpmu and Ipmu).
+        In rectangular coordinates the measurement model z = H * x is linear and H is constant, so the
+        gain matrix G = H^T * W * H is factorized once and each snapshot is estimated with one solve
+        (see DssePmu for the iterative estimator).
+        The weights of the PMU measurements depend on the measured magnitudes and phases (see update_W_matrix),
+        they are calculated from the values of the first estimated snapshot and then kept constant (see
+        update_weights), so the estimator can be created before the measurements have values.
+        The estimator must be created again if the topology of the system or the measurement layout changes.
+
+        @param system: model of the system (nodes, lines, topology)
+        @param measurements: object of class MeasurementSet with measurements of type Vpmu_mag, Vpmu_phase,
+                             Ipmu_mag and Ipmu_phase
+        @param gain_solver: solver for the gain matrix system (see GainMatrixSolver)
+        """
+        if gain_solver not in ("factorized", "pinv"):
+            raise Exception("gain_solver must be 'factorized' or 'pinv'")
+        pmu_types = [MeasType.Vpmu_mag.value, MeasType.Vpmu_phase.value, MeasType.Ipmu_mag.value,
+                     MeasType.Ipmu_phase.value]
+        other_types = np.setdiff1d(measurements.meas_type, pmu_types)
+        if len(other_types) > 0:
+            raise Exception("LinearStateEstimator supports only PMU measurements, found {}".format(
+                MeasType(other_types[0])))
+
+        self.system = system
+        self.nodes_num = system.arrays.nodes_num
+        Ymatrix = system.Ymatrix_sparse
+
+        # Bring measurements in correct order for SE algorithm
+        self.measurement_set = measurements
+        self.meas_order = measurements.getSortedIndex()
+        self.measurements = measurements.getSortedMeasurementSet()
+        self.plan = EstimatorPlan(self.nodes_num, self.measurements, Ymatrix.real, Ymatrix.imag, None, None,
+                                  inj_code=0, type=1)
+        self.H = sp.vstack((self.plan.H7, self.plan.H8, self.plan.H9, self.plan.H10), format='csr')
+        self.gain_solver = gain_solver
+        # H^T * W and factorization of the gain matrix, calculated by update_weights
+        self.HtW = None
+        self.gain_matrix_solver = None
+
+    def update_weights(self, meas_values=None):
+        """
+        calculate the weight matrix W for the measured values meas_values and factorize the gain matrix
+        G = H^T * W * H again
+
+        @param meas_values: np.array with the measured values (magnitude and phase) in the order of the
+                            measurement set used to create the estimator, None to use the current meas_value
+                            of the measurements
+        """
+        if meas_values is None:
+            meas_values = self.measurement_set.meas_value
+        meas_values = np.asarray(meas_values, dtype=float)
+        if meas_values.shape != self.meas_order.shape:
+            raise Exception("meas_values must contain {} values".format(len(self.meas_order)))
+        W = self.plan.get_weight_matrix(meas_values[self.meas_order])
+        # the state is calculated as x = G^-1 * (H^T * W) * z
+        HtW = sp.csr_matrix(self.H.transpose().dot(W.tosparse()))
+        gain_matrix_solver = GainMatrixSolver(HtW.dot(self.H), self.gain_solver)
+        if self.gain_solver != "pinv" and gain_matrix_solver.Ginv is not None:
+            # the pseudo-inverse would return a wrong state
+            raise Exception("the gain matrix of the linear state estimator is singular: the grid is not observable "
+                            "or the PMU measurements have no values (e.g. magnitude 0)")
+        self.HtW = HtW
+        self.gain_matrix_solver = gain_matrix_solver
+
+    def estimate_voltages(self, meas_values):
+        """
+        return the estimated voltages in per unit
+
+        @param meas_values: np.array with the measured values (magnitude and phase) in the order of the
+                            measurement set used to create the estimator, or matrix with one row of measured
+                            values per snapshot
+        return: np.array with the complex node voltages (one row per snapshot if meas_values is a matrix)
+        """
+        meas_values = np.asarray(meas_values, dtype=float)
+        if meas_values.shape[-1] != len(self.meas_order):
+            raise Exception("meas_values must contain {} values per snapshot".format(len(self.meas_order)))
+        if self.gain_matrix_solver is None:
+            self.update_weights(meas_values if meas_values.ndim == 1 else meas_values[0])
+        # get the measured values in rectangular coordinates
+        z = self.plan.get_rectangular_values(meas_values[..., self.meas_order])
+        # the right-hand sides of all snapshots are solved at once
+        State = self.gain_matrix_solver.solve(self.HtW.dot(z.T))
+        V = State[:self.nodes_num] + 1j * State[self.nodes_num:]
+        return V.T
+
+    def estimate(self, meas_values=None):
+        """
+        Performs state estimation for a snapshot of measured values
+
+        @param meas_values: np.array with the measured values (magnitude and phase) in the order of the
+                            measurement set used to create the estimator, None to use the current meas_value
+                            of the measurements
+        return: object of class results.Results
+        """
+        if meas_values is None:
+            V = self.estimate_voltages(self.measurement_set.meas_value)
+        else:
+            V = self.estimate_voltages(meas_values)
+
+        # calculate all the other quantities of the grid
+        results = Results(self.system)
+        results.load_voltages(V)
+        results.calculate_all()
+
+        return results
 
-    # calculate all the other quantities of the grid
-    results = Results(system)
-    results.load_voltages(Vest)
-    results.calculate_all()
 
-    return results
+def get_meas_values(measurements):
+    """
+    return np.array with the measured values (affected by uncertainty) of all measurements
+    (magnitude and phase for PMU measurements)
+    """
+    return np.array(measurements.meas_value, dtype=float)
 
 
-def DsseTrad(nodes_num, measurements, Gmatrix, Bmatrix, Yabs_matrix, Yphase_matrix):
+def DsseTrad(nodes_num, measurements, Gmatrix, Bmatrix, Yabs_matrix, Yphase_matrix, initial_state=None,
+             tolerance=10 ** (-6), max_iter=100, gain_solver="factorized", plan=None, meas_values=None):
     """
     Traditional state estimator
     It performs state estimation using rectangular node voltage state variables
@@ -74,83 +467,78 @@ def DsseTrad(nodes_num, measurements, Gmatrix, Bmatrix, Yabs_matrix, Yphase_matr
     @param Bmatrix: susceptance matrix
     @param Yabs_matrix: magnitude of the admittance matrix
     @param Yphase_matrix: phase of the admittance matrix
-    return: np.array V - estimated voltages
+    @param initial_state: initial voltages, None for flat start, object of class results.Results (e.g. the results
+                          of the previous estimation) or np.array with the complex node voltages in per unit
+    @param tolerance: the iterations stop when max(abs(Delta_State)) <= tolerance
+    @param max_iter: maximum number of iterations
+    @param gain_solver: solver for the gain matrix system G * Delta_State = g (see GainMatrixSolver)
+    @param plan: object of class EstimatorPlan for measurements (type=2), None to calculate it
+    @param meas_values: np.array with the measured values in the order of measurements, None to use the
+                        meas_value of the measurements
+    return: 1. np.array V - estimated voltages
+            2. object of class results.ConvergenceReport
     """
-
-    # calculate  weightsmatrix (obtained as stdandard_deviations^-2)
-    weights = measurements.getWeightsMatrix()
-    W = np.diag(weights)
     inj_code = 0
+    if plan is None:
+        plan = EstimatorPlan(nodes_num, measurements, Gmatrix, Bmatrix, Yabs_matrix, Yphase_matrix, inj_code, type=2)
+    if meas_values is None:
+        meas_values = get_meas_values(measurements)
 
-    # Jacobian for Power Injection Measurements
-    H2, H3 = calculateJacobiMatrixSinj(measurements, nodes_num, Gmatrix, Bmatrix, inj_code, type=2)
-
-    # Jacobian for branch Power Measurements
-    H4, H5 = calculateJacobiBranchPower(measurements, nodes_num, Gmatrix, Bmatrix, inj_code, type=2)
-
-    # get array which contains the index of measurements type V_mag and I_mag
-    vidx = measurements.getIndexOfMeasurements(type=MeasType.V_mag)
-    iidx = measurements.getIndexOfMeasurements(type=MeasType.I_mag)
-    nvi = len(vidx)
-    nii = len(iidx)
-
-    # get array which contains the index of measurements type MeasType.Sinj_real, MeasType.Sinj_imag in the array measurements.measurements
-    pidx = measurements.getIndexOfMeasurements(type=MeasType.Sinj_real)
-    qidx = measurements.getIndexOfMeasurements(type=MeasType.Sinj_imag)
+    # calculate  weightsmatrix (obtained as stdandard_deviations^-2)
+    W = plan.get_weight_matrix(meas_values)
 
-    # get array which contains the index of measurements type MeasType.S_real, MeasType.S_imag in the array measurements.measurements
-    p1br = measurements.getIndexOfMeasurements(type=MeasType.S1_real)
-    p2br = measurements.getIndexOfMeasurements(type=MeasType.S2_real)
-    q1br = measurements.getIndexOfMeasurements(type=MeasType.S1_imag)
-    q2br = measurements.getIndexOfMeasurements(type=MeasType.S2_imag)
+    # Jacobian for Power Injection and branch Power Measurements
+    H2, H3, H4, H5 = plan.H2, plan.H3, plan.H4, plan.H5
 
     # get an array with all measured values (affected by uncertainty)
-    z = measurements.getMeasValues()
+    z = plan.get_rectangular_values(meas_values)
 
-    V = np.ones(nodes_num) + 1j * np.zeros(nodes_num)
-    State = np.concatenate((np.ones(nodes_num), np.zeros(nodes_num-1)), axis=0)
+    V = get_initial_voltages(initial_state, nodes_num)
+    State = np.concatenate((np.real(V), np.imag(V)[1:]), axis=0)
     epsilon = 5
     num_iter = 0
+    # with a warm start the current magnitudes can already be calculated in the first iteration
+    iter_offset = 0 if initial_state is None else 1
 
     # Iteration of Netwon Rapson method: needed to solve non-linear system of equation
-    while epsilon > 10 ** (-6):
+    while epsilon > tolerance and num_iter < max_iter:
         """ Computation of equivalent current measurements in place of the power measurements """
         # in every iteration the input power measurements are converted into currents by dividing by the voltage estimated at the previous iteration
-        z = convertSinjMeasIntoCurrents(measurements, V, z, pidx, qidx)
-        z = convertSbranchMeasIntoCurrents(measurements, V, z, p1br, q1br, p2br, q2br)
+        z = convertSinjMeasIntoCurrents(meas_values, V, z, plan.pidx, plan.qidx, plan.pidx_nodes)
+        z = convertSbranchMeasIntoCurrents(meas_values, V, z, plan.p1br, plan.q1br, plan.p2br, plan.q2br,
+                                           plan.p1br_nodes, plan.p2br_nodes)
 
         """ Voltage Magnitude Measurements """
-        h1, H1 = update_h1_vector(measurements, V, vidx, nvi, nodes_num, inj_code, type=2)
+        h1, H1 = update_h1_vector(V, plan.vidx_nodes, nodes_num, inj_code, type=2)
 
         """ Power Injection Measurements """
         # h(x) vector where power injections are present
-        h2 = np.inner(H2, State)
-        h3 = np.inner(H3, State)
+        h2 = H2.dot(State)
+        h3 = H3.dot(State)
 
         """ Power Flow Measurements """
         # h(x) vector where power flows are present
-        h4 = np.inner(H4, State)
-        h5 = np.inner(H5, State)
+        h4 = H4.dot(State)
+        h5 = H5.dot(State)
 
         """ Current Magnitude Measurements """
-        h6, H6 = update_h6_vector(measurements, V, iidx, nii, Yabs_matrix, Yphase_matrix, nodes_num, num_iter, inj_code, type=2)
+        h6, H6 = update_h6_vector(V, plan.iidx_start_nodes, plan.iidx_end_nodes, plan.iidx_yabs, plan.iidx_yphase,
+                                  nodes_num, num_iter + iter_offset, inj_code, type=2)
 
         """ WLS computation """
         # all the sub-matrixes of H calcualted so far are merged in a unique matrix
-        H = np.concatenate((H1, H2, H3, H4, H5, H6), axis=0)
+        H = sp.vstack((H1, H2, H3, H4, H5, H6), format='csr')
         # h(x) sub-vectors are concatenated
         y = np.concatenate((h1, h2, h3, h4, h5, h6), axis=0)
         # "res" is the residual vector. The difference between input measurements and h(x)
         res = np.subtract(z, y)
         # g = transpose(H) * W * res
-        g = np.inner(H.transpose(), np.inner(W, res))
-        WH = np.inner(W, H.transpose())
-        # G is the gain matrix, that will have to be inverted at each iteration
-        G = np.inner(H.transpose(), WH.transpose())
-        # inversion of G
-        Ginv = np.linalg.pinv(G)
+        g = H.transpose().dot(W.dot(res))
+        WH = W.dot(H)
+        # G is the gain matrix, the system G * Delta_State = g has to be solved at each iteration
+        G = H.transpose().dot(WH)
         # Delta includes the updates of the states for the current Newton Rapson iteration
-        Delta_State = np.inner(Ginv, g)
+        Delta_State = plan.get_gain_matrix_solver(G, gain_solver).solve(g)
         # state is updated
         State = State + Delta_State
         # calculate the NR treeshold (for the next while check)
@@ -161,10 +549,15 @@ def DsseTrad(nodes_num, measurements, Gmatrix, Bmatrix, Yabs_matrix, Yphase_matr
 
         num_iter = num_iter + 1
 
-    return V
+    converged = epsilon <= tolerance
+    if not converged:
+        print('WARNING: state estimation did not converge after {} iterations (mismatch={})'.format(num_iter, epsilon))
 
+    return V, ConvergenceReport(num_iter, epsilon, converged, tolerance, max_iter)
 
-def DssePmu(nodes_num, measurements, Gmatrix, Bmatrix):
+
+def DssePmu(nodes_num, measurements, Gmatrix, Bmatrix, initial_state=None, tolerance=10 ** (-6), max_iter=100,
+            gain_solver="factorized", plan=None, meas_values=None):
     """
     Traditional state estimator
     It performs state estimation using rectangular node voltage state variables
@@ -174,66 +567,55 @@ def DssePmu(nodes_num, measurements, Gmatrix, Bmatrix):
     @param measurements: Vector of measurements in Input (voltages, currents, powers)
     @param Gmatrix
     @param Bmatrix
-    return: np.array V - estimated voltages
+    @param initial_state: initial voltages, None for flat start, object of class results.Results (e.g. the results
+                          of the previous estimation) or np.array with the complex node voltages in per unit
+    @param tolerance: the iterations stop when max(abs(Delta_State)) <= tolerance
+    @param max_iter: maximum number of iterations
+    @param gain_solver: solver for the gain matrix system G * Delta_State = g (see GainMatrixSolver)
+    @param plan: object of class EstimatorPlan for measurements (type=1), None to calculate it
+    @param meas_values: np.array with the measured values in the order of measurements, None to use the
+                        meas_value of the measurements
+    return: 1. np.array V - estimated voltages
+            2. object of class results.ConvergenceReport
     """
-    # calculate weights matrix (obtained as stdandard_deviations^-2)
-    weights = measurements.getWeightsMatrix()
-    W = np.diag(weights)
     inj_code = 0
+    if plan is None:
+        # the current magnitude measurements are not used, Yabs_matrix and Yphase_matrix are not needed
+        plan = EstimatorPlan(nodes_num, measurements, Gmatrix, Bmatrix, None, None, inj_code, type=1)
+    if meas_values is None:
+        meas_values = get_meas_values(measurements)
 
-    # Jacobian for Power Injection Measurements
-    H2, H3 = calculateJacobiMatrixSinj(measurements, nodes_num, Gmatrix, Bmatrix, inj_code, type=1)
-
-    # Jacobian for branch Power Measurements
-    H4, H5 = calculateJacobiBranchPower(measurements, nodes_num, Gmatrix, Bmatrix, inj_code, type=1)
-
-    # Jacobian for Voltage Pmu Measurements
-    H7, H8 = calculateJacobiVoltagePmu(measurements, nodes_num, Gmatrix, Bmatrix, inj_code, type=1)
-    W = update_W_matrix(measurements, weights, W, "Vpmu")
-
-    # Jacobian for Current Pmu Measurements
-    H9, H10 = calculateJacobiCurrentPmu(measurements, nodes_num, Gmatrix, Bmatrix, inj_code, type=1)
-    W = update_W_matrix(measurements, weights, W, "Ipmu")
+    # calculate weights matrix (obtained as stdandard_deviations^-2)
+    W = plan.get_weight_matrix(meas_values)
 
     # get an array with all measured values (affected by uncertainty)
-    z = measurements.getMeasValues()
-
-    H = np.concatenate((H2, H3, H4, H5, H7, H8, H9, H10), axis=0)
-    WH = np.inner(W, H.transpose())
-    G = np.inner(H.transpose(), WH.transpose())
-    Ginv = np.linalg.pinv(G)
-
-    # get array which contains the index of measurements type MeasType.Sinj_real, MeasType.Sinj_imag in the array measurements.measurements
-    pidx = measurements.getIndexOfMeasurements(type=MeasType.Sinj_real)
-    qidx = measurements.getIndexOfMeasurements(type=MeasType.Sinj_imag)
+    z = plan.get_rectangular_values(meas_values)
 
-    # get array which contains the index of measurements type MeasType.S_real, MeasType.S_imag in the array measurements.measurements
-    p1br = measurements.getIndexOfMeasurements(type=MeasType.S1_real)
-    p2br = measurements.getIndexOfMeasurements(type=MeasType.S2_real)
-    q1br = measurements.getIndexOfMeasurements(type=MeasType.S1_imag)
-    q2br = measurements.getIndexOfMeasurements(type=MeasType.S2_imag)
-
-    # get an array with all measured values (affected by uncertainty)
-    z = measurements.getMeasValues()
+    H = sp.vstack((plan.H2, plan.H3, plan.H4, plan.H5, plan.H7, plan.H8, plan.H9, plan.H10), format='csr')
+    WH = W.dot(H)
+    G = H.transpose().dot(WH)
+    # G is constant, it is factorized only once
+    gain_matrix_solver = plan.get_gain_matrix_solver(G, gain_solver)
 
-    V = np.ones(nodes_num) + 1j * np.zeros(nodes_num)
-    State = np.concatenate((np.ones(nodes_num), np.zeros(nodes_num)), axis=0)
+    V = get_initial_voltages(initial_state, nodes_num)
+    State = np.concatenate((np.real(V), np.imag(V)), axis=0)
     epsilon = 5
     num_iter = 0
 
     # Iteration of Netwon Rapson method: needed to solve non-linear system of equation
-    while epsilon > 10 ** (-6):
+    while epsilon > tolerance and num_iter < max_iter:
         """ Computation of equivalent current measurements in place of the power measurements """
         # in every iteration the input power measurements are converted into currents by dividing by the voltage estimated at the previous iteration
-        z = convertSinjMeasIntoCurrents(measurements, V, z, pidx, qidx)
-        z = convertSbranchMeasIntoCurrents(measurements, V, z, p1br, q1br, p2br, q2br)
+        z = convertSinjMeasIntoCurrents(meas_values, V, z, plan.pidx, plan.qidx, plan.pidx_nodes)
+        z = convertSbranchMeasIntoCurrents(meas_values, V, z, plan.p1br, plan.q1br, plan.p2br, plan.q2br,
+                                           plan.p1br_nodes, plan.p2br_nodes)
 
         """ WLS computation """
-        y = np.inner(H, State)
+        y = H.dot(State)
         res = np.subtract(z, y)
-        g = np.inner(H.transpose(), np.inner(W, res))
+        g = H.transpose().dot(W.dot(res))
 
-        Delta_State = np.inner(Ginv, g)
+        Delta_State = gain_matrix_solver.solve(g)
 
         State = State + Delta_State
         epsilon = np.amax(np.absolute(Delta_State))
@@ -245,10 +627,15 @@ def DssePmu(nodes_num, measurements, Gmatrix, Bmatrix):
 
         num_iter = num_iter + 1
 
-    return V
+    converged = epsilon <= tolerance
+    if not converged:
+        print('WARNING: state estimation did not converge after {} iterations (mismatch={})'.format(num_iter, epsilon))
 
+    return V, ConvergenceReport(num_iter, epsilon, converged, tolerance, max_iter)
 
-def DsseMixed(nodes_num, measurements, Gmatrix, Bmatrix, Yabs_matrix, Yphase_matrix):
+
+def DsseMixed(nodes_num, measurements, Gmatrix, Bmatrix, Yabs_matrix, Yphase_matrix, initial_state=None,
+              tolerance=10 ** (-6), max_iter=100, gain_solver="factorized", plan=None, meas_values=None):
     """
     Traditional state estimator
     It performs state estimation using rectangular node voltage state variables
@@ -261,92 +648,79 @@ def DsseMixed(nodes_num, measurements, Gmatrix, Bmatrix, Yabs_matrix, Yphase_mat
     @param Bmatrix
     @param Yabs_matrix
     @param Yphase_matrix
-    return: np.array V (estimated voltages)
+    @param initial_state: initial voltages, None for flat start, object of class results.Results (e.g. the results
+                          of the previous estimation) or np.array with the complex node voltages in per unit
+    @param tolerance: the iterations stop when max(abs(Delta_State)) <= tolerance
+    @param max_iter: maximum number of iterations
+    @param gain_solver: solver for the gain matrix system G * Delta_State = g (see GainMatrixSolver)
+    @param plan: object of class EstimatorPlan for measurements (type=1), None to calculate it
+    @param meas_values: np.array with the measured values in the order of measurements, None to use the
+                        meas_value of the measurements
+    return: 1. np.array V - estimated voltages
+            2. object of class results.ConvergenceReport
     """
+    inj_code = 0
+    if plan is None:
+        plan = EstimatorPlan(nodes_num, measurements, Gmatrix, Bmatrix, Yabs_matrix, Yphase_matrix, inj_code, type=1)
+    if meas_values is None:
+        meas_values = get_meas_values(measurements)
 
     # calculate weights matrix (obtained as stdandard_deviations^-2)
-    weights = measurements.getWeightsMatrix()
-    W = np.diag(weights)
-    inj_code = 0
+    W = plan.get_weight_matrix(meas_values)
 
     # Jacobian Matrix. Includes the derivatives of the measurements (voltages, currents, powers) with respect to the states (voltages)
-
-    # Jacobian for Power Injection Measurements
-    H2, H3 = calculateJacobiMatrixSinj(measurements, nodes_num, Gmatrix, Bmatrix, inj_code, type=1)
-
-    # Jacobian for branch Power Measurements
-    H4, H5 = calculateJacobiBranchPower(measurements, nodes_num, Gmatrix, Bmatrix, inj_code, type=1)
-
-    # Jacobian for Voltage Pmu Measurements
-    H7, H8 = calculateJacobiVoltagePmu(measurements, nodes_num, Gmatrix, Bmatrix, inj_code, type=1)
-    W = update_W_matrix(measurements, weights, W, "Vpmu")
-
-    # Jacobian for Current Pmu Measurements
-    H9, H10 = calculateJacobiCurrentPmu(measurements, nodes_num, Gmatrix, Bmatrix, inj_code, type=1)
-    W = update_W_matrix(measurements, weights, W, "Ipmu")
-
-    # get array which contains the index of measurements type V_mag and I_mag
-    vidx = measurements.getIndexOfMeasurements(type=MeasType.V_mag)
-    iidx = measurements.getIndexOfMeasurements(type=MeasType.I_mag)
-    nvi = len(vidx)
-    nii = len(iidx)
-
-    # get array which contains the index of measurements type MeasType.Sinj_real, MeasType.Sinj_imag in the array measurements.measurements
-    pidx = measurements.getIndexOfMeasurements(type=MeasType.Sinj_real)
-    qidx = measurements.getIndexOfMeasurements(type=MeasType.Sinj_imag)
-
-    # get array which contains the index of measurements type MeasType.S_real, MeasType.S_imag in the array measurements.measurements
-    p1br = measurements.getIndexOfMeasurements(type=MeasType.S1_real)
-    p2br = measurements.getIndexOfMeasurements(type=MeasType.S2_real)
-    q1br = measurements.getIndexOfMeasurements(type=MeasType.S1_imag)
-    q2br = measurements.getIndexOfMeasurements(type=MeasType.S2_imag)
+    H2, H3, H4, H5 = plan.H2, plan.H3, plan.H4, plan.H5
+    H7, H8, H9, H10 = plan.H7, plan.H8, plan.H9, plan.H10
 
     # get an array with all measured values (affected by uncertainty)
-    z = measurements.getMeasValues()
+    z = plan.get_rectangular_values(meas_values)
 
-    V = np.ones(nodes_num) + 1j * np.zeros(nodes_num)
-    State = np.concatenate((np.ones(nodes_num), np.zeros(nodes_num)), axis=0)
+    V = get_initial_voltages(initial_state, nodes_num)
+    State = np.concatenate((np.real(V), np.imag(V)), axis=0)
     epsilon = 5
     num_iter = 0
+    # with a warm start the current magnitudes can already be calculated in the first iteration
+    iter_offset = 0 if initial_state is None else 1
 
     # Iteration of Netwon Rapson method: needed to solve non-linear system of equation
-    while epsilon > 10 ** (-6):
+    while epsilon > tolerance and num_iter < max_iter:
         """ Computation of equivalent current measurements in place of the power measurements """
-        z = convertSinjMeasIntoCurrents(measurements, V, z, pidx, qidx)
-        z = convertSbranchMeasIntoCurrents(measurements, V, z, p1br, q1br, p2br, q2br)
+        z = convertSinjMeasIntoCurrents(meas_values, V, z, plan.pidx, plan.qidx, plan.pidx_nodes)
+        z = convertSbranchMeasIntoCurrents(meas_values, V, z, plan.p1br, plan.q1br, plan.p2br, plan.q2br,
+                                           plan.p1br_nodes, plan.p2br_nodes)
 
         """ Voltage Magnitude Measurements """
-        h1, H1 = update_h1_vector(measurements, V, vidx, nvi, nodes_num, inj_code, type=1)
+        h1, H1 = update_h1_vector(V, plan.vidx_nodes, nodes_num, inj_code, type=1)
 
         """ Power Injection Measurements """
-        h2 = np.inner(H2, State)
-        h3 = np.inner(H3, State)
+        h2 = H2.dot(State)
+        h3 = H3.dot(State)
 
         """ Power Flow Measurements """
-        h4 = np.inner(H4, State)
-        h5 = np.inner(H5, State)
+        h4 = H4.dot(State)
+        h5 = H5.dot(State)
 
         """ Current Magnitude Measurements """
-        h6, H6 = update_h6_vector(measurements, V, iidx, nii, Yabs_matrix, Yphase_matrix, nodes_num, num_iter, inj_code, type=1)
+        h6, H6 = update_h6_vector(V, plan.iidx_start_nodes, plan.iidx_end_nodes, plan.iidx_yabs, plan.iidx_yphase,
+                                  nodes_num, num_iter + iter_offset, inj_code, type=1)
 
         """ PMU Voltage Measurements """
-        h7 = np.inner(H7, State)
-        h8 = np.inner(H8, State)
+        h7 = H7.dot(State)
+        h8 = H8.dot(State)
 
         """ PMU Current Measurements """
-        h9 = np.inner(H9, State)
-        h10 = np.inner(H10, State)
+        h9 = H9.dot(State)
+        h10 = H10.dot(State)
 
         """ WLS computation """
-        H = np.concatenate((H1, H2, H3, H4, H5, H6, H7, H8, H9, H10), axis=0)
+        H = sp.vstack((H1, H2, H3, H4, H5, H6, H7, H8, H9, H10), format='csr')
         y = np.concatenate((h1, h2, h3, h4, h5, h6, h7, h8, h9, h10), axis=0)
         res = np.subtract(z, y)
-        g = np.inner(H.transpose(), np.inner(W, res))
-        WH = np.inner(W, H.transpose())
-        G = np.inner(H.transpose(), WH.transpose())
+        g = H.transpose().dot(W.dot(res))
+        WH = W.dot(H)
+        G = H.transpose().dot(WH)
 
-        Ginv = np.linalg.pinv(G)
-        Delta_State = np.inner(Ginv, g)
+        Delta_State = plan.get_gain_matrix_solver(G, gain_solver).solve(g)
 
         State = State + Delta_State
         epsilon = np.amax(np.absolute(Delta_State))
@@ -356,10 +730,16 @@ def DsseMixed(nodes_num, measurements, Gmatrix, Bmatrix, Yabs_matrix, Yphase_mat
 
         num_iter = num_iter + 1
 
-    return V
+    converged = epsilon <= tolerance
+    if not converged:
+        print('WARNING: state estimation did not converge after {} iterations (mismatch={})'.format(num_iter, epsilon))
+
+    return V, ConvergenceReport(num_iter, epsilon, converged, tolerance, max_iter)
 
 
-def DsseAllocation(nodes_num, measurements, Gmatrix, Bmatrix, Yabs_matrix, Yphase_matrix, meas_code, inj_code):
+def DsseAllocation(nodes_num, measurements, Gmatrix, Bmatrix, Yabs_matrix, Yphase_matrix, meas_code, inj_code,
+                   initial_state=None, tolerance=10 ** (-6), max_iter=100, gain_solver="factorized", plan=None,
+                   meas_values=None):
     """
     Traditional state estimator
     It performs state estimation using rectangular node voltage state variables
@@ -374,106 +754,95 @@ def DsseAllocation(nodes_num, measurements, Gmatrix, Bmatrix, Yabs_matrix, Yphas
     @param Yphase_matrix: angles of the admittance matrix
     @param meas_code: code to determine if PMU measurements are present or not (1=no PMUs, 2 or 3=PMUs present)
     @param inj_code: code to determine if the grid has only loads (1) or both loads and generation units (2) connected
-    return: np.array V (estimated voltages)
+    @param initial_state: initial voltages, None for flat start, object of class results.Results (e.g. the results
+                          of the previous estimation) or np.array with the complex node voltages in per unit
+    @param tolerance: the iterations stop when max(abs(Delta_State)) <= tolerance
+    @param max_iter: maximum number of iterations
+    @param gain_solver: solver for the gain matrix system G * Delta_State = g (see GainMatrixSolver)
+    @param plan: object of class EstimatorPlan for measurements (inj_code, type=2 if meas_code == 1, 1 otherwise),
+                 None to calculate it
+    @param meas_values: np.array with the measured values in the order of measurements, None to use the
+                        meas_value of the measurements
+    return: 1. np.array V - estimated voltages
+            2. object of class results.ConvergenceReport
     """
 
-    # calculate weights matrix (obtained as stdandard_deviations^-2)
-    weights = measurements.getWeightsMatrix()
-    W = np.diag(weights)
-
-    # Jacobian Matrix. Includes the derivatives of the measurements (voltages, currents, powers) with respect to the states (voltages)
-
     if meas_code == 1:
         type=2
     elif meas_code == 2 or meas_code == 3:
         type=1
 
-    # Jacobian for branch Power Measurements
-    H4, H5 = calculateJacobiBranchPower(measurements, nodes_num, Gmatrix, Bmatrix, inj_code, type)
-
-    # Jacobian for Voltage Pmu Measurements
-    H7, H8 = calculateJacobiVoltagePmu(measurements, nodes_num, Gmatrix, Bmatrix, inj_code, type)
-    W = update_W_matrix(measurements, weights, W, "Vpmu")
+    if plan is None:
+        plan = EstimatorPlan(nodes_num, measurements, Gmatrix, Bmatrix, Yabs_matrix, Yphase_matrix, inj_code, type)
+    if meas_values is None:
+        meas_values = get_meas_values(measurements)
 
-    # Jacobian for Current Pmu Measurements
-    H9, H10 = calculateJacobiCurrentPmu(measurements, nodes_num, Gmatrix, Bmatrix, inj_code, type)
-    W = update_W_matrix(measurements, weights, W, "Ipmu")
-
-    # get array which contains the index of measurements type V_mag and I_mag
-    vidx = measurements.getIndexOfMeasurements(type=MeasType.V_mag)
-    iidx = measurements.getIndexOfMeasurements(type=MeasType.I_mag)
-    nvi = len(vidx)
-    nii = len(iidx)
-
-    # get array which contains the index of measurements type MeasType.Sinj_real, MeasType.Sinj_imag in the array measurements.measurements
-    pidx = measurements.getIndexOfMeasurements(type=MeasType.Sinj_real)
-    qidx = measurements.getIndexOfMeasurements(type=MeasType.Sinj_imag)
+    # calculate weights matrix (obtained as stdandard_deviations^-2)
+    W = plan.get_weight_matrix(meas_values)
 
-    # get array which contains the index of measurements type MeasType.S_real, MeasType.S_imag in the array measurements.measurements
-    p1br = measurements.getIndexOfMeasurements(type=MeasType.S1_real)
-    p2br = measurements.getIndexOfMeasurements(type=MeasType.S2_real)
-    q1br = measurements.getIndexOfMeasurements(type=MeasType.S1_imag)
-    q2br = measurements.getIndexOfMeasurements(type=MeasType.S2_imag)
+    # Jacobian Matrix. Includes the derivatives of the measurements (voltages, currents, powers) with respect to the states (voltages)
+    H4, H5 = plan.H4, plan.H5
+    H7, H8, H9, H10 = plan.H7, plan.H8, plan.H9, plan.H10
 
     # get an array with all measured values (affected by uncertainty)
-    z = measurements.getMeasValues()
+    z = plan.get_rectangular_values(meas_values)
 
-    V = np.ones(nodes_num) + 1j * np.zeros(nodes_num)
+    V = get_initial_voltages(initial_state, nodes_num)
     Kfactor = np.ones(inj_code)
     if type == 1:
-        State = np.concatenate((np.ones(nodes_num), np.zeros(nodes_num), Kfactor), axis=0)
+        State = np.concatenate((np.real(V), np.imag(V), Kfactor), axis=0)
     elif type == 2:
-        State = np.concatenate((np.ones(nodes_num), np.zeros(nodes_num-1), Kfactor), axis=0)
+        State = np.concatenate((np.real(V), np.imag(V)[1:], Kfactor), axis=0)
     epsilon = 5
     num_iter = 0
+    # with a warm start the current magnitudes can already be calculated in the first iteration
+    iter_offset = 0 if initial_state is None else 1
 
     # Iteration of Netwon Rapson method: needed to solve non-linear system of equation
-    while epsilon > 10 ** (-6):
+    while epsilon > tolerance and num_iter < max_iter:
         """ Computation of equivalent current measurements in place of the power measurements """
-        z = convertSinjMeasIntoCurrents(measurements, V, z, pidx, qidx)
-        z = convertSbranchMeasIntoCurrents(measurements, V, z, p1br, q1br, p2br, q2br)
+        z = convertSinjMeasIntoCurrents(meas_values, V, z, plan.pidx, plan.qidx, plan.pidx_nodes)
+        z = convertSbranchMeasIntoCurrents(meas_values, V, z, plan.p1br, plan.q1br, plan.p2br, plan.q2br,
+                                           plan.p1br_nodes, plan.p2br_nodes)
 
         """ Voltage Magnitude Measurements """
-        h1, H1 = update_h1_vector(measurements, V, vidx, nvi, nodes_num, inj_code, type)
+        h1, H1 = update_h1_vector(V, plan.vidx_nodes, nodes_num, inj_code, type)
 
         """ Power Injection Measurements """
-        h2, h3, H2, H3 = update_h2_h3_vector(measurements, nodes_num, V, Gmatrix, Bmatrix, inj_code, Kfactor, type)
+        h2, h3, H2, H3 = update_h2_h3_vector(plan.pidx_nodes, len(plan.qidx), nodes_num, V, Gmatrix, Bmatrix,
+                                             inj_code, Kfactor, type)
 
         """ Power Flow Measurements """
-        h4 = np.inner(H4, State)
-        h5 = np.inner(H5, State)
+        h4 = H4.dot(State)
+        h5 = H5.dot(State)
 
         """ Current Magnitude Measurements """
-        h6, H6 = update_h6_vector(measurements, V, iidx, nii, Yabs_matrix, Yphase_matrix, nodes_num, num_iter, inj_code, type)
+        h6, H6 = update_h6_vector(V, plan.iidx_start_nodes, plan.iidx_end_nodes, plan.iidx_yabs, plan.iidx_yphase,
+                                  nodes_num, num_iter + iter_offset, inj_code, type)
 
         """ PMU Voltage Measurements """
-        h7 = np.inner(H7, State)
-        h8 = np.inner(H8, State)
+        h7 = H7.dot(State)
+        h8 = H8.dot(State)
 
         """ PMU Current Measurements """
-        h9 = np.inner(H9, State)
-        h10 = np.inner(H10, State)
+        h9 = H9.dot(State)
+        h10 = H10.dot(State)
 
         """ WLS computation """
-        H = np.concatenate((H1, H2, H3, H4, H5, H6, H7, H8, H9, H10), axis=0)
+        H = sp.vstack((H1, H2, H3, H4, H5, H6, H7, H8, H9, H10), format='csr')
         if num_iter == 0:
+            # the columns of the scaling factors (last inj_code columns) are removed
             if meas_code == 1:
-                H = np.delete(H,2*nodes_num-1,1)
+                H = H[:, :2*nodes_num-1]
             else:
-                H = np.delete(H,2*nodes_num,1)
-            if inj_code == 2:
-                if meas_code == 1:
-                    H = np.delete(H,2*nodes_num-1,1)
-                else:
-                    H = np.delete(H,2*nodes_num,1)
+                H = H[:, :2*nodes_num]
         y = np.concatenate((h1, h2, h3, h4, h5, h6, h7, h8, h9, h10), axis=0)
         res = np.subtract(z, y)
-        g = np.inner(H.transpose(), np.inner(W, res))
-        WH = np.inner(W, H.transpose())
-        G = np.inner(H.transpose(), WH.transpose())
+        g = H.transpose().dot(W.dot(res))
+        WH = W.dot(H)
+        G = H.transpose().dot(WH)
 
-        Ginv = np.linalg.pinv(G)
-        Delta_State = np.inner(Ginv, g)
+        Delta_State = plan.get_gain_matrix_solver(G, gain_solver).solve(g)
         if num_iter == 0:
             Delta_State = np.concatenate((Delta_State,np.zeros((inj_code))),axis=0)
 
@@ -491,7 +860,260 @@ def DsseAllocation(nodes_num, measurements, Gmatrix, Bmatrix, Yabs_matrix, Yphas
 
         num_iter = num_iter + 1
 
-    return V
+    converged = epsilon <= tolerance
+    if not converged:
+        print('WARNING: state estimation did not converge after {} iterations (mismatch={})'.format(num_iter, epsilon))
+
+    return V, ConvergenceReport(num_iter, epsilon, converged, tolerance, max_iter)
+
+
+class WeightMatrix():
+    def __init__(self, weights):
+        """
+        Weight matrix W of the WLS estimators
+        W is not stored as dense matrix: the weights of the measurements are stored as vector (diagonal of W),
+        the weights of magnitude and phase of PMU measurements are stored as 2x2 blocks (see update_W_matrix)
+        @param weights: array with the weights of all measurements
+        """
+        self.weights = np.array(weights, dtype=float)
+        # indices of the rows/columns of the blocks in W (shape: (blocks_num, 2)) and blocks (shape: (blocks_num, 2, 2))
+        self.block_index = np.zeros((0, 2), dtype=int)
+        self.blocks = np.zeros((0, 2, 2))
+
+    def add_blocks(self, index_1, index_2, blocks):
+        """
+        replace the entries of W in the rows/columns index_1[k] and index_2[k] with blocks[k]
+        """
+        self.block_index = np.concatenate((self.block_index, np.column_stack((index_1, index_2))), axis=0)
+        self.blocks = np.concatenate((self.blocks, blocks), axis=0)
+
+    def dot(self, x):
+        """
+        return W * x (x: vector, matrix or scipy.sparse matrix with one row per measurement)
+        """
+        if sp.issparse(x):
+            return sp.csr_matrix(self.tosparse().dot(x))
+        x = np.asarray(x)
+        shape = (-1,) + (1,) * (x.ndim - 1)
+        y = self.weights.reshape(shape) * x
+        if len(self.blocks) > 0:
+            index_1 = self.block_index[:, 0]
+            index_2 = self.block_index[:, 1]
+            x1 = x[index_1]
+            x2 = x[index_2]
+            y[index_1] = self.blocks[:, 0, 0].reshape(shape) * x1 + self.blocks[:, 0, 1].reshape(shape) * x2
+            y[index_2] = self.blocks[:, 1, 0].reshape(shape) * x1 + self.blocks[:, 1, 1].reshape(shape) * x2
+        return y
+
+    def tosparse(self):
+        """
+        return W as scipy.sparse.csr_matrix
+        """
+        index_1 = self.block_index[:, 0]
+        index_2 = self.block_index[:, 1]
+        # the diagonal entries of the blocks replace the weights
+        diagonal = self.weights.copy()
+        diagonal[index_1] = 0
+        diagonal[index_2] = 0
+        rows = np.concatenate((np.arange(len(diagonal)), index_1, index_1, index_2, index_2))
+        cols = np.concatenate((np.arange(len(diagonal)), index_1, index_2, index_1, index_2))
+        data = np.concatenate((diagonal, self.blocks[:, 0, 0], self.blocks[:, 0, 1], self.blocks[:, 1, 0],
+                               self.blocks[:, 1, 1]))
+        return sp.csr_matrix((data, (rows, cols)), shape=(len(diagonal), len(diagonal)))
+
+    def toarray(self):
+        """
+        return W as dense np.array
+        """
+        W = np.diag(self.weights)
+        index_1 = self.block_index[:, 0]
+        index_2 = self.block_index[:, 1]
+        W[index_1, index_1] = self.blocks[:, 0, 0]
+        W[index_1, index_2] = self.blocks[:, 0, 1]
+        W[index_2, index_1] = self.blocks[:, 1, 0]
+        W[index_2, index_2] = self.blocks[:, 1, 1]
+        return W
+
+
+class GainMatrixSolver():
+    def __init__(self, G, gain_solver="factorized", ordering=None):
+        """
+        Solver for the system G * x = g of the WLS estimators (G = H^T * W * H: gain matrix)
+        @param G: gain matrix (np.array or scipy.sparse matrix)
+        @param gain_solver: - "factorized": direct factorization of G. If G is a np.array, Cholesky factorization
+                              if G is symmetric and LU factorization otherwise (W is not symmetric if PMU
+                              measurements are present, see update_W_matrix). If G is a scipy.sparse matrix,
+                              sparse LU factorization (scipy.sparse.linalg.splu, scipy does not provide a sparse
+                              Cholesky factorization).
+                              The pseudo-inverse is used if the factorization fails or if G is (numerically)
+                              singular, e.g. if the grid is not observable
+                            - "pinv": pseudo-inverse of G (np.linalg.pinv)
+        @param ordering: fill-reducing ordering of the rows and columns of a sparse G, e.g. the attribute ordering
+                         of the solver of a previous gain matrix with the same sparsity pattern.
+                         None to calculate it (COLAMD), the calculated ordering is stored in self.ordering
+        """
+        if gain_solver not in ("factorized", "pinv"):
+            raise Exception("gain_solver must be 'factorized' or 'pinv'")
+        self.cho_factor = None
+        self.lu_factor = None
+        self.splu = None
+        # ordering of the rows and columns of G for self.splu (None if G is factorized without permutation)
+        self.splu_permutation = None
+        self.ordering = None
+        self.Ginv = None
+        if gain_solver == "factorized" and sp.issparse(G):
+            G = sp.csc_matrix(G)
+            try:
+                if ordering is None:
+                    self.splu = spla.splu(G)
+                    self.ordering = np.argsort(self.splu.perm_c)
+                else:
+                    # only the numerical factorization of the permuted matrix is needed
+                    self.ordering = np.asarray(ordering)
+                    self.splu_permutation = self.ordering
+                    self.splu = spla.splu(G[self.ordering][:, self.ordering].tocsc(), permc_spec="NATURAL")
+                # estimate of the reciprocal condition number in the 1-norm
+                Ginv = spla.LinearOperator(G.shape, matvec=self.splu.solve, dtype=float,
+                                           rmatvec=lambda x: self.splu.solve(x, trans='T'))
+                with np.errstate(all='ignore'):
+                    rcond = 1 / (spla.onenormest(G) * spla.onenormest(Ginv))
+            except RuntimeError:
+                rcond = 0
+            if not rcond > np.finfo(float).eps:
+                self.splu = None
+                self.splu_permutation = None
+                self.ordering = None
+        elif gain_solver == "factorized":
+            anorm = np.linalg.norm(G, 1)
+            # G is symmetric up to rounding errors if W is symmetric
+            if np.amax(np.absolute(G - G.T)) <= 10 ** (-10) * np.amax(np.absolute(G)):
+                try:
+                    self.cho_factor = scipy.linalg.cho_factor(G)
+                    rcond, _ = scipy.linalg.lapack.dpocon(self.cho_factor[0], anorm,
+                                                          uplo='L' if self.cho_factor[1] else 'U')
+                except np.linalg.LinAlgError:
+                    rcond = 0
+            else:
+                with warnings.catch_warnings():
+                    # exactly singular matrices are detected by rcond
+                    warnings.simplefilter("ignore", scipy.linalg.LinAlgWarning)
+                    self.lu_factor = scipy.linalg.lu_factor(G)
+                rcond, _ = scipy.linalg.lapack.dgecon(self.lu_factor[0], anorm)
+            if not rcond > np.finfo(float).eps:
+                self.cho_factor = None
+                self.lu_factor = None
+        if self.cho_factor is None and self.lu_factor is None and self.splu is None:
+            self.Ginv = np.linalg.pinv(G.toarray() if sp.issparse(G) else G)
+
+    def solve(self, g):
+        """
+        return the solution x of G * x = g (g: vector or matrix with one right-hand side per column)
+        """
+        if self.splu is not None and self.splu_permutation is not None:
+            x = np.empty_like(g)
+            x[self.splu_permutation] = self.splu.solve(g[self.splu_permutation])
+            return x
+        elif self.splu is not None:
+            return self.splu.solve(g)
+        elif self.cho_factor is not None:
+            return scipy.linalg.cho_solve(self.cho_factor, g)
+        elif self.lu_factor is not None:
+            return scipy.linalg.lu_solve(self.lu_factor, g)
+        return self.Ginv.dot(g)
+
+
+def get_state_size(nodes_num, inj_code, type):
+    """
+    return the number of state variables (columns of the Jacobian)
+
+    @param nodes_num: number of nodes of the grid
+    @param inj_code: additional number of variables to be considered when running the DsseAllocation method
+    @param type: 1 for DssePmu and DsseMixed (real and imaginary part of all voltages),
+                 2 for DsseTrad (imaginary part of the voltage of node 0 not included)
+    """
+    if type == 1:
+        return 2 * nodes_num + inj_code
+    elif type == 2:
+        return 2 * nodes_num - 1 + inj_code
+
+
+def get_imag_columns(node_indices, nodes_num, type):
+    """
+    return the columns of the Jacobian which correspond to the imaginary parts of the voltages of the nodes
+    node_indices and a mask which is False for nodes without imaginary part in the state (node 0 for type 2)
+
+    @param node_indices: np.array with node indices
+    @param nodes_num: number of nodes of the grid
+    @param type: 1 for DssePmu and DsseMixed, 2 for DsseTrad
+    """
+    if type == 1:
+        return node_indices + nodes_num, np.ones(len(node_indices), dtype=bool)
+    elif type == 2:
+        return node_indices + nodes_num - 1, node_indices > 0
+
+
+def get_node_indices(measurements, meas_indices, node="element"):
+    """
+    return np.array with the indices of the nodes the measurements measurements.measurements[meas_indices] refer to
+
+    @param measurements: object of class MeasurementSet
+    @param meas_indices: indices of the measurements in measurements.measurements
+    @param node: "element" for node measurements, "start_node" or "end_node" for branch measurements
+    """
+    if node == "element":
+        return np.array([measurements.elements[index].index for index in meas_indices], dtype=int)
+    return np.array([getattr(measurements.elements[index], node).index for index in meas_indices],
+                    dtype=int)
+
+
+def get_matrix_entries(matrix, rows, cols):
+    """
+    return np.array with the entries matrix[rows[k], cols[k]] of a dense (np.array) or sparse (scipy.sparse) matrix
+    """
+    if sp.issparse(matrix):
+        entries = sp.csr_matrix(matrix)[rows, cols]
+        # scipy returns a sparse matrix if rows and cols are empty
+        if sp.issparse(entries):
+            entries = entries.toarray()
+        return np.asarray(entries).ravel()
+    return np.asarray(matrix)[rows, cols]
+
+
+def create_sparse_block(rows, cols, data, shape):
+    """
+    return scipy.sparse.csr_matrix with the entries data[k] in (rows[k], cols[k])
+    rows, cols and data are lists of np.arrays which are concatenated
+    """
+    return sp.csr_matrix((np.concatenate(data), (np.concatenate(rows), np.concatenate(cols))), shape=shape)
+
+
+def calculateJacobiBranchElements(m, n, Gmatrix, Bmatrix, rows_num, nodes_num, state_size, type):
+    """
+    It calculates the Jacobian rows of currents flowing from node m[k] to node n[k]
+    (used for branch power measurements and current PMU measurements)
+
+    @param m: np.array with the indices of the nodes at which the currents are measured
+    @param n: np.array with the indices of the nodes at the other end of the branches
+    @param Gmatrix
+    @param Bmatrix
+    @param rows_num: number of rows of the second returned matrix
+    @param nodes_num: len of system.nodes
+    @param state_size: number of columns of the returned matrices
+    @param type: 1 for DssePmu and DsseMixed, 2 for DsseTrad
+    return: 1. Jacobian for the real part of the currents (scipy.sparse.csr_matrix)
+            2. Jacobian for the imaginary part of the currents (scipy.sparse.csr_matrix)
+    """
+    rows = np.arange(len(m))
+    g = get_matrix_entries(Gmatrix, m, n)
+    b = get_matrix_entries(Bmatrix, m, n)
+    m2, m_mask = get_imag_columns(m, nodes_num, type)
+    n2, n_mask = get_imag_columns(n, nodes_num, type)
+
+    Hre = create_sparse_block(rows=[rows, rows, rows[m_mask], rows[n_mask]], cols=[m, n, m2[m_mask], n2[n_mask]],
+                              data=[-g, g, b[m_mask], -b[n_mask]], shape=(len(m), state_size))
+    Him = create_sparse_block(rows=[rows, rows, rows[m_mask], rows[n_mask]], cols=[m, n, m2[m_mask], n2[n_mask]],
+                              data=[-b, b, -g[m_mask], g[n_mask]], shape=(rows_num, state_size))
+    return Hre, Him
 
 
 def calculateJacobiMatrixSinj(measurements, nodes_num, Gmatrix, Bmatrix, inj_code, type):
@@ -505,30 +1127,26 @@ def calculateJacobiMatrixSinj(measurements, nodes_num, Gmatrix, Bmatrix, inj_cod
     @param Bmatrix
     @param type: 1 for DssePmu and DsseMixed, 2 for DsseTrad
     @param inj_code: additional number of variables to be considered when running the DsseAllocation method
-    return: 1. H2: Jacobian for Pinj
-            2. H3: Jacobian for Qinj
+    return: 1. H2: Jacobian for Pinj (scipy.sparse.csr_matrix)
+            2. H3: Jacobian for Qinj (scipy.sparse.csr_matrix)
     """
-    # get all measurements of type MeasType.Sinj_real
-    pinj_meas = measurements.getMeasurementsOfType(type=MeasType.Sinj_real)
-    # get all measurements of type MeasType.Sinj_real
-    qinj_meas = measurements.getMeasurementsOfType(type=MeasType.Sinj_imag)
-    if type == 1:
-        H2 = np.zeros((len(pinj_meas), 2 * nodes_num + inj_code))
-        H3 = np.zeros((len(qinj_meas), 2 * nodes_num + inj_code))
-    elif type == 2:
-        H2 = np.zeros((len(pinj_meas), 2 * nodes_num - 1 + inj_code))
-        H3 = np.zeros((len(qinj_meas), 2 * nodes_num - 1 + inj_code))
-
-    for index, measurement in enumerate(pinj_meas):
-        m = measurement.element.index
-        if type == 1:
-            idx = 0
-        elif type == 2:
-            idx = 1
-        H2[index][:nodes_num] = Gmatrix[m]
-        H2[index][nodes_num:] = -Bmatrix[m][idx:]
-        H3[index][:nodes_num] = Bmatrix[m]
-        H3[index][nodes_num:] = Gmatrix[m][idx:]
+    # get index of all measurements of type MeasType.Sinj_real and MeasType.Sinj_imag
+    pidx = measurements.getIndexOfMeasurements(type=MeasType.Sinj_real)
+    qidx = measurements.getIndexOfMeasurements(type=MeasType.Sinj_imag)
+    # the rows of H2 and H3 refer to the nodes of the Sinj_real measurements
+    nodes = get_node_indices(measurements, pidx)
+    state_size = get_state_size(nodes_num, inj_code, type)
+
+    # rows of G and B of the measured nodes
+    Grows = sp.csr_matrix(Gmatrix)[nodes].tocoo()
+    Brows = sp.csr_matrix(Bmatrix)[nodes].tocoo()
+    Gcols, Gmask = get_imag_columns(Grows.col, nodes_num, type)
+    Bcols, Bmask = get_imag_columns(Brows.col, nodes_num, type)
+
+    H2 = create_sparse_block(rows=[Grows.row, Brows.row[Bmask]], cols=[Grows.col, Bcols[Bmask]],
+                             data=[Grows.data, -Brows.data[Bmask]], shape=(len(pidx), state_size))
+    H3 = create_sparse_block(rows=[Brows.row, Grows.row[Gmask]], cols=[Brows.col, Gcols[Gmask]],
+                             data=[Brows.data, Grows.data[Gmask]], shape=(len(qidx), state_size))
     return H2, H3
 
 
@@ -543,71 +1161,24 @@ def calculateJacobiBranchPower(measurements, nodes_num, Gmatrix, Bmatrix, inj_co
     @param Bmatrix
     @param type: 1 for DssePmu and DsseMixed, 2 for DsseTrad
     @param inj_code: additional number of variables to be considered when running the DsseAllocation method
-    return:	1. H4: Jacobian for S_real
-            2. H5: Jacobian for S_imag
+    return:	1. H4: Jacobian for S_real (scipy.sparse.csr_matrix)
+            2. H5: Jacobian for S_imag (scipy.sparse.csr_matrix)
     """
 
-    # get all measurements of type MeasType.S_real and MeasType.S_imag
-    p1_meas = measurements.getMeasurementsOfType(type=MeasType.S1_real)
-    p2_meas = measurements.getMeasurementsOfType(type=MeasType.S2_real)
-    q1_meas = measurements.getMeasurementsOfType(type=MeasType.S1_imag)
-    q2_meas = measurements.getMeasurementsOfType(type=MeasType.S2_imag)
+    # get index of all measurements of type MeasType.S_real and MeasType.S_imag
+    p1br = measurements.getIndexOfMeasurements(type=MeasType.S1_real)
+    p2br = measurements.getIndexOfMeasurements(type=MeasType.S2_real)
+    q1br = measurements.getIndexOfMeasurements(type=MeasType.S1_imag)
+    q2br = measurements.getIndexOfMeasurements(type=MeasType.S2_imag)
 
-    if type == 1:
-        H4 = np.zeros((len(p1_meas) + len(p2_meas), 2 * nodes_num + inj_code))
-        H5 = np.zeros((len(q1_meas) + len(q2_meas), 2 * nodes_num + inj_code))
-    elif type == 2:
-        H4 = np.zeros((len(p1_meas) + len(p2_meas), 2 * nodes_num - 1 + inj_code))
-        H5 = np.zeros((len(q1_meas) + len(q2_meas), 2 * nodes_num - 1 + inj_code))
-
-    for i, measurement in enumerate(p1_meas):
-        m = measurement.element.start_node.index
-        n = measurement.element.end_node.index
-        H4[i][m] = - Gmatrix[m][n]
-        H4[i][n] = Gmatrix[m][n]
-        H5[i][m] = - Bmatrix[m][n]
-        H5[i][n] = Bmatrix[m][n]
-        if type == 1:
-            m2 = m + nodes_num
-            H4[i][m2] = Bmatrix[m][n]
-            H5[i][m2] = - Gmatrix[m][n]
-            n2 = n + nodes_num
-            H4[i][n2] = - Bmatrix[m][n]
-            H5[i][n2] = Gmatrix[m][n]
-        elif type == 2:
-            if m > 0:
-                m2 = m + nodes_num - 1
-                H4[i][m2] = Bmatrix[m][n]
-                H5[i][m2] = - Gmatrix[m][n]
-            if n > 0:
-                n2 = n + nodes_num - 1
-                H4[i][n2] = - Bmatrix[m][n]
-                H5[i][n2] = Gmatrix[m][n]
-
-    for i, measurement in enumerate(iterable=p2_meas, start=len(p1_meas)):
-        n = measurement.element.start_node.index
-        m = measurement.element.end_node.index
-        H4[i][m] = - Gmatrix[m][n]
-        H4[i][n] = Gmatrix[m][n]
-        H5[i][m] = - Bmatrix[m][n]
-        H5[i][n] = Bmatrix[m][n]
-        if type == 1:
-            m2 = m + nodes_num
-            H4[i][m2] = Bmatrix[m][n]
-            H5[i][m2] = - Gmatrix[m][n]
-            n2 = n + nodes_num
-            H4[i][n2] = - Bmatrix[m][n]
-            H5[i][n2] = Gmatrix[m][n]
-        elif type == 2:
-            if m > 0:
-                m2 = m + nodes_num - 1
-                H4[i][m2] = Bmatrix[m][n]
-                H5[i][m2] = - Gmatrix[m][n]
-            if n > 0:
-                n2 = n + nodes_num - 1
-                H4[i][n2] = - Bmatrix[m][n]
-                H5[i][n2] = Gmatrix[m][n]
+    # S1 is measured at the start node, S2 at the end node of the branch
+    m = np.concatenate((get_node_indices(measurements, p1br, "start_node"),
+                        get_node_indices(measurements, p2br, "end_node")))
+    n = np.concatenate((get_node_indices(measurements, p1br, "end_node"),
+                        get_node_indices(measurements, p2br, "start_node")))
 
+    H4, H5 = calculateJacobiBranchElements(m, n, Gmatrix, Bmatrix, len(q1br) + len(q2br), nodes_num,
+                                           get_state_size(nodes_num, inj_code, type), type)
     return H4, H5
 
 
@@ -621,30 +1192,20 @@ def calculateJacobiVoltagePmu(measurements, nodes_num, Gmatrix, Bmatrix, inj_cod
     @param Gmatrix
     @param Bmatrix
     @param inj_code: additional number of variables to be considered when running the DsseAllocation method
-    return: 1. H7: Jacobian for S_real
-            2. H8: Jacobian for S_imag
+    return: 1. H7: Jacobian for S_real (scipy.sparse.csr_matrix)
+            2. H8: Jacobian for S_imag (scipy.sparse.csr_matrix)
     """
 
-    # get all measurements of type MeasType.Vpmu_mag
-    Vpmu_mag_meas = measurements.getMeasurementsOfType(type=MeasType.Vpmu_mag)
-    # get all measurements of type MeasType.Vpmu_phase
-    Vpmu_phase_meas = measurements.getMeasurementsOfType(type=MeasType.Vpmu_phase)
-
-    if type == 1:
-        H7 = np.zeros((len(Vpmu_mag_meas), 2 * nodes_num + inj_code))
-        H8 = np.zeros((len(Vpmu_mag_meas), 2 * nodes_num + inj_code))
-    elif type == 2:
-        H7 = np.zeros((len(Vpmu_mag_meas), 2 * nodes_num + inj_code - 1))
-        H8 = np.zeros((len(Vpmu_mag_meas), 2 * nodes_num + inj_code - 1))
+    # get index of all measurements of type MeasType.Vpmu_mag
+    Vpmu_mag_idx = measurements.getIndexOfMeasurements(type=MeasType.Vpmu_mag)
+    nodes = get_node_indices(measurements, Vpmu_mag_idx)
+    rows = np.arange(len(nodes))
+    ones = np.ones(len(nodes))
+    state_size = get_state_size(nodes_num, inj_code, type)
 
     # TODO: index of Vmag = index of Vphase???
-    for index, measurement in enumerate(Vpmu_mag_meas):
-        vamp = measurement.meas_value_ideal
-        vtheta = Vpmu_phase_meas[index].meas_value_ideal
-        m = measurement.element.index
-        H7[index][m] = 1
-        m2 = m + nodes_num
-        H8[index][m2] = 1
+    H7 = create_sparse_block(rows=[rows], cols=[nodes], data=[ones], shape=(len(nodes), state_size))
+    H8 = create_sparse_block(rows=[rows], cols=[nodes + nodes_num], data=[ones], shape=(len(nodes), state_size))
 
     return H7, H8
 
@@ -659,185 +1220,126 @@ def calculateJacobiCurrentPmu(measurements, nodes_num, Gmatrix, Bmatrix, inj_cod
     @param Gmatrix
     @param Bmatrix
     @param inj_code: additional number of variables to be considered when running the DsseAllocation method
-    return: 1. H9: Jacobian for S_real
-            2. H10: Jacobian for S_imag
+    return: 1. H9: Jacobian for S_real (scipy.sparse.csr_matrix)
+            2. H10: Jacobian for S_imag (scipy.sparse.csr_matrix)
     """
 
-    # get all measurements of type MeasType.Ipmu_mag
-    Ipmu_mag_meas = measurements.getMeasurementsOfType(type=MeasType.Ipmu_mag)
-    # get all measurements of type MeasType.Vpmu_phase
-    Ipmu_phase_meas = measurements.getMeasurementsOfType(type=MeasType.Ipmu_phase)
+    # get index of all measurements of type MeasType.Ipmu_mag
+    Ipmu_mag_idx = measurements.getIndexOfMeasurements(type=MeasType.Ipmu_mag)
+    m = get_node_indices(measurements, Ipmu_mag_idx, "start_node")
+    n = get_node_indices(measurements, Ipmu_mag_idx, "end_node")
 
-    if type == 1:
-        H9 = np.zeros((len(Ipmu_mag_meas), 2 * nodes_num + inj_code))
-        H10 = np.zeros((len(Ipmu_mag_meas), 2 * nodes_num + inj_code))
-    elif type == 2:
-        H9 = np.zeros((len(Ipmu_mag_meas), 2 * nodes_num + inj_code-1))
-        H10 = np.zeros((len(Ipmu_mag_meas), 2 * nodes_num + inj_code-1))
-
-    for index, measurement in enumerate(Ipmu_mag_meas):
-        iamp = measurement.meas_value_ideal
-        itheta = Ipmu_phase_meas[index].meas_value_ideal
-        m = measurement.element.start_node.index
-        n = measurement.element.end_node.index
-        H9[index][m] = - Gmatrix[m][n]
-        H9[index][n] = Gmatrix[m][n]
-        H10[index][m] = - Bmatrix[m][n]
-        H10[index][n] = Bmatrix[m][n]
-        m2 = m + nodes_num
-        n2 = n + nodes_num
-        H9[index][m2] = Bmatrix[m][n]
-        H9[index][n2] = - Bmatrix[m][n]
-        H10[index][m2] = - Gmatrix[m][n]
-        H10[index][n2] = Gmatrix[m][n]
+    # the columns of the imaginary parts are calculated as for type 1
+    H9, H10 = calculateJacobiBranchElements(m, n, Gmatrix, Bmatrix, len(m), nodes_num,
+                                            get_state_size(nodes_num, inj_code, type), 1)
 
     return H9, H10
 
 
-def update_W_matrix(measurements, weights, W, type):
+def update_W_matrix(meas_values, weights, W, index_mag, index_phase):
     """
     adds to the matrix W the values related to pmu measurements (Vpmu or Ipmu)
+    The weights of magnitude and phase of each PMU measurement are replaced by a 2x2 block
 
-    @param measurements: object of class Measurement that contains all measurements (voltages, currents, powers)
-    @param weights: weights matrix
-    @param W: np.diag(weights)
-    @param type: "Vpmu" or "Ipmu"
+    @param meas_values: array with the measured values of all measurements
+    @param weights: array with the weights of all measurements
+    @param W: object of class WeightMatrix
+    @param index_mag: index of the measurements of type Vpmu_mag (or Ipmu_mag)
+    @param index_phase: index of the measurements of type Vpmu_phase (or Ipmu_phase)
     return: updated W matrix
     """
 
-    if type == "Vpmu":
-        # get index of all measurements of type "MeasType.Vpmu_mag" in the array MeasurementSet.measurements
-        index_mag = measurements.getIndexOfMeasurements(MeasType.Vpmu_mag)
-        # get index of all measurements of type "MeasType.Vpmu_phase" in the array MeasurementSet.measurements
-        index_phase = measurements.getIndexOfMeasurements(MeasType.Vpmu_phase)
-    elif type == "Ipmu":
-        # get index of all measurements of type "MeasType.Ipmu_mag" in the array MeasurementSet.measurements
-        index_mag = measurements.getIndexOfMeasurements(MeasType.Ipmu_mag)
-        # get index of all measurements of type "MeasType.Ipmu_phase" in the array MeasurementSet.measurements
-        index_phase = measurements.getIndexOfMeasurements(MeasType.Ipmu_phase)
-
-    for index, (idx_mag, idx_theta) in enumerate(zip(index_mag, index_phase)):
-        value_amp = measurements.measurements[idx_mag].meas_value
-        value_theta = measurements.measurements[idx_theta].meas_value
-        rot_mat = np.array([[np.cos(value_theta), - value_amp * np.sin(value_theta)],
-                            [np.sin(value_theta), value_amp * np.cos(value_theta)]])
-        starting_cov = np.array([[weights[idx_mag], 0], [0, weights[idx_theta]]])
-        final_cov = np.inner(rot_mat, np.inner(starting_cov, rot_mat.transpose()))
-        W[idx_mag][idx_mag] = final_cov[0][0]
-        W[idx_theta][idx_theta] = final_cov[1][1]
-        W[idx_mag][idx_theta] = final_cov[0][1]
-        W[idx_theta][idx_mag] = final_cov[1][0]
+    blocks_num = min(len(index_mag), len(index_phase))
+    index_mag = np.asarray(index_mag[:blocks_num], dtype=int)
+    index_phase = np.asarray(index_phase[:blocks_num], dtype=int)
+    value_amp = meas_values[index_mag]
+    value_theta = meas_values[index_phase]
+
+    # rotation matrices (shape: (blocks_num, 2, 2))
+    rot_mat = np.empty((blocks_num, 2, 2))
+    rot_mat[:, 0, 0] = np.cos(value_theta)
+    rot_mat[:, 0, 1] = - value_amp * np.sin(value_theta)
+    rot_mat[:, 1, 0] = np.sin(value_theta)
+    rot_mat[:, 1, 1] = value_amp * np.cos(value_theta)
+    starting_cov = np.column_stack((weights[index_mag], weights[index_phase]))
+    # final_cov = np.inner(rot_mat, np.inner(starting_cov, rot_mat.transpose())) for each block
+    final_cov = np.einsum('kij,klj->kil', rot_mat, starting_cov[:, :, None] * rot_mat)
+    W.add_blocks(index_mag, index_phase, final_cov)
 
     return W
 
 
-def update_h1_vector(measurements, V, vidx, nvi, nodes_num, inj_code, type):
+def update_h1_vector(V, nodes, nodes_num, inj_code, type):
     """
     update h1 and H1 vectors
 
-    @param measurements: Vector of measurements in Input (voltages, currents, powers)
     @param V: vector of the estimated voltages
-    @param vidx: array which contains the index of measurements type V_mag in measurements.measurements
-    @param nvi: len of vidx
+    @param nodes: array which contains the index of the nodes of the measurements type V_mag
     @param nodes_num: number of nodes of the grid - len(system.nodes)
     @param type: 1 for DssePmu and DsseMixed, 2 for DsseTrad
     @param inj_code: additional number of variables to be considered when running the DsseAllocation method
-    return: vector h1 and H1
+    return: vector h1 and H1 (scipy.sparse.csr_matrix)
     """
+    nvi = len(nodes)
+    rows = np.arange(nvi)
+    m2, mask = get_imag_columns(nodes, nodes_num, type)
 
     # at every iteration we update h(x) vector where V measure are available
-    h1 = np.zeros(nvi)
+    h1 = np.absolute(V[nodes])
     # the Jacobian rows where voltage measurements are presents is updated
-    if type == 1:
-        H1 = np.zeros((nvi, 2 * nodes_num + inj_code))
-    elif type == 2:
-        H1 = np.zeros((nvi, 2 * nodes_num - 1 + inj_code))
-    for i, index_vmag in enumerate(vidx):
-        # get index of the node
-        node_index = measurements.measurements[index_vmag].element.index
-        h1[i] = np.absolute(V[node_index])
-        H1[i][node_index] = np.cos(np.angle(V[node_index]))
-        if type == 1:
-            m2 = node_index + nodes_num
-            H1[i][m2] = np.sin(np.angle(V[node_index]))
-        elif type == 2:
-            if node_index > 0:
-                m2 = node_index + nodes_num - 1
-                H1[i][m2] = np.sin(np.angle(V[node_index]))
+    H1 = create_sparse_block(rows=[rows, rows[mask]], cols=[nodes, m2[mask]],
+                             data=[np.cos(np.angle(V[nodes])), np.sin(np.angle(V[nodes[mask]]))],
+                             shape=(nvi, get_state_size(nodes_num, inj_code, type)))
 
     return h1, H1
 
 
-def update_h6_vector(measurements, V, iidx, nii, Yabs_matrix, Yphase_matrix, nodes_num, num_iter, inj_code, type):
+def update_h6_vector(V, m, n, yabs, yphase, nodes_num, num_iter, inj_code, type):
     """
     update h6 and H6 vectors where current flows are present
 
-    @param measurements: Vector of measurements in Input (voltages, currents, powers)
     @param V: vector of the estimated voltages
-    @param iidx: array which contains the index of measurements type I_mag in measurements.measurements
-    @param nii: len of iidx
-    @param Yabs_matrix:
-    @param Yphase_matrix:
+    @param m: array which contains the index of the start nodes of the measurements type I_mag
+    @param n: array which contains the index of the end nodes of the measurements type I_mag
+    @param yabs: magnitude of the admittance matrix entries Y[m, n]
+    @param yphase: phase of the admittance matrix entries Y[m, n]
     @param nodes_num: number of nodes of the grid - len(system.nodes)
     @param num_iter: number of current iteration
     @param type: 1 for DssePmu and DsseMixed, 2 for DsseTrad
     @param inj_code: additional number of variables to be considered when running the DsseAllocation method
-    return: vector h6 and H6
+    return: vector h6 and H6 (scipy.sparse.csr_matrix)
     """
+    nii = len(m)
+    rows = np.arange(nii)
+    cos_phase = np.cos(yphase)
+    sin_phase = np.sin(yphase)
 
     # Current Magnitude Measurements
-    h6re = np.zeros((nii))
-    h6im = np.zeros((nii))
-    h6complex = np.zeros((nii), dtype=complex)
-    h6 = np.ones((nii))
-    if type == 1:
-        H6 = np.zeros((nii, 2 * nodes_num + inj_code))
-    elif type == 2:
-        H6 = np.zeros((nii, 2 * nodes_num - 1 + inj_code))
-
-    for i, index_imag in enumerate(iidx):
-        # get index of the start node
-        m = measurements.measurements[index_imag].element.start_node.index
-        # get index of the end node
-        n = measurements.measurements[index_imag].element.end_node.index
-        h6re[i] = Yabs_matrix[m][n] * (
-                (V[n].real - V[m].real) * np.cos(Yphase_matrix[m][n]) + (V[m].imag - V[n].imag) * np.sin(
-            Yphase_matrix[m][n]))
-        h6im[i] = Yabs_matrix[m][n] * (
-                (V[n].real - V[m].real) * np.sin(Yphase_matrix[m][n]) + (V[n].imag - V[m].imag) * np.cos(
-            Yphase_matrix[m][n]))
-        h6complex[i] = h6re[i] + 1j * h6im[i]
-        if num_iter > 0:
-            h6[i] = np.absolute(h6complex[i])
-        H6[i][m] = - Yabs_matrix[m][n] * (
-                np.cos(Yphase_matrix[m][n]) * h6re[i] + np.sin(Yphase_matrix[m][n]) * h6im[i]) / h6[i]
-        H6[i][n] = Yabs_matrix[m][n] * (np.cos(Yphase_matrix[m][n]) * h6re[i] + np.sin(Yphase_matrix[m][n]) * h6im[i]) / \
-                   h6[i]
-        if type == 1:
-            m2 = m + nodes_num
-            H6[i][m2] = - Yabs_matrix[m][n] * (
-                    np.cos(Yphase_matrix[m][n]) * h6im[i] - np.sin(Yphase_matrix[m][n]) * h6re[i]) / h6[i]
-            n2 = n + nodes_num
-            H6[i][n2] = Yabs_matrix[m][n] * (
-                    np.cos(Yphase_matrix[m][n]) * h6im[i] - np.sin(Yphase_matrix[m][n]) * h6re[i]) / h6[i]
-        if type == 2:
-            if m > 0:
-                m2 = m + nodes_num - 1
-                H6[i][m2] = - Yabs_matrix[m][n] * (
-                        np.cos(Yphase_matrix[m][n]) * h6im[i] - np.sin(Yphase_matrix[m][n]) * h6re[i]) / h6[i]
-            if n > 0:
-                n2 = n + nodes_num - 1
-                H6[i][n2] = Yabs_matrix[m][n] * (
-                        np.cos(Yphase_matrix[m][n]) * h6im[i] - np.sin(Yphase_matrix[m][n]) * h6re[i]) / h6[i]
+    h6re = yabs * ((V[n].real - V[m].real) * cos_phase + (V[m].imag - V[n].imag) * sin_phase)
+    h6im = yabs * ((V[n].real - V[m].real) * sin_phase + (V[n].imag - V[m].imag) * cos_phase)
+    if num_iter > 0:
+        h6 = np.absolute(h6re + 1j * h6im)
+    else:
+        h6 = np.ones((nii))
+
+    dre = yabs * (cos_phase * h6re + sin_phase * h6im) / h6
+    dim = yabs * (cos_phase * h6im - sin_phase * h6re) / h6
+    m2, m_mask = get_imag_columns(m, nodes_num, type)
+    n2, n_mask = get_imag_columns(n, nodes_num, type)
+    H6 = create_sparse_block(rows=[rows, rows, rows[m_mask], rows[n_mask]], cols=[m, n, m2[m_mask], n2[n_mask]],
+                             data=[-dre, dre, -dim[m_mask], dim[n_mask]],
+                             shape=(nii, get_state_size(nodes_num, inj_code, type)))
 
     return h6, H6
 
-def update_h2_h3_vector(measurements, nodes_num, V, Gmatrix, Bmatrix, inj_code, Kfactor, type):
+
+def update_h2_h3_vector(nodes, q_num, nodes_num, V, Gmatrix, Bmatrix, inj_code, Kfactor, type):
     """
     It calculates the Jacobian for Power Injection Measurements
     (converted to equivalent rectangualar current measurements)
 
-    @param measurements: object of class Measurement that contains all measurements (voltages, currents, powers)
+    @param nodes: array which contains the index of the nodes of the measurements type Sinj_real
+    @param q_num: number of measurements type Sinj_imag
     @param nodes_num: len of system.nodes
     @param V: vector of the estimated voltages
     @param Gmatrix
@@ -845,108 +1347,111 @@ def update_h2_h3_vector(measurements, nodes_num, V, Gmatrix, Bmatrix, inj_code,
     @param type: 1 for DssePmu and DsseMixed, 2 for DsseTrad
     @param inj_code: additional number of variables to be considered when running the DsseAllocation method
     @param Kfactor: temporary value of the scaling factor given by the DsseAllocation method
-    return: 1. H2: Jacobian for Pinj
-            2. H3: Jacobian for Qinj
-    """
-    # get all measurements of type MeasType.Sinj_real
-    pinj_meas = measurements.getMeasurementsOfType(type=MeasType.Sinj_real)
-    # get all measurements of type MeasType.Sinj_real
-    qinj_meas = measurements.getMeasurementsOfType(type=MeasType.Sinj_imag)
-    h2 = np.zeros((len(pinj_meas)))
-    h3 = np.zeros((len(qinj_meas)))
-    if type == 1:
-        H2 = np.zeros((len(pinj_meas), 2 * nodes_num + inj_code))
-        H3 = np.zeros((len(qinj_meas), 2 * nodes_num + inj_code))
-    elif type == 2:
-        H2 = np.zeros((len(pinj_meas), 2 * nodes_num - 1 + inj_code))
-        H3 = np.zeros((len(qinj_meas), 2 * nodes_num - 1 + inj_code))
-
-    for index, measurement in enumerate(pinj_meas):
-        m = measurement.element.index
-        if type == 1:
-            idx = 0
-        elif type == 2:
-            idx = 1
-        K = Kfactor[0]
-        idxK = 0
-        # TODO: 
-        #if type(m) == 'load':
-            #    K = Kfactor[0]
-            #    idxK = 0
-            #elif type(m) == 'generation':
-            #    K = Kfactor[1]
-            #    idxK = 1
-        H2[index][:nodes_num] = K*Gmatrix[m]
-        H2[index][nodes_num:-inj_code] = -K*Bmatrix[m][idx:]
-        H2[index][2*nodes_num-idx+idxK] = np.inner(Gmatrix[m],V.real) - np.inner(Bmatrix[m][idx:],V.imag[idx:])
-        H3[index][:nodes_num] = K*Bmatrix[m]
-        H3[index][nodes_num:-inj_code] = K*Gmatrix[m][idx:]
-        H3[index][2*nodes_num-idx+idxK] = np.inner(Bmatrix[m],V.real) + np.inner(Gmatrix[m][idx:],V.imag[idx:])
-        h2[index] = K*(np.inner(Gmatrix[m],V.real) - np.inner(Bmatrix[m][idx:],V.imag[idx:]))
-        h3[index] = K*(np.inner(Bmatrix[m],V.real) + np.inner(Gmatrix[m][idx:],V.imag[idx:]))
+    return: 1. H2: Jacobian for Pinj (scipy.sparse.csr_matrix)
+            2. H3: Jacobian for Qinj (scipy.sparse.csr_matrix)
+    """
+    # the rows of H2 and H3 refer to the nodes of the Sinj_real measurements
+    rows = np.arange(len(nodes))
+    state_size = get_state_size(nodes_num, inj_code, type)
+
+    K = Kfactor[0]
+    idxK = 0
+    # TODO:
+    #if type(m) == 'load':
+        #    K = Kfactor[0]
+        #    idxK = 0
+        #elif type(m) == 'generation':
+        #    K = Kfactor[1]
+        #    idxK = 1
+    Kcols = np.full(len(nodes), state_size - inj_code + idxK)
+
+    # rows of G and B of the measured nodes
+    Grows = sp.csr_matrix(Gmatrix)[nodes]
+    Brows = sp.csr_matrix(Bmatrix)[nodes]
+    # current injections (the imaginary part of node 0 is not included for type 2)
+    Vimag = V.imag.copy()
+    if type == 2:
+        Vimag[0] = 0
+    Ire = Grows.dot(V.real) - Brows.dot(Vimag)
+    Iim = Brows.dot(V.real) + Grows.dot(Vimag)
+
+    Grows = Grows.tocoo()
+    Brows = Brows.tocoo()
+    Gcols, Gmask = get_imag_columns(Grows.col, nodes_num, type)
+    Bcols, Bmask = get_imag_columns(Brows.col, nodes_num, type)
+    H2 = create_sparse_block(rows=[Grows.row, Brows.row[Bmask], rows], cols=[Grows.col, Bcols[Bmask], Kcols],
+                             data=[K * Grows.data, -K * Brows.data[Bmask], Ire], shape=(len(nodes), state_size))
+    H3 = create_sparse_block(rows=[Brows.row, Grows.row[Gmask], rows], cols=[Brows.col, Gcols[Gmask], Kcols],
+                             data=[K * Brows.data, K * Grows.data[Gmask], Iim], shape=(q_num, state_size))
+    h2 = K * Ire
+    h3 = K * Iim
 
     return h2, h3, H2, H3
 
-def convertSinjMeasIntoCurrents(measurements, V, z, pidx, qidx):
+
+def convertSinjMeasIntoCurrents(meas_values, V, z, pidx, qidx, nodes):
     """
     In every iteration the input power measurements are converted into currents
     by dividing by the voltage estimated at the previous iteration and this values
     are replaced in the array z
 
-    @param measurements: Vector of measurements in Input (voltages, currents, powers)
+    @param meas_values: array with the measured values (affected by uncertainty) of all measurements
     @param V: vector of the estimated voltages
     @param z: array with all measured values (affected by uncertainty) --> MeasurementSet.getMeasValues
     @param pidx: array which contains the index of measurements type Sinj_real in measurements.measurements
     @param qidx: array which contains the index of measurements type Sinj_imag in measurements.measurements
+    @param nodes: array which contains the index of the nodes of the measurements pidx (== nodes of qidx)
     returns: updated z array
     """
+    return convertPowerMeasIntoCurrents(meas_values, V, z, pidx, qidx, nodes)
 
-    for p_index, q_index in zip(pidx, qidx):
-        # get values of the measurements p_inj and q_inj   (affected by uncertainty-->meas_value)
-        p_inj = measurements.measurements[p_index].meas_value
-        q_inj = measurements.measurements[q_index].meas_value
-        # get index of the node
-        node_index = measurements.measurements[
-            p_index].element.index  # == measurements.measurements[q_index].element.index
-        z[p_index] = (p_inj * V[node_index].real + q_inj * V[node_index].imag) / (np.absolute(V[node_index]) ** 2)
-        z[q_index] = (p_inj * V[node_index].imag - q_inj * V[node_index].real) / (np.absolute(V[node_index]) ** 2)
-
-    return z
 
-
-def convertSbranchMeasIntoCurrents(measurements, V, z, p1br, q1br, p2br, q2br):
+def convertSbranchMeasIntoCurrents(meas_values, V, z, p1br, q1br, p2br, q2br, p1br_nodes, p2br_nodes):
     """
     In every iteration the input power measurements are converted into currents
     by dividing by the voltage estimated at the previous iteration and this values
     are replaced in the array z
 
-    @param measurements: Vector of measurements in Input (voltages, currents, powers)
+    @param meas_values: array with the measured values (affected by uncertainty) of all measurements
     @param V: vector of the estimated voltages
     @param z: array with all measured values (affected by uncertainty) --> MeasurementSet.getMeasValues
     @param p1br: array which contains the index of measurements type S1_real in measurements.measurements
     @param q1br: array which contains the index of measurements type S1_imag in measurements.measurements
     @param p2br: array which contains the index of measurements type S2_real in measurements.measurements
     @param q2br: array which contains the index of measurements type S2_imag in measurements.measurements
+    @param p1br_nodes: array which contains the index of the start nodes of the measurements p1br
+    @param p2br_nodes: array which contains the index of the end nodes of the measurements p2br
+    returns: updated z array
+    """
+    z = convertPowerMeasIntoCurrents(meas_values, V, z, p1br, q1br, p1br_nodes)
+    z = convertPowerMeasIntoCurrents(meas_values, V, z, p2br, q2br, p2br_nodes)
+
+    return z
+
+
+def convertPowerMeasIntoCurrents(meas_values, V, z, pidx, qidx, nodes):
+    """
+    replaces in the array z the power measurements pidx and qidx (measured at the nodes "nodes")
+    by the equivalent rectangular current measurements
+
+    @param meas_values: array with the measured values (affected by uncertainty) of all measurements
+    @param V: vector of the estimated voltages
+    @param z: array with all measured values (affected by uncertainty) --> MeasurementSet.getMeasValues
+    @param pidx: array which contains the index of the active power measurements
+    @param qidx: array which contains the index of the reactive power measurements
+    @param nodes: array which contains the index of the nodes of the measurements pidx
     returns: updated z array
     """
-    for pbr_index, qbr_index in zip(p1br, q1br):
-        # get values of the measurements pbr_inj and qbr_inj   (affected by uncertainty-->meas_value)
-        p_br = measurements.measurements[pbr_index].meas_value
-        q_br = measurements.measurements[qbr_index].meas_value
-        # get index of the start node
-        node_index = measurements.measurements[
-            pbr_index].element.start_node.index  # == measurements.measurements[qbr_index].element.start_node.index
-        z[pbr_index] = (p_br * V[node_index].real + q_br * V[node_index].imag) / (np.absolute(V[node_index]) ** 2)
-        z[qbr_index] = (p_br * V[node_index].imag - q_br * V[node_index].real) / (np.absolute(V[node_index]) ** 2)
-
-    for pbr_index, qbr_index in zip(p2br, q2br):
-        # get values of the measurements pbr_inj and qbr_inj   (affected by uncertainty-->meas_value)
-        p_br = measurements.measurements[pbr_index].meas_value
-        q_br = measurements.measurements[qbr_index].meas_value
-        # get index of the end node
-        node_index = measurements.measurements[
-            pbr_index].element.end_node.index  # == measurements.measurements[qbr_index].element.start_node.index
-        z[pbr_index] = (p_br * V[node_index].real + q_br * V[node_index].imag) / (np.absolute(V[node_index]) ** 2)
-        z[qbr_index] = (p_br * V[node_index].imag - q_br * V[node_index].real) / (np.absolute(V[node_index]) ** 2)
+    pairs_num = min(len(pidx), len(qidx))
+    pidx = pidx[:pairs_num]
+    qidx = qidx[:pairs_num]
+    nodes = nodes[:pairs_num]
+
+    # get values of the measurements p and q (affected by uncertainty-->meas_value)
+    p = meas_values[pidx]
+    q = meas_values[qidx]
+    Vnode = V[nodes]
+    z[pidx] = (p * Vnode.real + q * Vnode.imag) / (np.absolute(Vnode) ** 2)
+    z[qidx] = (p * Vnode.imag - q * Vnode.real) / (np.absolute(Vnode) ** 2)
 
     return z
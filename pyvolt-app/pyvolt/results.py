@@ -1,5 +1,6 @@
 import cmath
 import numpy as np
+import scipy.sparse as sp
 import pandas as pd
 
 class ResultsNode():
@@ -46,27 +47,94 @@ class TimeSeries:
         self.name = name
         self.label = name
 
+class ConvergenceReport():
+    def __init__(self, num_iter, mismatch, converged, tolerance, max_iter):
+        """
+        Convergence information of an iterative solver (powerflow or state estimation)
+        :param num_iter: number of performed iterations
+        :param mismatch: maximum absolute state update of the last iteration
+        :param converged: True if mismatch <= tolerance was reached within max_iter iterations
+        :param tolerance: convergence threshold
+        :param max_iter: maximum number of iterations
+        """
+        self.num_iter = num_iter
+        self.mismatch = mismatch
+        self.converged = converged
+        self.tolerance = tolerance
+        self.max_iter = max_iter
+
+    def __str__(self):
+        str = 'class=ConvergenceReport\n'
+        attributes = self.__dict__
+        for key in attributes.keys():
+            str = str + key + '={}\n'.format(attributes[key])
+        return str
+
+
+def merge_convergence_reports(reports, tolerance, max_iter):
+    """
+    combine the ConvergenceReports of independent calculations (e.g. of the islands of a system) into one report:
+    maximum number of iterations and mismatch, converged if all calculations converged
+    :param reports: list of objects of class ConvergenceReport
+    :param tolerance: convergence threshold
+    :param max_iter: maximum number of iterations
+    """
+    if len(reports) == 0:
+        return ConvergenceReport(0, 0.0, True, tolerance, max_iter)
+    return ConvergenceReport(max(report.num_iter for report in reports),
+                             max(report.mismatch for report in reports),
+                             all(report.converged for report in reports), tolerance, max_iter)
+
+
+def get_initial_voltages(initial_state, nodes_num):
+    """
+    return the initial node voltages (in per unit, in the order of node.index) of the iterative solvers
+    :param initial_state: - None: flat start (all voltages 1+0j)
+                          - object of class Results (e.g. the results of the previous calculation)
+                          - np.array with the complex node voltages in per unit
+    :param nodes_num: number of nodes of the grid
+    """
+    if initial_state is None:
+        return np.ones(nodes_num) + 1j * np.zeros(nodes_num)
+    if isinstance(initial_state, Results):
+        V = initial_state.get_voltages(pu=True)
+    else:
+        V = np.array(initial_state, dtype=complex)
+    if V.shape != (nodes_num,):
+        raise Exception('initial_state must contain the voltages of {} nodes'.format(nodes_num))
+    return V
+
+
 class Results():
     def __init__(self, system):
         self.nodes = []
         self.branches = []
-        self.Ymatrix = system.Ymatrix
-        self.Bmatrix = system.Bmatrix
-        for node in system.nodes:
-            if node.ideal_connected_with == '':
-                self.nodes.append(ResultsNode(topo_node=node))
+        # convergence information of the solver which calculated the results
+        self.convergence = None
+        self.Ymatrix_sparse = system.Ymatrix_sparse
+        self.Bmatrix_sparse = system.Bmatrix_sparse
+        # array representation of the system (node and branch indices, base values)
+        self.arrays = system.arrays
+        for node in self.arrays.nodes:
+            self.nodes.append(ResultsNode(topo_node=node))
         for branch in system.branches:
             self.branches.append(ResultsBranch(topo_branch=branch))
 
+        # lookup tables index-->node, uuid-->node and uuid-->branch
+        self._nodes_by_index = {}
+        self._nodes_by_uuid = {}
+        self._branches_by_uuid = {}
+        for node in self.nodes:
+            self._nodes_by_index.setdefault(node.topology_node.index, node)
+            self._nodes_by_uuid.setdefault(node.topology_node.uuid, node)
+        for branch in self.branches:
+            self._branches_by_uuid.setdefault(branch.topology_branch.uuid, branch)
+
     def get_node_by_index(self, index):
         """
         return the node with node.index==index
         """
-        for node in self.nodes:
-            if (node.topology_node.index==index):
-                return node
-        
-        return None
+        return self._nodes_by_index.get(index)
 
     def read_timeseries_csv(self, filename, timeseries_names=None, print_status=True):
         """Reads complex time series data from a CSV file. Real and
@@ -157,78 +225,121 @@ class Results():
         """
         load the voltages of V-array (result of powerflow_cim.solve)
         """
+        base_voltage = self.arrays.node_base_voltage
         for index in range(len(V)):
             node = self.get_node_by_index(index)
             node.voltage_pu = V[index]
-            node.voltage = node.voltage_pu * node.topology_node.baseVoltage
+            node.voltage = node.voltage_pu * base_voltage[index]
     
     def calculate_all(self):
         """
         calculate all quantities of the grid
         """
-        self.calculateI()
-        self.calculateIinj()
-        self.calculateSinj()
-        self.calculateIinj()
-        self.calculateS1()
-        self.calculateS2()
+        V = self.get_voltages(pu=True)
+        I = self.calculateI(V)
+        Iinj = self.calculateIinj(I)
+        self.calculateSinj(V, Iinj)
+        self.calculateS1(V, I)
+        self.calculateS2(V, I)
 
-    def calculateI(self):
+    def get_branch_admittances(self):
+        """
+        return np.arrays with the entries Ymatrix_sparse[start, end] and Bmatrix_sparse[start, end] of each branch
+        """
+        start = self.arrays.branch_start
+        end = self.arrays.branch_end
+        entries = []
+        for matrix in (self.Ymatrix_sparse, self.Bmatrix_sparse):
+            values = sp.csr_matrix(matrix)[start, end]
+            # scipy returns a sparse matrix if start and end are empty
+            if sp.issparse(values):
+                values = values.toarray()
+            entries.append(np.asarray(values, dtype=complex).ravel())
+        return entries[0], entries[1]
+
+    def calculateI(self, V=None):
         """
         To calculate the branch currents
         Note: branch current flowing into start node coming from end node
-        """
-        for branch in self.branches:
-            fr = branch.topology_branch.start_node.index
-            to = branch.topology_branch.end_node.index
-            branch.current_pu = - (self.nodes[fr].voltage_pu - self.nodes[to].voltage_pu) * self.Ymatrix[fr][to] + 1j*self.Bmatrix[fr][to] * self.nodes[fr].voltage_pu
-            branch.current = branch.current_pu * branch.topology_branch.base_current
+        @param V: np.array with the node voltages in pu, None to use node.voltage_pu
+        return: np.array with the branch currents in pu
+        """
+        if V is None:
+            V = self.get_voltages(pu=True)
+        fr = self.arrays.branch_start
+        to = self.arrays.branch_end
+        Y, B = self.get_branch_admittances()
+        I = - (V[fr] - V[to]) * Y + 1j * B * V[fr]
+        for branch, current_pu, base_current in zip(self.branches, I, self.arrays.branch_base_current):
+            branch.current_pu = current_pu
+            branch.current = current_pu * base_current
+        return I
 
-    def calculateIinj(self):
+    def calculateIinj(self, I=None):
         """
         Calculate current injections at a node
         Note: node current flowing into the node
-        """
-        for node in self.nodes:
-            to = complex(0, 0)  # sum of the currents flowing to the node
-            fr = complex(0, 0)  # sum of the currents flowing from the node
-            for branch in self.branches:
-                if node.topology_node.index == branch.topology_branch.start_node.index:
-                    fr = fr + branch.current_pu
-                if node.topology_node.index == branch.topology_branch.end_node.index:
-                    to = to + branch.current_pu
-            node.current_pu = fr - to
-            node.current = node.current_pu * node.topology_node.base_current
+        @param I: np.array with the branch currents in pu, None to use branch.current_pu
+        return: np.array with the current injections in pu
+        """
+        if I is None:
+            I = self.getI(pu=True)
+        nodes_num = len(self.nodes)
+        # sum of the currents flowing from the node (fr) and to the node (to)
+        fr = np.bincount(self.arrays.branch_start, I.real, nodes_num) \
+            + 1j * np.bincount(self.arrays.branch_start, I.imag, nodes_num)
+        to = np.bincount(self.arrays.branch_end, I.real, nodes_num) \
+            + 1j * np.bincount(self.arrays.branch_end, I.imag, nodes_num)
+        Iinj = fr - to
+        for node, current_pu, base_current in zip(self.nodes, Iinj, self.arrays.node_base_current):
+            node.current_pu = current_pu
+            node.current = current_pu * base_current
+        return Iinj
 
-    def calculateSinj(self):
+    def calculateSinj(self, V=None, Iinj=None):
         """
         calculate power injection at a node
+        @param V: np.array with the node voltages in pu, None to use node.voltage_pu
+        @param Iinj: np.array with the current injections in pu, None to use node.current_pu
         """
-        for node in self.nodes:
-            node.power_pu = node.voltage_pu * np.conj(node.current_pu)
-            node.power = node.power_pu * node.topology_node.base_apparent_power
+        if V is None:
+            V = self.get_voltages(pu=True)
+        if Iinj is None:
+            Iinj = self.get_Iinj(pu=True)
+        Sinj = V * np.conj(Iinj)
+        for node, power_pu, base_power in zip(self.nodes, Sinj, self.arrays.node_base_apparent_power):
+            node.power_pu = power_pu
+            node.power = power_pu * base_power
 
-    def calculateS1(self):
+    def calculateS1(self, V=None, I=None):
         """
         calculate complex power flow at branch, measured at initial node
+        @param V: np.array with the node voltages in pu, None to use node.voltage_pu
+        @param I: np.array with the branch currents in pu, None to use branch.current_pu
         """
-        for branch in self.branches:
-            branch_index = branch.topology_branch.start_node.index
-            for node in self.nodes:
-                if branch_index == node.topology_node.index:
-                    branch.power_pu = node.voltage_pu * (np.conj(branch.current_pu))
-                    branch.power = branch.power_pu * branch.topology_branch.base_apparent_power
+        if V is None:
+            V = self.get_voltages(pu=True)
+        if I is None:
+            I = self.getI(pu=True)
+        S1 = V[self.arrays.branch_start] * np.conj(I)
+        for branch, power_pu, base_power in zip(self.branches, S1, self.arrays.branch_base_apparent_power):
+            branch.power_pu = power_pu
+            branch.power = power_pu * base_power
 
-    def calculateS2(self):
+    def calculateS2(self, V=None, I=None):
         """
         calculate complex ower flow at branch, measured at final node
-        """
-        for branch in self.branches:
-            branch_index = branch.topology_branch.end_node.index
-            for node in self.nodes:
-                if branch_index == node.topology_node.index:
-                    branch.power2_pu = -node.voltage_pu * (np.conj(branch.current_pu))
-                    branch.power2 = branch.power2_pu * branch.topology_branch.base_apparent_power
+        @param V: np.array with the node voltages in pu, None to use node.voltage_pu
+        @param I: np.array with the branch currents in pu, None to use branch.current_pu
+        """
+        if V is None:
+            V = self.get_voltages(pu=True)
+        if I is None:
+            I = self.getI(pu=True)
+        S2 = -V[self.arrays.branch_end] * np.conj(I)
+        for branch, power_pu, base_power in zip(self.branches, S2, self.arrays.branch_base_apparent_power):
+            branch.power2_pu = power_pu
+            branch.power2 = power_pu * base_power
 
     def get_node(self, index=None, uuid=None):
         """
@@ -237,21 +348,15 @@ class Results():
         - if uuid in not None --> return the PowerflowNode with PowerflowNode.topology_node.uuid == uuid
         """
         if index is not None:
-            for node in self.nodes:
-                if index == node.topology_node.index:
-                    return node
+            return self._nodes_by_index.get(index)
         elif uuid is not None:
-            for node in self.nodes:
-                if uuid == node.topology_node.uuid:
-                    return node
+            return self._nodes_by_uuid.get(uuid)
 
     def get_branch(self, uuid):
         """
         returns a PowerflowBranch with a certain uuid
         """
-        for branch in self.branches:
-            if uuid == branch.topology_branch.uuid:
-                return branch
+        return self._branches_by_uuid.get(uuid)
 
     def get_voltages(self, pu=True):
         """